@@ -6,17 +6,25 @@ Form to input today’s health metrics
 import streamlit as st
 from datetime import datetime
 from health_service import HealthService
+from intraday_service import IntradayService
 from validators import Validators
+from service_registry import get_service
 
 def render(user_id):
     st.markdown('<div class="main-header">➕ Add Today\'s Health Data</div>', unsafe_allow_html=True)
-    health_service = HealthService()
+    health_service = get_service(HealthService)
+    today = datetime.utcnow()
+
+    # Prefill steps and heart rate from wearable samples synced today
+    derived = get_service(IntradayService).derive_daily_values(user_id, today)
+    if derived:
+        st.caption(f"⌚ Prefilled from {derived['samples']:,} wearable samples")
 
     with st.form("add_data"):
-        today = datetime.utcnow()
-        steps = st.number_input("🚶 Steps", min_value=0, step=100, value=0)
+        steps = st.number_input("🚶 Steps", min_value=0, step=100, value=derived.get('steps', 0))
         calories = st.number_input("🔥 Calories", min_value=0, max_value=10000, step=25, value=0)
-        heart_rate = st.number_input("💓 Heart Rate (bpm)", min_value=30, max_value=220, step=1, value=60)
+        heart_rate = st.number_input("💓 Heart Rate (bpm)", min_value=30, max_value=220, step=1,
+                                     value=min(max(derived.get('heart_rate', 60), 30), 220))
         sleep_hours = st.number_input("😴 Sleep (hours)", min_value=0.0, max_value=24.0, step=0.1, value=0.0)
         water_intake = st.number_input("💧 Water (glasses)", min_value=0, max_value=50, step=1, value=0)
         notes = st.text_area("📝 Notes (optional)", max_chars=320)
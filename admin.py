@@ -0,0 +1,43 @@
+"""
+Admin Page
+Platform usage metrics for administrators
+"""
+
+import streamlit as st
+from admin_metrics import AdminMetricsService
+from config import Config
+from service_registry import get_service
+
+def render(email):
+    st.markdown('<div class="main-header">🛠️ Admin Overview</div>', unsafe_allow_html=True)
+    if not Config.is_admin(email):
+        st.error("You do not have access to this page.")
+        return
+
+    metrics_service = get_service(AdminMetricsService)
+    refresh = st.button("🔄 Refresh now")
+    metrics = metrics_service.get_metrics(force_refresh=refresh)
+
+    st.subheader("Totals")
+    t1, t2, t3 = st.columns(3)
+    t1.metric("Users", f"{metrics['total_users']:,}")
+    t2.metric("Health Entries", f"{metrics['total_entries']:,}")
+    t3.metric("Logins (all time)", f"{metrics['counters']['logins']:,}")
+
+    st.subheader("Active Users")
+    a1, a2, a3 = st.columns(3)
+    a1.metric("Daily", f"{metrics['daily_active_users']:,}")
+    a2.metric("Weekly", f"{metrics['weekly_active_users']:,}")
+    a3.metric("Monthly", f"{metrics['monthly_active_users']:,}")
+
+    st.subheader("Today")
+    d1, d2, d3 = st.columns(3)
+    d1.metric("Sign-ups", f"{metrics['today']['signups']:,}")
+    d2.metric("New Entries", f"{metrics['today']['entries']:,}")
+    d3.metric("Logins", f"{metrics['today']['logins']:,}")
+
+    st.caption(
+        f"Totals are estimated from collection metadata. "
+        f"Updated {metrics['collected_at'].strftime('%H:%M:%S')} UTC, "
+        f"cached for {Config.ADMIN_METRICS_TTL_SECONDS}s."
+    )
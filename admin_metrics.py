@@ -0,0 +1,49 @@
+"""
+Admin Metrics
+Cheap platform metrics from collection metadata, counters and indexed counts
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+from config import Config
+from storage_backend import get_storage
+
+COUNTER_NAMES = ['signups', 'entries', 'logins']
+
+class AdminMetricsService:
+    """Service for admin metrics, cached process-wide with a short TTL"""
+
+    _cache = None
+    _cache_expires = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.db = get_storage()
+
+    def _collect(self) -> Dict:
+        now = datetime.utcnow()
+        today = now.strftime('%Y-%m-%d')
+        daily_keys = [f"{name}:{today}" for name in COUNTER_NAMES]
+        counters = self.db.get_counters(COUNTER_NAMES + daily_keys)
+
+        return {
+            "total_users": self.db.get_all_users_count(),
+            "total_entries": self.db.get_total_entries_count(),
+            "daily_active_users": self.db.count_active_users(now - timedelta(days=1)),
+            "weekly_active_users": self.db.count_active_users(now - timedelta(days=7)),
+            "monthly_active_users": self.db.count_active_users(now - timedelta(days=30)),
+            "counters": {name: counters[name] for name in COUNTER_NAMES},
+            "today": {name: counters[f"{name}:{today}"] for name in COUNTER_NAMES},
+            "collected_at": now
+        }
+
+    def get_metrics(self, force_refresh: bool = False) -> Dict:
+        """Get admin metrics, recomputed at most once per TTL per process"""
+        cls = AdminMetricsService
+        with cls._lock:
+            if force_refresh or cls._cache is None or time.monotonic() >= cls._cache_expires:
+                cls._cache = self._collect()
+                cls._cache_expires = time.monotonic() + Config.ADMIN_METRICS_TTL_SECONDS
+            return cls._cache
@@ -4,17 +4,121 @@ Visualizes trends and progress with charts
 """
 
 import streamlit as st
+from datetime import datetime
 from health_service import HealthService
+from correlation_service import CorrelationService, CORRELATION_METRICS
+from event_bus import derived_cache
 import altair as alt
+from config import Config
 from helpers import Helpers
+from service_registry import get_service
+
+TREND_METRICS = ["steps", "calories", "sleep_hours", "water_intake", "heart_rate"]
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _build_trends_spec(data_version: str, _week_df) -> dict:
+    """Build the weekly trends Vega-Lite spec, cached per data version.
+
+    All metric panels share one embedded dataset via a repeat chart, and the
+    serialized spec is reused until the underlying data changes.
+    """
+    titles = {metric: metric.replace('_', ' ').title() for metric in TREND_METRICS}
+    chart_df = _week_df[["date"] + TREND_METRICS].rename(columns=titles)
+
+    chart = alt.Chart(chart_df).mark_line(point=True).encode(
+        x=alt.X('date:T', title='Date'),
+        y=alt.Y(alt.repeat('row'), type='quantitative'),
+        tooltip=['date:T', alt.Tooltip(alt.repeat('row'), type='quantitative')]
+    ).properties(width=500, height=200).repeat(
+        row=list(titles.values())
+    )
+    return chart.to_dict()
+
+def _label(metric: str) -> str:
+    return metric.replace('_', ' ').title()
+
+def _describe(finding: dict) -> str:
+    direction = "higher" if finding['r'] > 0 else "lower"
+    when = "the next day" if finding['lag'] else "the same day"
+    return (f"Higher {_label(finding['metric']).lower()} tends to go with {direction} "
+            f"{_label(finding['other']).lower()} {when} (r = {finding['r']:+.2f} over {finding['days']} days)")
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _build_heatmap_spec(matrix: tuple) -> dict:
+    """Same-day correlation heatmap spec, cached per matrix"""
+    import pandas as pd
+
+    labels = [_label(metric) for metric in CORRELATION_METRICS]
+    matrix_df = pd.DataFrame([
+        {"metric": labels[i], "other": labels[j], "r": r}
+        for i, row in enumerate(matrix) for j, r in enumerate(row)
+    ])
+    return alt.Chart(matrix_df).mark_rect().encode(
+        x=alt.X('other:N', title=None, sort=labels),
+        y=alt.Y('metric:N', title=None, sort=labels),
+        color=alt.Color('r:Q', scale=alt.Scale(scheme='redblue', domain=[-1, 1]), title='r'),
+        tooltip=['metric', 'other', alt.Tooltip('r:Q', format='+.2f')]
+    ).properties(width=400, height=300, title='Same day').to_dict()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _build_lag_spec(by_lag: tuple) -> dict:
+    """Correlation by number of days between the two metrics"""
+    import pandas as pd
+
+    lag_df = pd.DataFrame({"days later": range(len(by_lag)), "r": by_lag})
+    return alt.Chart(lag_df).mark_bar().encode(
+        x=alt.X('days later:O'),
+        y=alt.Y('r:Q', scale=alt.Scale(domain=[-1, 1])),
+        tooltip=['days later', alt.Tooltip('r:Q', format='+.2f')]
+    ).properties(width=500, height=200).to_dict()
+
+@st.cache_data(max_entries=1024, ttl=Config.CORRELATION_CACHE_SECONDS, show_spinner=False)
+def _get_correlations(user_id: str, recent_version: str) -> dict:
+    """Correlations cached per user and content hash of their last 30 days.
+
+    Inline mode keeps no data versions, so the hash of recent entries stands in
+    for one (nearly every write lands there); the TTL bounds how long an edit
+    to an older day goes unseen. Without it every render reads the full history.
+    """
+    return get_service(CorrelationService).get_correlations(user_id)
+
+def render_correlations(user_id, recent_df):
+    """How the metrics move together, on the same day and days apart"""
+    st.subheader("🔗 How Your Metrics Relate")
+    recent_version = Helpers.data_version(recent_df, ["date"] + TREND_METRICS)
+    result = _get_correlations(str(user_id), recent_version)
+    if result['days'] < Config.CORRELATION_MIN_DAYS:
+        st.info(f"Log at least {Config.CORRELATION_MIN_DAYS} days to see how your metrics relate.")
+        return
+
+    for finding in result['findings']:
+        st.write(f"• {_describe(finding)}")
+    if not result['findings']:
+        st.caption("No strong relations between your metrics so far.")
+
+    st.vega_lite_chart(_build_heatmap_spec(tuple(map(tuple, result['matrix']))))
+
+    c1, c2 = st.columns(2)
+    with c1:
+        metric = st.selectbox("This metric", CORRELATION_METRICS, format_func=_label,
+                              index=CORRELATION_METRICS.index('sleep_hours'))
+    with c2:
+        other = st.selectbox("followed by", CORRELATION_METRICS, format_func=_label,
+                             index=CORRELATION_METRICS.index('steps'))
+    i, j = CORRELATION_METRICS.index(metric), CORRELATION_METRICS.index(other)
+    by_lag = (result['matrix'][i][j],) + tuple(lag[i][j] for lag in result['lagged'])
+    st.vega_lite_chart(_build_lag_spec(by_lag), use_container_width=True)
 
 def render(user_id):
     st.markdown('<div class="main-header">📈 Analytics & Trends</div>', unsafe_allow_html=True)
-    health_service = HealthService()
+    health_service = get_service(HealthService)
 
     # Fetch health data for last 30 days
-    entries = health_service.get_entries(user_id, days=30)
-    df = Helpers.entries_to_dataframe(entries)
+    # Shared across sessions while the user's data is unchanged (events mode); read-only below
+    df = derived_cache.get_or_compute(
+        user_id, 'health_entries', ('entries_df', 30, datetime.utcnow().date()),
+        lambda: Helpers.entries_to_dataframe(health_service.get_entries(user_id, days=30, analytics=True))
+    )
 
     if df.empty:
         st.info("No health entries yet. Add your data to see charts.")
@@ -22,15 +126,12 @@ def render(user_id):
 
     st.subheader("Weekly Trends")
     week_df = df.tail(7)
-    for metric in ["steps", "calories", "sleep_hours", "water_intake", "heart_rate"]:
-        chart = alt.Chart(week_df).mark_line(point=True).encode(
-            x=alt.X('date:T', title='Date'),
-            y=alt.Y(f"{metric}:Q", title=metric.replace('_', ' ').title()),
-            tooltip=['date', metric]
-        ).properties(width=500, height=200)
-        st.altair_chart(chart, use_container_width=True)
+    data_version = Helpers.data_version(week_df, ["date"] + TREND_METRICS)
+    st.vega_lite_chart(_build_trends_spec(data_version, week_df), use_container_width=True)
 
     # Show 30-day progression
     st.subheader("30-Day Overview")
     metrics = ['steps', 'calories', 'heart_rate', 'sleep_hours', 'water_intake']
     st.dataframe(df[["date"] + metrics].sort_values('date', ascending=False), use_container_width=True)
+
+    render_correlations(user_id, df)
@@ -0,0 +1,257 @@
+"""
+Anomaly Service
+Streaming detection of sharp deviations from a user's heart rate and sleep baseline
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from config import Config
+from storage_backend import get_storage
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Metrics watched for anomalies, with a human readable label for alerts
+ANOMALY_METRICS = {
+    'heart_rate': 'Resting heart rate',
+    'sleep_hours': 'Sleep'
+}
+
+# Standard deviation floor so a very stable baseline does not flag tiny changes
+MIN_STD = {
+    'heart_rate': 2.0,
+    'sleep_hours': 0.25
+}
+
+class AnomalyService:
+    """EWMA/z-score anomaly detector with O(1) per-user state per metric"""
+
+    def __init__(self):
+        self.db = get_storage()
+        self.alpha = Config.ANOMALY_EWMA_ALPHA
+        self.threshold = Config.ANOMALY_Z_THRESHOLD
+        self.min_samples = Config.ANOMALY_MIN_SAMPLES
+
+    @staticmethod
+    def _day_start(value: datetime) -> datetime:
+        return datetime(value.year, value.month, value.day)
+
+    def _z_score(self, metric: str, state: Dict, value: float) -> float:
+        """z-score of a value against the baseline held in state"""
+        std = max(math.sqrt(state['var']), MIN_STD[metric])
+        return (value - state['mean']) / std
+
+    def _advance(self, state: Optional[Dict], value: float) -> Dict:
+        """Incremental exponentially weighted mean/variance update"""
+        if not state or not state.get('count'):
+            return {"mean": value, "var": 0.0, "count": 1}
+
+        diff = value - state['mean']
+        increment = self.alpha * diff
+        return {
+            "mean": state['mean'] + increment,
+            "var": (1 - self.alpha) * (state['var'] + diff * increment),
+            "count": state['count'] + 1
+        }
+
+    def _anomaly(self, user_id: str, metric: str, day: datetime, value: float,
+                 baseline: Dict, z_score: float) -> Dict:
+        from bson import ObjectId
+        return {
+            "user_id": ObjectId(user_id),
+            "metric": metric,
+            "date": day,
+            "value": value,
+            "baseline_mean": round(baseline['mean'], 2),
+            "baseline_std": round(math.sqrt(baseline['var']), 2),
+            "z_score": round(z_score, 2),
+            "direction": "high" if z_score > 0 else "low"
+        }
+
+    # ============= STREAMING PATH =============
+
+    def observe(self, user_id: str, entry: Dict, alert: bool = True) -> List[Dict]:
+        """Score one written entry against the baseline and fold it in"""
+        if not self.db.supports('anomalies'):
+            return []
+        flagged = self._apply(user_id, lambda states: self._fold_entry(user_id, states, entry))
+        if flagged and alert:
+            self._send_alerts(user_id, flagged)
+        return flagged
+
+    def _fold_entry(self, user_id: str, states: Dict, entry: Dict) -> Tuple[Dict, List[Dict], Dict]:
+        """New baselines, flagged anomalies and days to re-score for one entry"""
+        day = self._day_start(entry['date'])
+        new_states = {}
+        flagged = []
+        cleared = []
+        for metric in ANOMALY_METRICS:
+            value = entry.get(metric)
+            if value is None:
+                continue
+            value = float(value)
+            state = states.get(metric)
+
+            if state and state['last_day'] > day:
+                # Backfilled day: the baseline has moved on, leave it alone
+                continue
+            if state and state['last_day'] == day:
+                # Overwrite of the latest day: rewind to the baseline before it
+                baseline = state.get('previous')
+                cleared.append(metric)
+            else:
+                baseline = state and {k: state[k] for k in ('mean', 'var', 'count')}
+
+            if baseline and baseline['count'] >= self.min_samples:
+                z_score = self._z_score(metric, baseline, value)
+                if abs(z_score) >= self.threshold:
+                    flagged.append(self._anomaly(user_id, metric, day, value, baseline, z_score))
+
+            new_states[metric] = dict(self._advance(baseline, value), last_day=day, previous=baseline)
+
+        return new_states, flagged, ({day: cleared} if cleared else {})
+
+    def _apply(self, user_id: str, fold: Callable[[Dict], Tuple[Dict, List[Dict], Dict]],
+               retries: int = 5) -> List[Dict]:
+        """Fold into the stored baselines with a version-checked save, re-reading on conflict.
+
+        Ingest workers and the event bus can write one user's baselines at the
+        same time; a blind $set would drop samples another writer folded in.
+        """
+        for _ in range(retries):
+            document = self.db.get_anomaly_state(user_id) or {}
+            new_states, flagged, cleared = fold(document.get('metrics', {}))
+            if not new_states or self.db.save_anomaly_state(user_id, new_states, document.get('version', 0)):
+                break
+        else:
+            print(f"Anomaly state update conflicted for user {user_id}; samples not folded in")
+            return []
+
+        for day, metrics in cleared.items():
+            self.db.clear_anomalies(user_id, day, metrics)
+        if flagged:
+            self.db.save_anomalies(flagged)
+        return flagged
+
+    # ============= BATCH PATH =============
+
+    def _ewm(self, initial: float, values: "np.ndarray") -> "np.ndarray":
+        """y[0] = initial, y[k] = (1 - alpha) * y[k-1] + alpha * values[k-1]"""
+        import numpy as np
+        import pandas as pd
+
+        series = pd.Series(np.concatenate(([initial], values)))
+        return series.ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+
+    def observe_batch(self, user_id: str, entries: List[Dict], alert: bool = False) -> List[Dict]:
+        """Vectorized equivalent of calling observe() on entries in date order"""
+        import pandas as pd
+
+        if not entries or not self.db.supports('anomalies'):
+            return []
+
+        df = pd.DataFrame(entries)
+        df['day'] = pd.to_datetime(df['date']).dt.normalize()
+        # One value per day (the last one wins, as with the bulk upsert)
+        df = df.drop_duplicates('day', keep='last').sort_values('day')
+
+        flagged = self._apply(user_id, lambda states: self._fold_batch(user_id, states, df))
+        if flagged and alert:
+            # Only alert on fresh data, not on historical imports
+            recent = datetime.utcnow() - timedelta(days=1)
+            self._send_alerts(user_id, [a for a in flagged if a['date'] >= self._day_start(recent)])
+        return flagged
+
+    def _fold_batch(self, user_id: str, states: Dict, df: "pd.DataFrame") -> Tuple[Dict, List[Dict], Dict]:
+        """New baselines, flagged anomalies and days to re-score for one-per-day rows in date order"""
+        import numpy as np
+        import pandas as pd
+
+        new_states = {}
+        flagged = []
+        cleared = {}
+        for metric in ANOMALY_METRICS:
+            if metric not in df:
+                continue
+            rows = df[df[metric].notna()]
+            state = states.get(metric)
+            baseline = state and {k: state[k] for k in ('mean', 'var', 'count')}
+
+            if state:
+                last_day = pd.Timestamp(state['last_day'])
+                rows = rows[rows['day'] >= last_day]
+                if len(rows) and rows['day'].iloc[0] == last_day:
+                    baseline = state.get('previous')
+                    cleared.setdefault(last_day.to_pydatetime(), []).append(metric)
+            if rows.empty:
+                continue
+
+            values = rows[metric].to_numpy(dtype=float)
+            days = rows['day'].to_numpy().astype('datetime64[us]').tolist()
+
+            if not baseline or not baseline.get('count'):
+                # First ever sample seeds the baseline and is never scored
+                baseline = {"mean": float(values[0]), "var": 0.0, "count": 1}
+                if len(values) == 1:
+                    new_states[metric] = dict(baseline, last_day=days[0], previous=None)
+                    continue
+                values, days = values[1:], days[1:]
+
+            # means[k] / variances[k] are the baseline after k samples of this batch
+            means = self._ewm(baseline['mean'], values)
+            diffs = values - means[:-1]
+            variances = self._ewm(baseline['var'], (1 - self.alpha) * diffs ** 2)
+            counts = baseline['count'] + np.arange(len(values) + 1)
+
+            stds = np.maximum(np.sqrt(variances[:-1]), MIN_STD[metric])
+            z_scores = diffs / stds
+            mask = (counts[:-1] >= self.min_samples) & (np.abs(z_scores) >= self.threshold)
+
+            for i in np.flatnonzero(mask):
+                prior = {"mean": means[i], "var": variances[i], "count": int(counts[i])}
+                flagged.append(self._anomaly(user_id, metric, days[i], float(values[i]),
+                                             prior, float(z_scores[i])))
+
+            last = len(values)
+            new_states[metric] = {
+                "mean": float(means[last]),
+                "var": float(variances[last]),
+                "count": int(counts[last]),
+                "last_day": days[-1],
+                "previous": {
+                    "mean": float(means[last - 1]),
+                    "var": float(variances[last - 1]),
+                    "count": int(counts[last - 1])
+                }
+            }
+
+        return new_states, flagged, cleared
+
+    # ============= READS & ALERTS =============
+
+    def get_recent_anomalies(self, user_id: str, days: int = 7) -> List[Dict]:
+        """Get anomalies flagged in the last N days"""
+        if not self.db.supports('anomalies'):
+            return []
+        return self.db.get_anomalies(user_id, days)
+
+    def describe(self, anomaly: Dict) -> str:
+        """Human readable summary of an anomaly"""
+        unit = "bpm" if anomaly['metric'] == 'heart_rate' else "h"
+        return (f"{ANOMALY_METRICS[anomaly['metric']]} of {anomaly['value']:g} {unit} on "
+                f"{anomaly['date'].strftime('%Y-%m-%d')} is unusually {anomaly['direction']} "
+                f"(your baseline is {anomaly['baseline_mean']:g} {unit})")
+
+    def _send_alerts(self, user_id: str, anomalies: List[Dict]):
+        """Queue optional SMS alerts for flagged anomalies (sent by notification_worker.py)"""
+        if not anomalies or not Config.ANOMALY_SMS_ALERTS:
+            return
+        if not Config.is_feature_enabled('sms_notifications'):
+            return
+
+        self.db.enqueue_notifications([
+            {"user_id": anomaly['user_id'], "kind": "anomaly", "message": self.describe(anomaly)}
+            for anomaly in anomalies
+        ])
@@ -3,6 +3,7 @@ Health Tracker Pro - Main Application
 A comprehensive health tracking system with AI-powered insights
 """
 
+import importlib
 import streamlit as st
 from datetime import datetime
 import sys
@@ -11,10 +12,23 @@ from pathlib import Path
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
-from auth_service import AuthService
-from streak_service import StreakService
 from config import Config
 
+# Page modules are imported on first visit, so heavy libraries (pandas, altair,
+# openai) load only when a page that needs them is opened
+PAGE_MODULES = {
+    'dashboard': 'dashboard',
+    'add_entry': 'add_entry',
+    'analytics': 'analytics',
+    'tips': 'tips',
+    'profile': 'profile',
+    'admin': 'admin'
+}
+
+if Config.METRICS_PORT:
+    # One exporter per server process; later reruns find it already running
+    importlib.import_module('instrumentation').start_metrics_server(Config.METRICS_HOST, Config.METRICS_PORT)
+
 # Page configuration
 st.set_page_config(
     page_title="Health Tracker Pro",
@@ -106,15 +120,24 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialize services
-@st.cache_resource
-def init_services():
-    """Initialize all services with caching"""
-    auth_service = AuthService()
-    streak_service = StreakService()
-    return auth_service, streak_service
+# Services (shared process-wide across sessions, created on first use)
+def get_auth_service():
+    from auth_service import AuthService
+    from service_registry import get_service
+    return get_service(AuthService)
 
-auth_service, streak_service = init_services()
+def client_source():
+    """Client address for login throttling (the first X-Forwarded-For hop behind a trusted proxy)"""
+    if Config.TRUST_PROXY_HEADERS:
+        forwarded = st.context.headers.get('X-Forwarded-For')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return st.context.ip_address
+
+def get_streak_service():
+    from streak_service import StreakService
+    from service_registry import get_service
+    return get_service(StreakService)
 
 # Initialize session state
 def init_session_state():
@@ -150,7 +173,8 @@ def login_page():
                 
                 if submit:
                     if email and password:
-                        user = auth_service.login(email, password)
+                        result = get_auth_service().authenticate(email, password, source=client_source())
+                        user = result.get('user')
                         if user:
                             st.session_state.authenticated = True
                             st.session_state.user_id = user['_id']
@@ -158,12 +182,12 @@ def login_page():
                             st.session_state.email = user['email']
                             
                             # Track login streak
-                            streak_service.record_login(str(user['_id']))
+                            get_streak_service().record_login(str(user['_id']))
                             
                             st.success("✅ Login successful!")
                             st.rerun()
                         else:
-                            st.error("❌ Invalid email or password")
+                            st.error(f"❌ {result['message']}")
                     else:
                         st.warning("⚠️ Please fill in all fields")
         
@@ -185,7 +209,7 @@ def login_page():
                         elif len(password) < 6:
                             st.error("❌ Password must be at least 6 characters")
                         else:
-                            result = auth_service.signup(username, email, phone, password)
+                            result = get_auth_service().signup(username, email, phone, password)
                             if result['success']:
                                 st.success("✅ Account created successfully! Please login.")
                             else:
@@ -195,14 +219,14 @@ def login_page():
 
 def main_app():
     """Render main application after authentication"""
-    import dashboard, add_entry, analytics, tips, profile
+    from instrumentation import timed, PAGE_RENDER_SECONDS
     
     # Sidebar navigation
     with st.sidebar:
         st.markdown(f"### 👤 Welcome, {st.session_state.username}!")
         
         # Display login streak
-        streak_data = streak_service.get_streak(st.session_state.user_id)
+        streak_data = get_streak_service().get_streak(st.session_state.user_id)
         if streak_data:
             st.markdown(f"""
             <div class="metric-card">
@@ -224,9 +248,16 @@ def main_app():
             st.session_state.page = 'tips'
         if st.button("👤 Profile", use_container_width=True):
             st.session_state.page = 'profile'
+        if Config.is_admin(st.session_state.email):
+            if st.button("🛠️ Admin", use_container_width=True):
+                st.session_state.page = 'admin'
         
         st.markdown("---")
         
+        if Config.DEBUG_METRICS:
+            with st.expander("⏱️ Latency metrics"):
+                importlib.import_module('debug_panel').render()
+        
         if st.button("🚪 Logout", use_container_width=True):
             # Clear session state
             for key in list(st.session_state.keys()):
@@ -234,16 +265,15 @@ def main_app():
             st.rerun()
 
     # Render selected page
-    if st.session_state.page == 'dashboard':
-        dashboard.render(st.session_state.user_id)
-    elif st.session_state.page == 'add_entry':
-        add_entry.render(st.session_state.user_id)
-    elif st.session_state.page == 'analytics':
-        analytics.render(st.session_state.user_id)
-    elif st.session_state.page == 'tips':
-        tips.render(st.session_state.user_id)
-    elif st.session_state.page == 'profile':
-        profile.render(st.session_state.user_id, st.session_state.username, st.session_state.email)
+    page = st.session_state.page
+    with timed(PAGE_RENDER_SECONDS, page=page):
+        module = importlib.import_module(PAGE_MODULES.get(page, 'dashboard'))
+        if page == 'profile':
+            module.render(st.session_state.user_id, st.session_state.username, st.session_state.email)
+        elif page == 'admin':
+            module.render(st.session_state.email)
+        else:
+            module.render(st.session_state.user_id)
 
     # Footer
     st.markdown('<hr class="hr-soft" />', unsafe_allow_html=True)
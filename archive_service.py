@@ -0,0 +1,98 @@
+"""
+Archive Service
+Compacts old health entries into one document per user and month:
+
+    python archive_service.py                       # archive every user (e.g. nightly from cron)
+    python archive_service.py --user-id 65f0c0ffee... --dry-run
+
+Entries older than ARCHIVE_AFTER_DAYS (rounded down to a month start) move to
+`health_entries_archive`, with each metric stored as an array over the days of
+the month. Reads merge archived months back in, so pages and exports see the
+same history. A bucket is written before its hot entries are deleted, so an
+interrupted run is simply picked up by the next one, and an entry is only
+deleted if it is unchanged since it was read, so concurrent edits survive.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, List, Optional
+from config import Config
+from db_manager import DatabaseManager
+from models import EntryArchiveBucket
+from storage_backend import storage_supports
+
+class ArchiveService:
+    """Moves entries past the archive horizon into monthly buckets"""
+
+    def __init__(self):
+        self.db = DatabaseManager()
+
+    @staticmethod
+    def cutoff(older_than_days: int) -> datetime:
+        """Start of the month containing the archive horizon; whole months before it are archived"""
+        return EntryArchiveBucket.month_start(datetime.utcnow() - timedelta(days=older_than_days))
+
+    def archive_user(self, user_id: str, cutoff: datetime, dry_run: bool = False) -> Dict:
+        """Archive one user's entries dated before the cutoff"""
+        entries = self.db.get_entries_before(user_id, cutoff)
+        buckets = 0
+        for month, month_entries in groupby(entries, key=lambda e: EntryArchiveBucket.month_start(e['date'])):
+            month_entries = list(month_entries)
+            if not dry_run:
+                self._archive_month(user_id, month, month_entries)
+            buckets += 1
+        return {"entries": len(entries), "buckets": buckets}
+
+    def _archive_month(self, user_id: str, month: datetime, entries: List[Dict]):
+        # Fold into a bucket left by an earlier run; hot entries are newer and win
+        existing = self.db.get_archive_bucket(user_id, month)
+        merged = (EntryArchiveBucket.expand(existing) if existing else []) + entries
+        bucket = EntryArchiveBucket.to_document(user_id, month, merged)
+        self.db.save_archive_bucket(bucket)
+        # Archived entries are counted here, since the hot collection's count no longer includes them
+        added = bucket['count'] - (existing['count'] if existing else 0)
+        if added:
+            self.db.increment_counters(['archived_entries'], added)
+        # Conditional on each entry being unchanged, so a concurrent update is never lost
+        self.db.delete_health_entries(entries)
+
+    def archive_all(self, cutoff: datetime, user_ids: Optional[List[str]] = None,
+                    dry_run: bool = False) -> Dict:
+        """Archive every user (or the given ones); returns totals"""
+        totals = {"users": 0, "entries": 0, "buckets": 0}
+        for user_id in user_ids or self.db.iter_user_ids(analytics=False):
+            result = self.archive_user(str(user_id), cutoff, dry_run=dry_run)
+            totals["users"] += 1
+            totals["entries"] += result["entries"]
+            totals["buckets"] += result["buckets"]
+        return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--older-than-days', type=int, default=Config.ARCHIVE_AFTER_DAYS,
+                        help="Archive entries older than this many days")
+    parser.add_argument('--user-id', action='append', help="Limit to these users (repeatable; default: all)")
+    parser.add_argument('--dry-run', action='store_true', help="Count what would be archived without writing")
+    args = parser.parse_args()
+
+    if not storage_supports('archive'):
+        print("❌ Archiving needs the MongoDB storage backend (STORAGE_BACKEND=mongodb)")
+        return 1
+    if args.older_than_days <= 0:
+        print("ℹ️ Archiving is disabled (ARCHIVE_AFTER_DAYS=0)")
+        return 0
+    if args.older_than_days < Config.ARCHIVE_AFTER_DAYS:
+        # Reads only look for archived data older than ARCHIVE_AFTER_DAYS
+        print(f"❌ --older-than-days must be at least ARCHIVE_AFTER_DAYS ({Config.ARCHIVE_AFTER_DAYS})")
+        return 1
+
+    cutoff = ArchiveService.cutoff(args.older_than_days)
+    totals = ArchiveService().archive_all(cutoff, args.user_id, dry_run=args.dry_run)
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"✅ {verb} {totals['entries']:,} entries into {totals['buckets']:,} monthly buckets "
+          f"for {totals['users']:,} users (before {cutoff:%Y-%m-%d})")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
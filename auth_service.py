@@ -3,18 +3,25 @@ Authentication Service
 Handles user authentication and authorization
 """
 
+import secrets
 import bcrypt
 from typing import Optional, Dict
-from db_manager import DatabaseManager
+from storage_backend import get_storage
 from models import User
+from service_registry import get_service
+from throttle import LoginThrottle, LOGIN_ATTEMPTS
 from validators import Validators
 
 class AuthService:
     """Authentication service for user management"""
     
+    _dummy_hash = None  # Verified against for unknown emails
+    
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_storage()
         self.validators = Validators()
+        # One set of buckets per process, whichever AuthService instance handles the attempt
+        self.throttle = get_service(LoginThrottle)
     
     def _hash_password(self, password: str) -> str:
         """Hash password using bcrypt"""
@@ -50,23 +57,51 @@ class AuthService:
             password_hash=self._hash_password(password)
         )
         
-        user_id = self.db.create_user(user.to_dict())
+        user_id = self.db.create_user(user.to_document())
         
         if user_id:
             return {"success": True, "message": "Account created successfully", "user_id": user_id}
         else:
             return {"success": False, "message": "Failed to create account"}
     
-    def login(self, email: str, password: str) -> Optional[Dict]:
-        """Authenticate user"""
+    def _verify_unknown_user(self, password: str) -> bool:
+        """Spend the same bcrypt work as a real check, so unknown emails cost (and time) the same"""
+        if AuthService._dummy_hash is None:
+            AuthService._dummy_hash = self._hash_password(secrets.token_urlsafe(16))
+        self._verify_password(password, AuthService._dummy_hash)
+        return False
+    
+    def authenticate(self, email: str, password: str, source: Optional[str] = None) -> Dict:
+        """Authenticate user, throttled per account and per source (e.g. client address)"""
+        # Rejected before any lookup or hashing, so a flood cannot use up CPU
+        decision = self.throttle.acquire(email, source)
+        if not decision["allowed"]:
+            return {
+                "success": False,
+                "throttled": True,
+                "retry_after": decision["retry_after"],
+                "message": f"Too many login attempts. Try again in {decision['retry_after']} seconds."
+            }
+        
         user = self.db.get_user_by_email(email)
+        if user:
+            verified = self._verify_password(password, user['password_hash'])
+        else:
+            verified = self._verify_unknown_user(password)
         
-        if user and self._verify_password(password, user['password_hash']):
-            # Remove password hash from returned user data
-            user_data = {k: v for k, v in user.items() if k != 'password_hash'}
-            return user_data
+        if not verified:
+            LOGIN_ATTEMPTS.inc(outcome='failure')
+            return {"success": False, "message": "Invalid email or password"}
         
-        return None
+        LOGIN_ATTEMPTS.inc(outcome='success')
+        self.db.increment_counters(['logins'])
+        # Remove password hash from returned user data
+        user_data = {k: v for k, v in user.items() if k != 'password_hash'}
+        return {"success": True, "message": "Login successful", "user": user_data}
+    
+    def login(self, email: str, password: str, source: Optional[str] = None) -> Optional[Dict]:
+        """Authenticate user; None if the credentials are wrong or the attempt was throttled"""
+        return self.authenticate(email, password, source).get("user")
     
     def update_password(self, user_id: str, old_password: str, new_password: str) -> Dict:
         """Update user password"""
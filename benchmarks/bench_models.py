@@ -0,0 +1,73 @@
+"""
+Model Serialization Benchmark
+Compares the slotted model codecs with the previous dataclasses.asdict approach:
+
+    python benchmarks/bench_models.py
+"""
+
+import sys
+import timeit
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+from models import HealthEntry
+
+@dataclass
+class LegacyHealthEntry:
+    """HealthEntry as it was before slotted models (dict-backed, asdict codec)"""
+    user_id: str
+    date: datetime
+    steps: int
+    calories: int
+    heart_rate: int
+    sleep_hours: float
+    water_intake: int
+    notes: Optional[str] = ""
+    created_at: datetime = None
+
+FIELDS = dict(
+    user_id=ObjectId(),
+    date=datetime(2024, 5, 1),
+    steps=8042,
+    calories=2150,
+    heart_rate=64,
+    sleep_hours=7.5,
+    water_intake=8,
+    notes="Morning run"
+)
+
+def run(number: int = 200_000) -> dict:
+    """Time each operation; returns nanoseconds per call"""
+    document = dict(FIELDS, _id=ObjectId(), created_at=datetime(2024, 5, 1, 7, 30))
+    legacy = LegacyHealthEntry(**FIELDS)
+    slotted = HealthEntry(**FIELDS)
+
+    cases = {
+        "construct (legacy dataclass)": lambda: LegacyHealthEntry(**FIELDS),
+        "construct (slotted)": lambda: HealthEntry(**FIELDS),
+        "serialize (asdict)": lambda: asdict(legacy),
+        "serialize (to_document)": slotted.to_document,
+        "deserialize (legacy, raw kwargs)": lambda: LegacyHealthEntry(
+            **{k: v for k, v in document.items() if k != '_id'}
+        ),
+        "deserialize (from_document, typed)": lambda: HealthEntry.from_document(document),
+    }
+
+    results = {}
+    for name, func in cases.items():
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        results[name] = best / number * 1e9
+    results["instance size (legacy, bytes)"] = sys.getsizeof(legacy) + sys.getsizeof(legacy.__dict__)
+    results["instance size (slotted, bytes)"] = sys.getsizeof(slotted)
+    return results
+
+if __name__ == "__main__":
+    for name, value in run().items():
+        unit = "" if "bytes" in name else " ns/op"
+        print(f"{name:<40} {value:>10.0f}{unit}")
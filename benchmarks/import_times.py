@@ -0,0 +1,97 @@
+"""
+Import-Time Report
+Measures cold import time of the app's entry points in fresh interpreters:
+
+    python benchmarks/import_times.py
+    python benchmarks/import_times.py --top 15 --json import_times.json --budget-ms 1500
+
+Each module is imported in its own `python -X importtime` subprocess, after Streamlit
+(which every page needs anyway), so the numbers show what the module itself adds to
+a replica's cold start. The heaviest top-level packages it pulls in are listed below
+each module. --budget-ms exits 1 when the login path (app) exceeds the budget.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).parent.parent
+
+# The login page only needs app; the rest load when a page or feature is first used
+MODULES = ['config', 'app', 'db_manager', 'auth_service', 'health_service', 'dashboard',
+           'add_entry', 'analytics', 'tips', 'profile', 'admin', 'ingest_server']
+
+BASELINE = 'streamlit'
+
+def import_times(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """Cumulative import time of `module` (ms) and of each top-level package it loaded"""
+    code = f"import {BASELINE}; import {module}" if module != BASELINE else f"import {module}"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # Output is a post-order tree: a module's direct imports (one level deeper) are
+    # listed just before it, so collect them until the next top-level line
+    children: Dict[str, float] = {}
+    packages: Dict[str, float] = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            cumulative_us = int(fields[1])
+        except ValueError:
+            continue  # Header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if depth == 1:
+            package = name.split('.')[0]
+            children[package] = children.get(package, 0.0) + cumulative_us / 1000
+        elif depth == 0:
+            if name == module:
+                total = cumulative_us / 1000
+                packages = children
+            children = {}
+
+    # Modules Streamlit already imported cost nothing here and do not appear
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return total, ranked
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report cold import time per entry point")
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    parser.add_argument('--top', type=int, default=5, help="Heaviest packages listed per module")
+    parser.add_argument('--json', help="Also write the report to this file")
+    parser.add_argument('--budget-ms', type=float, help="Fail if importing app takes longer")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for module in args.modules:
+        try:
+            total, ranked = import_times(module)
+        except RuntimeError as e:
+            print(f"❌ {module}: {e}")
+            continue
+        report[module] = {"total_ms": round(total, 1), "packages": {name: round(ms, 1) for name, ms in ranked}}
+        heaviest = ', '.join(f"{name} {ms:.0f}" for name, ms in ranked[:args.top])
+        print(f"{module:<16}{total:>9.0f} ms   {heaviest}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"✅ Report written to {args.json}")
+
+    if args.budget_ms is not None and report.get('app', {}).get('total_ms', 0) > args.budget_ms:
+        print(f"❌ app imports in {report['app']['total_ms']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
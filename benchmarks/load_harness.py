@@ -0,0 +1,306 @@
+"""
+Streamlit Load Harness
+Drives app.py and every page through Streamlit's AppTest with many simulated sessions:
+
+    python benchmarks/load_harness.py --sessions 20 --reruns 10 --users 50
+
+OpenAI and Twilio are replaced by in-process stubs with a configurable delay, so no
+external calls are made. The database is seeded with synthetic data in a scratch
+database on a local mongod. Reports, per page:
+
+- render latency p50/p95/p99 under concurrency (one thread per session)
+- DatabaseManager calls and MongoDB commands per rerun (measured on a single warm session)
+- memory retained per session (tracemalloc, sessions kept alive side by side)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import Config
+from instrumentation import DB_OPERATION_SECONDS, MONGO_COMMAND_SECONDS
+from synthetic_data import seed, user_email
+
+APP_PATH = str(Path(__file__).parent.parent / "app.py")
+
+# Pages rendered for a signed-in user; 'login' is the signed-out entry point
+PAGES = ['dashboard', 'add_entry', 'analytics', 'tips', 'profile', 'login']
+
+# ============= EXTERNAL SERVICE STUBS =============
+
+class StubOpenAI:
+    """Stands in for openai.OpenAI; chat completions return a canned tip after a delay"""
+
+    delay = 0.0
+
+    def __init__(self, api_key=None, **kwargs):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def close(self):
+        pass
+
+    def _create(self, **kwargs):
+        time.sleep(self.delay)
+        message = SimpleNamespace(content="Take a short walk after each meal to add steps to your day.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+class StubTwilioClient:
+    """Stands in for twilio.rest.Client; messages are accepted after a delay"""
+
+    delay = 0.0
+
+    def __init__(self, account_sid=None, auth_token=None, **kwargs):
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, **kwargs):
+        time.sleep(self.delay)
+        return SimpleNamespace(sid="SM00000000000000000000000000000000", status="queued")
+
+def install_stubs(openai_delay: float, twilio_delay: float):
+    """Route the app's OpenAI and Twilio clients to the stubs"""
+    # Services import their client classes when constructed, so patch the libraries
+    import openai
+    import twilio.rest
+
+    StubOpenAI.delay = openai_delay
+    StubTwilioClient.delay = twilio_delay
+    Config.OPENAI_API_KEY = "stub"
+    Config.TWILIO_ACCOUNT_SID = "stub"
+    Config.TWILIO_AUTH_TOKEN = "stub"
+    Config.PIXELA_USERNAME = None  # Never call out to Pixela
+    openai.OpenAI = StubOpenAI
+    twilio.rest.Client = StubTwilioClient
+
+# ============= SESSIONS =============
+
+def share_runtime():
+    """Keep one Runtime and one script cache for all sessions, as a real server does.
+
+    AppTest installs a mock Runtime before each run and clears it afterwards, so
+    concurrent sessions would tear it down under each other. The first one created
+    is pinned and returned to every session from then on. AppTest also recompiles
+    the script on every run; concurrent compiles trip a CPython 3.11 parser bug,
+    so bytecode is compiled once under a lock and shared.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    compile_script = ScriptCache.get_bytecode
+    compiled = {}
+    compile_lock = threading.Lock()
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            if script_path not in compiled:
+                compiled[script_path] = compile_script(self, script_path)
+            return compiled[script_path]
+
+    ScriptCache.get_bytecode = get_bytecode
+
+    original = Runtime.instance.__func__
+    pinned = []
+
+    def instance(cls):
+        if not pinned and cls._instance is not None:
+            pinned.append(cls._instance)
+        return pinned[0] if pinned else original(cls)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: bool(pinned) or cls._instance is not None)
+
+def new_session(user: Dict, page: str, timeout: float):
+    """An AppTest session signed in as the user and pointed at a page"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    if page != 'login':
+        at.session_state['authenticated'] = True
+        at.session_state['user_id'] = user['user_id']
+        at.session_state['username'] = user['username']
+        at.session_state['email'] = user['email']
+        at.session_state['page'] = page
+    return at
+
+def rerun(at, page: str):
+    """Run the script once; raises if the page rendered an exception"""
+    if page != 'login':
+        at.session_state['page'] = page
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{page} raised: {at.exception[0].value}")
+
+def call_counts() -> Dict[str, int]:
+    """DatabaseManager calls and MongoDB commands issued by this process so far"""
+    return {
+        name: sum(sum(counts) for counts, _ in histogram.samples().values())
+        for name, histogram in (('db_calls', DB_OPERATION_SECONDS), ('commands', MONGO_COMMAND_SECONDS))
+    }
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+# ============= PHASES =============
+
+def measure_queries(users: List[Dict], timeout: float) -> Dict[str, Dict[str, int]]:
+    """DatabaseManager calls and MongoDB commands per rerun for each page, one warm session at a time"""
+    queries = {}
+    for page in PAGES:
+        at = new_session(users[0], page, timeout)
+        rerun(at, page)  # First run warms caches and creates per-day state
+        before = call_counts()
+        rerun(at, page)
+        after = call_counts()
+        queries[page] = {name: after[name] - before[name] for name in after}
+    return queries
+
+def measure_memory(users: List[Dict], sessions: int, timeout: float) -> Dict[str, float]:
+    """KiB retained per live session after one dashboard render each"""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        live = []
+        for i in range(sessions):
+            at = new_session(users[i % len(users)], 'dashboard', timeout)
+            rerun(at, 'dashboard')
+            live.append(at)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "per_session_kib": (current - baseline) / sessions / 1024,
+        "peak_kib": (peak - baseline) / 1024
+    }
+
+def run_load(users: List[Dict], sessions: int, reruns: int, timeout: float) -> Dict:
+    """Each session walks through the pages `reruns` times; returns latencies per page"""
+    latencies = {page: [] for page in PAGES}
+    errors = []
+    lock = threading.Lock()
+
+    def session_worker(index: int):
+        user = users[index % len(users)]
+        at = new_session(user, 'dashboard', timeout)
+        signed_out = new_session(user, 'login', timeout)
+        # Untimed first runs: session start-up is not a steady-state rerun
+        rerun(at, 'dashboard')
+        rerun(signed_out, 'login')
+        for i in range(reruns):
+            # Stagger the page order so sessions do not move in lockstep
+            page = PAGES[(index + i) % len(PAGES)]
+            started = time.perf_counter()
+            try:
+                rerun(signed_out if page == 'login' else at, page)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies[page].append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session_worker, range(sessions)))
+    wall = time.perf_counter() - started
+
+    all_samples = [ms for samples in latencies.values() for ms in samples]
+    report = {
+        "wall_seconds": wall,
+        "reruns_per_second": len(all_samples) / wall if wall else 0.0,
+        "errors": errors[:10],
+        "error_count": len(errors),
+        "pages": {}
+    }
+    for page, samples in list(latencies.items()) + [('all', all_samples)]:
+        report["pages"][page] = {
+            "reruns": len(samples),
+            "p50_ms": percentile(samples, 0.50),
+            "p95_ms": percentile(samples, 0.95),
+            "p99_ms": percentile(samples, 0.99),
+            "mean_ms": statistics.fmean(samples) if samples else 0.0
+        }
+    return report
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the Streamlit pages")
+    parser.add_argument('--uri', default=Config.MONGODB_URI, help="MongoDB URI (a local mongod)")
+    parser.add_argument('--db', default='health_tracker_load', help="Scratch database name")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--sessions', type=int, default=20, help="Concurrent simulated sessions")
+    parser.add_argument('--reruns', type=int, default=12, help="Reruns per session")
+    parser.add_argument('--openai-delay', type=float, default=0.5, help="Stub OpenAI latency (seconds)")
+    parser.add_argument('--twilio-delay', type=float, default=0.2, help="Stub Twilio latency (seconds)")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Per-rerun timeout (seconds)")
+    parser.add_argument('--out', help="Also write the report to this JSON file")
+    parser.add_argument('--keep', action='store_true', help="Keep the seeded database afterwards")
+    args = parser.parse_args(argv)
+
+    Config.MONGODB_URI = args.uri
+    Config.MONGODB_DB_NAME = args.db
+    Config.SLOW_QUERY_MS = 0
+    install_stubs(args.openai_delay, args.twilio_delay)
+    share_runtime()
+    # Harness threads touch session state outside a script run, which Streamlit warns about
+    # (a filter, since Streamlit resets logger levels whenever its config is patched)
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(
+        lambda record: record.levelno >= logging.ERROR)
+    from db_manager import DatabaseManager
+    try:
+        db_manager = DatabaseManager()
+        db_manager.connect()
+    except Exception as e:
+        print(f"❌ Could not connect to {args.uri}: {e}")
+        return 2
+
+    try:
+        print(f"ℹ️ Seeding {args.users} users x {args.days} days into {args.db}...")
+        user_ids = seed(db_manager._db, args.users, args.days)
+        users = [
+            {"user_id": str(user_id), "username": f"bench_user_{i}", "email": user_email(i)}
+            for i, user_id in enumerate(user_ids)
+        ]
+
+        # Services print status lines on every construction; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            queries = measure_queries(users, args.timeout)
+            memory = measure_memory(users, args.sessions, args.timeout)
+            load = run_load(users, args.sessions, args.reruns, args.timeout)
+    finally:
+        if not args.keep:
+            db_manager._client.drop_database(args.db)
+
+    print(f"\n{args.sessions} sessions x {args.reruns} reruns in {load['wall_seconds']:.1f}s "
+          f"({load['reruns_per_second']:.1f} reruns/s)")
+    print(f"{'page':<12}{'reruns':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'db calls':>10}{'commands':>10}")
+    for page, stats in load['pages'].items():
+        counts = queries.get(page, {})
+        print(f"{page:<12}{stats['reruns']:>8}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['p99_ms']:>10.1f}{counts.get('db_calls', ''):>10}{counts.get('commands', ''):>10}")
+    print(f"Memory per session: {memory['per_session_kib']:.0f} KiB (peak {memory['peak_kib']:.0f} KiB)")
+    if load['error_count']:
+        print(f"❌ {load['error_count']} rerun(s) failed, e.g. {load['errors'][0]}")
+
+    if args.out:
+        report = {"params": vars(args), "queries_per_rerun": queries, "memory": memory, **load}
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"✅ Report written to {args.out}")
+    return 1 if load['error_count'] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
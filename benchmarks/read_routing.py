@@ -0,0 +1,131 @@
+"""
+Read Routing Check
+Verifies against a multi-member replica set that analytics reads go to secondaries
+and interactive reads stay on the primary:
+
+    python benchmarks/read_routing.py --uri "mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0"
+
+Every command the DatabaseManager issues is recorded with the member that served it.
+Seeds and drops a scratch database. Exits 1 if any read went to the wrong kind of
+member, 2 if there is no replica set with a reachable secondary.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from pymongo import monitoring
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import Config
+from synthetic_data import seed, user_email
+
+class ServerListener(monitoring.CommandListener):
+    """Remembers the server address of every command"""
+
+    def __init__(self):
+        self.commands: List[Tuple[str, tuple]] = []
+
+    def started(self, event):
+        self.commands.append((event.command_name, event.connection_id))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def routing_cases(user_id: str, email: str) -> List[Tuple[str, Callable, str]]:
+    """(name, read, 'analytics' or 'primary') for the routed and the pinned reads"""
+    from datetime import datetime, timedelta
+    since = datetime.utcnow() - timedelta(days=7)
+    return [
+        ('get_health_entries(analytics)', lambda db: db.get_health_entries(user_id, 30, analytics=True), 'analytics'),
+        ('get_health_stats', lambda db: db.get_health_stats(user_id, 30, analytics=True), 'analytics'),
+        ('iter_health_entries(analytics)', lambda db: list(db.iter_health_entries(user_id, analytics=True)), 'analytics'),
+        ('iter_tips(analytics)', lambda db: list(db.iter_tips(user_id, analytics=True)), 'analytics'),
+        ('iter_user_ids', lambda db: list(db.iter_user_ids()), 'analytics'),
+        ('count_active_users', lambda db: db.count_active_users(since), 'analytics'),
+        ('get_all_users_count', lambda db: db.get_all_users_count(), 'analytics'),
+        ('get_health_entries', lambda db: db.get_health_entries(user_id, 30), 'primary'),
+        ('get_entry_by_date', lambda db: db.get_entry_by_date(user_id, datetime.utcnow()), 'primary'),
+        ('iter_health_entries', lambda db: list(db.iter_health_entries(user_id)), 'primary'),
+        ('get_user_by_email', lambda db: db.get_user_by_email(email), 'primary'),
+        ('get_rolling_metrics', lambda db: db.get_rolling_metrics(user_id), 'primary')
+    ]
+
+# Member type analytics reads should land on for each read preference ('nearest' may use either)
+EXPECTED_MEMBER = {
+    'primary': 'primary',
+    'primaryPreferred': 'primary',
+    'secondary': 'secondary',
+    'secondaryPreferred': 'secondary',
+    'nearest': None
+}
+
+def member_type(client, address) -> str:
+    description = client.topology_description.server_descriptions().get(address)
+    if description is None:
+        return 'unknown'
+    return {'RSPrimary': 'primary', 'RSSecondary': 'secondary'}.get(description.server_type_name, 'other')
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check read routing on a replica set")
+    parser.add_argument('--uri', default=Config.MONGODB_URI, help="Replica set URI")
+    parser.add_argument('--db', default='health_tracker_routing', help="Scratch database name")
+    parser.add_argument('--keep', action='store_true', help="Keep the seeded database afterwards")
+    args = parser.parse_args(argv)
+
+    Config.MONGODB_URI = args.uri
+    Config.MONGODB_DB_NAME = args.db
+    Config.SLOW_QUERY_MS = 0
+    print(f"ℹ️ Analytics reads: {Config.ANALYTICS_READ_PREFERENCE}, "
+          f"max staleness {Config.ANALYTICS_MAX_STALENESS_SECONDS}s")
+
+    # Global listeners apply to clients created afterwards
+    listener = ServerListener()
+    monitoring.register(listener)
+    from db_manager import DatabaseManager
+    try:
+        db_manager = DatabaseManager()
+        db_manager.connect()
+    except Exception as e:
+        print(f"❌ Could not connect to {args.uri}: {e}")
+        return 2
+
+    client = db_manager._client
+    # Give the client a moment to discover every member
+    deadline = time.monotonic() + 10
+    while not client.secondaries and time.monotonic() < deadline:
+        time.sleep(0.5)
+    if not client.secondaries:
+        print("❌ No reachable secondary; start a replica set with at least two data-bearing members")
+        return 2
+
+    mismatches = 0
+    try:
+        user_ids = seed(db_manager._db, users=2, days=30)
+        user_id = str(user_ids[0])
+        print(f"{'read':<34}{'expected':>10}{'served by':>22}")
+        for name, read, route in routing_cases(user_id, user_email(0)):
+            expected = EXPECTED_MEMBER.get(Config.ANALYTICS_READ_PREFERENCE) if route == 'analytics' else 'primary'
+            listener.commands.clear()
+            read(db_manager)
+            served = {member_type(client, address) for _, address in listener.commands}
+            ok = served == {expected} if expected else served <= {'primary', 'secondary'}
+            expected = expected or 'any'
+            mismatches += not ok
+            print(f"{'✅' if ok else '❌'} {name:<32}{expected:>10}{', '.join(sorted(served)):>22}")
+    finally:
+        if not args.keep:
+            client.drop_database(args.db)
+
+    print(f"{mismatches} read(s) routed to the wrong member")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
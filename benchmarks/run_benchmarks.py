@@ -0,0 +1,227 @@
+"""
+Benchmark Suite
+Times the service hot paths against a seeded local mongod and stores results as JSON:
+
+    python benchmarks/run_benchmarks.py --users 100 --days 365
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/<earlier>.json
+    python benchmarks/run_benchmarks.py --compare old.json new.json --threshold 0.15
+
+Each result file records the git commit it was measured at. --compare (or --baseline)
+prints the median change per benchmark and exits 1 when any benchmark slowed down by
+more than --threshold.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import Config
+from synthetic_data import PASSWORD, seed, user_email
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def git_revision() -> Dict:
+    """Commit sha of the working tree, and whether it has uncommitted changes"""
+    root = Path(__file__).parent.parent
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=root, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                             cwd=root, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "dirty": None}
+    return {"commit": sha, "dirty": dirty}
+
+def measure(func: Callable, repeat: int, number: int = 1, setup: Optional[Callable] = None) -> Dict:
+    """Time `number` calls of func per sample; setup runs untimed before each sample"""
+    func()  # Warm caches and lazy imports
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number * 1000)
+
+    samples.sort()
+    return {
+        "samples": repeat,
+        "calls_per_sample": number,
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "mean_ms": statistics.fmean(samples)
+    }
+
+def run_suite(db_manager, user_ids: List, repeat: int) -> Dict[str, Dict]:
+    """Run every benchmark; the database must already be seeded"""
+    from auth_service import AuthService
+    from health_service import HealthService
+    from helpers import Helpers
+    from streak_service import StreakService
+
+    health_service = HealthService()
+    streak_service = StreakService()
+    streak_service.use_pixela = False  # Never call out to Pixela from a benchmark
+    # Time the bcrypt paths themselves; auth.login_throttled covers the rejection
+    Config.LOGIN_THROTTLE = False
+    auth_service = AuthService()
+
+    # A user in the middle of the id range
+    index = len(user_ids) // 2
+    user_id = str(user_ids[index])
+    email = user_email(index)
+    year_of_entries = health_service.get_entries(user_id, days=365)
+    latest_entry = year_of_entries[0]
+
+    def reset_streak():
+        # Last login yesterday, so record_login takes the streak-increment path
+        db_manager._db.streaks.update_one(
+            {"user_id": user_ids[index]},
+            {"$set": {"last_login": datetime.utcnow() - timedelta(days=1)}}
+        )
+
+    def drop_rolling_metrics():
+        db_manager._db.rolling_metrics.delete_one({"user_id": user_ids[index]})
+
+    signups = iter(range(10 ** 9))
+
+    def signup():
+        n = next(signups)
+        auth_service.signup(f"bench_signup_{n}", f"bench_signup_{n}@example.com", "+15550000000", PASSWORD)
+
+    auth_repeat = max(3, repeat // 10)  # bcrypt dominates; keep the suite quick
+    
+    def exhaust_login_throttle():
+        # Spend the account's burst so every timed attempt is rejected before hashing
+        Config.LOGIN_THROTTLE = True
+        while auth_service.throttle.acquire(email)["allowed"]:
+            pass
+
+    cases = {
+        "health.get_statistics_30d": lambda: measure(
+            lambda: health_service.get_statistics(user_id, days=30), repeat),
+        "health.get_rolling_statistics_7d": lambda: measure(
+            lambda: health_service.get_rolling_statistics(user_id, window=7), repeat),
+        "health.rebuild_rolling_metrics": lambda: measure(
+            lambda: health_service.get_rolling_statistics(user_id, window=7), repeat,
+            setup=drop_rolling_metrics),
+        "health.get_weekly_trends": lambda: measure(
+            lambda: health_service.get_weekly_trends(user_id), repeat),
+        "health.calculate_health_score": lambda: measure(
+            lambda: health_service.calculate_health_score(latest_entry), repeat, number=1000),
+        "helpers.entries_to_dataframe_365d": lambda: measure(
+            lambda: Helpers.entries_to_dataframe(year_of_entries), repeat),
+        "streak.record_login": lambda: measure(
+            lambda: streak_service.record_login(user_id), repeat, setup=reset_streak),
+        "streak.record_login_already_logged": lambda: measure(
+            lambda: streak_service.record_login(user_id), repeat),
+        "auth.login": lambda: measure(
+            lambda: auth_service.login(email, PASSWORD), auth_repeat),
+        "auth.login_wrong_password": lambda: measure(
+            lambda: auth_service.login(email, "wrong-password"), auth_repeat),
+        "auth.login_unknown_email": lambda: measure(
+            lambda: auth_service.login("nobody@example.com", PASSWORD), auth_repeat),
+        "auth.signup": lambda: measure(signup, auth_repeat),
+        "auth.login_throttled": lambda: measure(
+            lambda: auth_service.login(email, "wrong-password"), repeat, setup=exhaust_login_throttle)
+    }
+
+    results = {}
+    for name, run in cases.items():
+        results[name] = run()
+        print(f"  {name:<40} median {results[name]['median_ms']:>9.3f} ms  p95 {results[name]['p95_ms']:>9.3f} ms")
+    return results
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> int:
+    """Print median changes between two result files; returns the number of regressions"""
+    print(f"Baseline {baseline['commit'][:10]}  ->  current {current['commit'][:10]}")
+    regressions = 0
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            print(f"  {name:<40} (new)")
+            continue
+        change = result['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0.0
+        marker = "  "
+        if change > threshold:
+            marker = "❌"
+            regressions += 1
+        elif change < -threshold:
+            marker = "✅"
+        print(f"{marker}{name:<40} {before['median_ms']:>9.3f} -> {result['median_ms']:>9.3f} ms ({change:+.1%})")
+
+    print(f"{regressions} regression(s) above {threshold:.0%}")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the service hot paths")
+    parser.add_argument('--uri', default=Config.MONGODB_URI, help="MongoDB URI (a local mongod)")
+    parser.add_argument('--db', default='health_tracker_bench_run', help="Scratch database name")
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--repeat', type=int, default=50, help="Samples per benchmark")
+    parser.add_argument('--out', help="Result file (default: benchmarks/results/<time>-<sha>.json)")
+    parser.add_argument('--baseline', help="Compare against this result file after running")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Only compare two existing result files")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative median slowdown that counts as a regression")
+    parser.add_argument('--keep', action='store_true', help="Keep the seeded database afterwards")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (json.loads(Path(path).read_text()) for path in args.compare)
+        return 1 if compare(baseline, current, args.threshold) else 0
+
+    Config.MONGODB_URI = args.uri
+    Config.MONGODB_DB_NAME = args.db
+    Config.SLOW_QUERY_MS = 0
+    from db_manager import DatabaseManager
+    try:
+        db_manager = DatabaseManager()
+        db_manager.connect()
+    except Exception as e:
+        print(f"❌ Could not connect to {args.uri}: {e}")
+        return 2
+
+    try:
+        print(f"ℹ️ Seeding {args.users} users x {args.days} days into {args.db}...")
+        user_ids = seed(db_manager._db, args.users, args.days)
+        print("ℹ️ Running benchmarks...")
+        results = run_suite(db_manager, user_ids, args.repeat)
+    finally:
+        if not args.keep:
+            db_manager._client.drop_database(args.db)
+
+    report = {
+        **git_revision(),
+        "timestamp": datetime.utcnow().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"users": args.users, "days": args.days, "repeat": args.repeat},
+        "results": results
+    }
+
+    out = Path(args.out) if args.out else RESULTS_DIR / (
+        f"{datetime.utcnow():%Y%m%dT%H%M%S}-{report['commit'][:10]}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"✅ Results written to {out}")
+
+    if args.baseline:
+        return 1 if compare(json.loads(Path(args.baseline).read_text()), report, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,190 @@
+"""
+Synthetic Data Generator
+Seeds a MongoDB database with N users x M days of realistic entries, streaks and tips:
+
+    python benchmarks/synthetic_data.py --users 100 --days 365 --db health_tracker_bench
+
+Data is deterministic for a given --seed. Each user gets a baseline (an active or
+sedentary walker, a short or long sleeper, a resting heart rate) with weekday/weekend
+variation, day-to-day noise and occasional missed days, so aggregations and charts see
+realistic shapes rather than uniform noise.
+"""
+
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import bcrypt
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import Config
+
+# Every synthetic user shares this password (hashed once: bcrypt is deliberately slow)
+PASSWORD = "benchmark-password"
+
+TIP_CATEGORIES = ['activity', 'sleep', 'hydration', 'nutrition', 'heart']
+
+TIP_TEXTS = {
+    'activity': "Take a 10-minute walk after lunch to add steps without a workout.",
+    'sleep': "Keep a consistent bedtime, even on weekends.",
+    'hydration': "Keep a water bottle on your desk and refill it twice a day.",
+    'nutrition': "Add a serving of vegetables to your largest meal.",
+    'heart': "Try five minutes of slow breathing when you feel stressed."
+}
+
+def user_email(index: int) -> str:
+    return f"bench_user_{index}@example.com"
+
+def generate_users(count: int, created_at: datetime) -> List[Dict]:
+    """User documents sharing one bcrypt hash of PASSWORD"""
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return [
+        {
+            "username": f"bench_user_{i}",
+            "email": user_email(i),
+            "phone": f"+1555{i:07d}",
+            "password_hash": password_hash,
+            "created_at": created_at,
+            "updated_at": created_at
+        }
+        for i in range(count)
+    ]
+
+def generate_entries(user_id, days: int, today: datetime, rng: np.random.Generator,
+                     missing_rate: float = 0.1) -> List[Dict]:
+    """Daily entries for one user, oldest first, with some days skipped"""
+    dates = [today - timedelta(days=days - 1 - d) for d in range(days)]
+    weekend = np.array([date.weekday() >= 5 for date in dates])
+
+    # Per-user baselines
+    base_steps = rng.normal(8000, 2500)
+    base_sleep = rng.normal(7.0, 0.6)
+    base_heart_rate = rng.normal(68, 7)
+    base_water = rng.normal(7, 2)
+
+    steps = np.clip(rng.normal(base_steps, 2000, days) * np.where(weekend, 0.8, 1.0), 300, 40000)
+    sleep = np.clip(rng.normal(base_sleep, 0.8, days) + np.where(weekend, 0.7, 0.0), 3, 12)
+    heart_rate = np.clip(rng.normal(base_heart_rate, 4, days) - (sleep - base_sleep) * 1.5, 40, 120)
+    water = np.clip(rng.normal(base_water, 1.5, days), 0, 20)
+    # Active days burn more
+    calories = np.clip(1600 + steps * 0.05 + rng.normal(0, 150, days), 1000, 5000)
+    logged = rng.random(days) >= missing_rate
+
+    return [
+        {
+            "user_id": user_id,
+            "date": dates[d],
+            "steps": int(steps[d]),
+            "calories": int(calories[d]),
+            "heart_rate": int(heart_rate[d]),
+            "sleep_hours": round(float(sleep[d]), 1),
+            "water_intake": int(round(water[d])),
+            "notes": "",
+            "created_at": dates[d] + timedelta(hours=21)
+        }
+        for d in range(days) if logged[d]
+    ]
+
+def generate_streak(user_id, entries: List[Dict]) -> Dict:
+    """A streak document consistent with the days the user logged"""
+    login_days = [entry['date'].date() for entry in entries]
+    current = longest = 0
+    previous = None
+    for day in login_days:
+        current = current + 1 if previous and day - previous == timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+
+    last_login = entries[-1]['created_at'] if entries else datetime.utcnow()
+    return {
+        "user_id": user_id,
+        "current_streak": current,
+        "longest_streak": longest,
+        "last_login": last_login,
+        "login_dates": [day.isoformat() for day in login_days[-365:]],
+        "updated_at": last_login
+    }
+
+def generate_tips(user_id, days: int, today: datetime, rng: np.random.Generator) -> List[Dict]:
+    """Roughly two tips a week"""
+    tips = []
+    for d in range(days):
+        if rng.random() < 2 / 7:
+            category = TIP_CATEGORIES[int(rng.integers(len(TIP_CATEGORIES)))]
+            tips.append({
+                "user_id": user_id,
+                "tip_text": TIP_TEXTS[category],
+                "category": category,
+                "created_at": today - timedelta(days=d, hours=int(rng.integers(0, 12)))
+            })
+    return tips
+
+def seed(database, users: int, days: int, seed_value: int = 42, batch_size: int = 5000) -> List:
+    """Insert synthetic data; returns the new user ids in creation order"""
+    rng = np.random.default_rng(seed_value)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    user_ids = database.users.insert_many(generate_users(users, today - timedelta(days=days))).inserted_ids
+
+    entries, tips, streaks = [], [], []
+    for user_id in user_ids:
+        user_entries = generate_entries(user_id, days, today, rng)
+        entries.extend(user_entries)
+        tips.extend(generate_tips(user_id, days, today, rng))
+        streaks.append(generate_streak(user_id, user_entries))
+
+        if len(entries) >= batch_size:
+            database.health_entries.insert_many(entries, ordered=False)
+            entries = []
+        if len(tips) >= batch_size:
+            database.tips.insert_many(tips, ordered=False)
+            tips = []
+
+    if entries:
+        database.health_entries.insert_many(entries, ordered=False)
+    if tips:
+        database.tips.insert_many(tips, ordered=False)
+    if streaks:
+        database.streaks.insert_many(streaks, ordered=False)
+    return user_ids
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Seed a database with synthetic health data")
+    parser.add_argument('--uri', default=Config.MONGODB_URI, help="MongoDB URI (a local mongod)")
+    parser.add_argument('--db', default='health_tracker_bench', help="Database to seed")
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--drop', action='store_true', help="Drop the database before seeding")
+    args = parser.parse_args(argv)
+
+    Config.MONGODB_URI = args.uri
+    Config.MONGODB_DB_NAME = args.db
+    from db_manager import DatabaseManager
+    try:
+        db_manager = DatabaseManager()
+        db_manager.connect()
+    except Exception as e:
+        print(f"❌ Could not connect to {args.uri}: {e}")
+        return 2
+
+    if args.drop:
+        db_manager._client.drop_database(args.db)
+        # Recreate the app's indexes on the fresh database
+        db_manager._setup_collections(db_manager._db)
+        db_manager._setup_indexes(db_manager._db)
+
+    started = datetime.utcnow()
+    user_ids = seed(db_manager._db, args.users, args.days, args.seed)
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    print(f"✅ Seeded {len(user_ids)} users x {args.days} days into {args.db} in {elapsed:.1f}s "
+          f"(password: {PASSWORD})")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
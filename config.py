@@ -4,30 +4,73 @@ Handles environment variables and application settings
 """
 
 import os
-from dotenv import load_dotenv
+import threading
 
-# Load environment variables (override any existing system env to avoid stale values)
-load_dotenv(override=True)
+_env_loaded = False
+_env_lock = threading.Lock()
+
+def _load_env():
+    """Load .env once, on first access to a setting"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            # Override any existing system env to avoid stale values
+            load_dotenv(override=True)
+            _env_loaded = True
+
+def _flag(value: str) -> bool:
+    return value.lower() == 'true'
+
+def _email_list(value: str) -> list:
+    return [e.strip().lower() for e in value.split(',') if e.strip()]
+
+class EnvSetting:
+    """Class attribute read from the environment on first access, then cached.
+
+    The first read loads .env and replaces the descriptor with the value, so later
+    reads are plain attribute lookups and assignments (e.g. in tools) just work.
+    """
+
+    def __init__(self, name: str, default: str, cast=str):
+        self.name = name
+        self.default = default
+        self.cast = cast
+
+    def __set_name__(self, owner, attr):
+        self.attr = attr
+
+    def __get__(self, instance, owner):
+        _load_env()
+        value = self.cast(os.getenv(self.name, self.default))
+        setattr(owner, self.attr, value)
+        return value
 
 class Config:
     """Application configuration"""
     
     # MongoDB Configuration
-    MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
-    MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'health_tracker_db')
+    MONGODB_URI = EnvSetting('MONGODB_URI', 'mongodb://localhost:27017/')
+    MONGODB_DB_NAME = EnvSetting('MONGODB_DB_NAME', 'health_tracker_db')
+    
+    # Storage backend: 'mongodb', or 'sqlite' for an embedded database file (core features only)
+    STORAGE_BACKEND = EnvSetting('STORAGE_BACKEND', 'mongodb')
+    SQLITE_PATH = EnvSetting('SQLITE_PATH', 'health_tracker.db')
     
     # OpenAI Configuration
-    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
-    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    OPENAI_API_KEY = EnvSetting('OPENAI_API_KEY', '')
+    OPENAI_MODEL = EnvSetting('OPENAI_MODEL', 'gpt-3.5-turbo')
     
     # Twilio Configuration
-    TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID', '')
-    TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN', '')
-    TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER', '')
+    TWILIO_ACCOUNT_SID = EnvSetting('TWILIO_ACCOUNT_SID', '')
+    TWILIO_AUTH_TOKEN = EnvSetting('TWILIO_AUTH_TOKEN', '')
+    TWILIO_PHONE_NUMBER = EnvSetting('TWILIO_PHONE_NUMBER', '')
     
     # Pixela Configuration
-    PIXELA_USERNAME = os.getenv('PIXELA_USERNAME', '')
-    PIXELA_TOKEN = os.getenv('PIXELA_TOKEN', '')
+    PIXELA_USERNAME = EnvSetting('PIXELA_USERNAME', '')
+    PIXELA_TOKEN = EnvSetting('PIXELA_TOKEN', '')
     
     # Application Settings
     APP_NAME = "Health Tracker Pro"
@@ -39,6 +82,87 @@ class Config:
     DEFAULT_SLEEP_GOAL = 8  # hours
     DEFAULT_CALORIE_GOAL = 2000
     
+    # Read routing: analytics, export and batch reads go to secondaries ('primary' disables)
+    ANALYTICS_READ_PREFERENCE = EnvSetting('ANALYTICS_READ_PREFERENCE', 'secondaryPreferred')
+    ANALYTICS_MAX_STALENESS_SECONDS = EnvSetting('ANALYTICS_MAX_STALENESS_SECONDS', '120', int)  # -1: no bound
+    
+    # Derived data (rollups, milestones, cache versions): maintained on each write
+    # ('inline') or by the change-stream consumer in event_bus.py ('events')
+    DERIVED_DATA_MODE = EnvSetting('DERIVED_DATA_MODE', 'inline', str.lower)
+    
+    # Goal Milestones
+    MILESTONE_SMS_ALERTS = EnvSetting('MILESTONE_SMS_ALERTS', 'true', _flag)
+    
+    # Notification Queue (drained by notification_worker.py)
+    NOTIFICATION_POLL_SECONDS = EnvSetting('NOTIFICATION_POLL_SECONDS', '5', float)
+    NOTIFICATION_LEASE_SECONDS = EnvSetting('NOTIFICATION_LEASE_SECONDS', '60', int)
+    NOTIFICATION_MAX_ATTEMPTS = EnvSetting('NOTIFICATION_MAX_ATTEMPTS', '5', int)
+    NOTIFICATION_RETENTION_DAYS = EnvSetting('NOTIFICATION_RETENTION_DAYS', '30', int)
+    
+    # Daily Reminders (sent by reminder_scheduler.py through the notification queue)
+    REMINDER_DEFAULT_TIME = EnvSetting('REMINDER_DEFAULT_TIME', '20:00')
+    REMINDER_BATCH_SIZE = EnvSetting('REMINDER_BATCH_SIZE', '500', int)
+    REMINDER_POLL_SECONDS = EnvSetting('REMINDER_POLL_SECONDS', '60', float)
+    REMINDER_MAX_LATE_MINUTES = EnvSetting('REMINDER_MAX_LATE_MINUTES', '120', int)  # Older ones are skipped
+    
+    # Anomaly Detection
+    ANOMALY_EWMA_ALPHA = EnvSetting('ANOMALY_EWMA_ALPHA', '0.1', float)
+    ANOMALY_Z_THRESHOLD = EnvSetting('ANOMALY_Z_THRESHOLD', '3.0', float)
+    ANOMALY_MIN_SAMPLES = EnvSetting('ANOMALY_MIN_SAMPLES', '7', int)
+    ANOMALY_SMS_ALERTS = EnvSetting('ANOMALY_SMS_ALERTS', 'false', _flag)
+    
+    # Metric Correlations (analytics page and the nightly batch in correlation_service.py)
+    CORRELATION_MAX_LAG = EnvSetting('CORRELATION_MAX_LAG', '7', int)  # Days
+    CORRELATION_MIN_DAYS = EnvSetting('CORRELATION_MIN_DAYS', '14', int)  # Paired days needed per coefficient
+    CORRELATION_MIN_STRENGTH = EnvSetting('CORRELATION_MIN_STRENGTH', '0.3', float)  # |r| worth pointing out
+    CORRELATION_BATCH_SIZE = EnvSetting('CORRELATION_BATCH_SIZE', '200', int)  # Users per write
+    CORRELATION_CACHE_SECONDS = EnvSetting('CORRELATION_CACHE_SECONDS', '3600', int)  # Analytics page cache
+    
+    # Next-Week Forecasts (nightly batch in forecast_service.py, shown as dashboard targets)
+    FORECAST_HISTORY_WEEKS = EnvSetting('FORECAST_HISTORY_WEEKS', '8', int)
+    FORECAST_SEASONS = EnvSetting('FORECAST_SEASONS', '4', int)  # Recent weeks averaged by the seasonal model
+    FORECAST_ALPHA = EnvSetting('FORECAST_ALPHA', '0.3', float)  # Exponential smoothing factor
+    FORECAST_MIN_DAYS = EnvSetting('FORECAST_MIN_DAYS', '7', int)  # Logged days needed per metric
+    FORECAST_BATCH_SIZE = EnvSetting('FORECAST_BATCH_SIZE', '1000', int)  # Users fitted together
+    
+    # Intraday Samples
+    INTRADAY_BATCH_SIZE = EnvSetting('INTRADAY_BATCH_SIZE', '5000', int)
+    
+    # Ingestion Service (device sync)
+    INGEST_HOST = EnvSetting('INGEST_HOST', '127.0.0.1')
+    INGEST_PORT = EnvSetting('INGEST_PORT', '8600', int)
+    INGEST_API_TOKEN = EnvSetting('INGEST_API_TOKEN', '')
+    INGEST_QUEUE_SIZE = EnvSetting('INGEST_QUEUE_SIZE', '100', int)
+    INGEST_WORKERS = EnvSetting('INGEST_WORKERS', '4', int)
+    INGEST_MAX_BATCH = EnvSetting('INGEST_MAX_BATCH', '1000', int)
+    INGEST_MAX_BODY_BYTES = EnvSetting('INGEST_MAX_BODY_BYTES', str(5 * 1024 * 1024), int)
+    
+    # Archival: entries older than this move to monthly buckets (0 disables archiving).
+    # Lowering it is safe; raising it hides months archived under the old value from short windows.
+    ARCHIVE_AFTER_DAYS = EnvSetting('ARCHIVE_AFTER_DAYS', '400', int)
+    
+    # Login Throttling: token buckets per account and per source, checked before hashing
+    LOGIN_THROTTLE = EnvSetting('LOGIN_THROTTLE', 'true', _flag)
+    LOGIN_ACCOUNT_BURST = EnvSetting('LOGIN_ACCOUNT_BURST', '5', int)
+    LOGIN_ACCOUNT_PER_MINUTE = EnvSetting('LOGIN_ACCOUNT_PER_MINUTE', '5', float)
+    LOGIN_SOURCE_BURST = EnvSetting('LOGIN_SOURCE_BURST', '20', int)
+    LOGIN_SOURCE_PER_MINUTE = EnvSetting('LOGIN_SOURCE_PER_MINUTE', '30', float)
+    LOGIN_THROTTLE_WINDOW_SECONDS = EnvSetting('LOGIN_THROTTLE_WINDOW_SECONDS', '60', int)  # Shared counter window
+    TRUST_PROXY_HEADERS = EnvSetting('TRUST_PROXY_HEADERS', 'false', _flag)  # Source from X-Forwarded-For
+    
+    # Data Export
+    EXPORT_BATCH_SIZE = EnvSetting('EXPORT_BATCH_SIZE', '2000', int)
+    
+    # Admin
+    ADMIN_EMAILS = EnvSetting('ADMIN_EMAILS', '', _email_list)
+    ADMIN_METRICS_TTL_SECONDS = EnvSetting('ADMIN_METRICS_TTL_SECONDS', '30', int)
+    
+    # Instrumentation
+    DEBUG_METRICS = EnvSetting('DEBUG_METRICS', 'false', _flag)
+    SLOW_QUERY_MS = EnvSetting('SLOW_QUERY_MS', '200', int)  # 0 disables slow-query logging
+    METRICS_HOST = EnvSetting('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = EnvSetting('METRICS_PORT', '0', int)  # Prometheus exporter in the app process; 0 disables
+    
     # Session Configuration
     SESSION_COOKIE_NAME = "health_tracker_session"
     SESSION_EXPIRY_DAYS = 30
@@ -57,6 +181,11 @@ class Config:
         
         return errors
     
+    @classmethod
+    def is_admin(cls, email):
+        """Check if an email belongs to an administrator"""
+        return bool(email) and email.lower() in cls.ADMIN_EMAILS
+    
     @classmethod
     def is_feature_enabled(cls, feature):
         """Check if a feature is enabled based on configuration"""
@@ -0,0 +1,174 @@
+"""
+Correlation Service
+Same-day and lagged correlations between a user's daily metrics over their full history:
+
+    python correlation_service.py                      # recompute every user (e.g. nightly from cron)
+    python correlation_service.py --user-id 65f0c0ffee...
+
+Each user's history becomes one day-by-metric array, with missing days left as
+NaN, so a lag of k is a shift by k rows. Pearson coefficients over pairwise
+complete days are computed for all metric pairs at once with a few matrix
+products. The analytics page shows the results; with the MongoDB backend the
+nightly batch stores them per user, tagged with the data version they were
+computed from, and the page reuses them while that version is current.
+"""
+
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from bson import ObjectId
+from config import Config
+from event_bus import derived_cache
+from rolling_metrics import ROLLING_METRICS
+from storage_backend import get_storage, storage_supports
+
+if TYPE_CHECKING:
+    import numpy as np
+
+CORRELATION_METRICS = ROLLING_METRICS
+
+def daily_values(entries) -> "np.ndarray":
+    """Days x metrics array from oldest-first entries, NaN for days and values not logged"""
+    import numpy as np
+
+    rows = [
+        (entry['date'].toordinal(), [entry.get(metric) for metric in CORRELATION_METRICS])
+        for entry in entries
+    ]
+    if not rows:
+        return np.empty((0, len(CORRELATION_METRICS)))
+
+    days = np.array([day for day, _ in rows])
+    values = np.array([row for _, row in rows], dtype=float)  # None becomes NaN
+    first = days.min()
+    daily = np.full((days.max() - first + 1, len(CORRELATION_METRICS)), np.nan)
+    daily[days - first] = values
+    return daily
+
+def pairwise_correlation(a: "np.ndarray", b: "np.ndarray", min_periods: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Pearson r of every column of `a` with every column of `b` over rows where both are present.
+
+    Returns (r, n), both shaped (a columns, b columns); r is NaN where fewer
+    than `min_periods` rows pair up or either side is constant.
+    """
+    import numpy as np
+
+    def centered(x):
+        # Centering keeps the sums of squares small (steps are in the thousands)
+        present = ~np.isnan(x)
+        filled = np.where(present, x, 0.0)
+        mean = filled.sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+        return np.where(present, filled - mean, 0.0), present.astype(float)
+
+    a0, fa = centered(a)
+    b0, fb = centered(b)
+
+    n = fa.T @ fb
+    sum_a, sum_b = a0.T @ fb, fa.T @ b0
+    cov = n * (a0.T @ b0) - sum_a * sum_b
+    var = (n * ((a0 * a0).T @ fb) - sum_a ** 2) * (n * (fa.T @ (b0 * b0)) - sum_b ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.clip(cov / np.sqrt(var), -1.0, 1.0)
+    r[(n < min_periods) | ~(var > 0)] = np.nan
+    return r, n
+
+def correlate(daily: "np.ndarray", max_lag: int, min_periods: int) -> Dict:
+    """Same-day matrix and, for each lag k, r[i][j] of metric i with metric j k days later"""
+    import numpy as np
+
+    metrics = len(CORRELATION_METRICS)
+    matrix, counts = pairwise_correlation(daily, daily, min_periods)
+    lagged = np.full((max_lag, metrics, metrics), np.nan)
+    lagged_counts = np.zeros((max_lag, metrics, metrics))
+    for lag in range(1, min(max_lag, len(daily) - 1) + 1):
+        lagged[lag - 1], lagged_counts[lag - 1] = pairwise_correlation(daily[:-lag], daily[lag:], min_periods)
+    return {"matrix": matrix, "counts": counts, "lagged": lagged, "lagged_counts": lagged_counts}
+
+def strongest(result: Dict, min_strength: float, limit: int = 5) -> List[Dict]:
+    """The strongest same-day and next-day relations between different metrics"""
+    import numpy as np
+
+    candidates = []
+    for lag, r, n in ((0, result["matrix"], result["counts"]), (1, result["lagged"][0], result["lagged_counts"][0])):
+        for i, j in zip(*np.nonzero(np.abs(np.nan_to_num(r)) >= min_strength)):
+            if i == j or (lag == 0 and i > j):
+                continue  # Skip a metric with itself, and the mirror half of the same-day matrix
+            candidates.append({"metric": CORRELATION_METRICS[i], "other": CORRELATION_METRICS[j], "lag": lag,
+                               "r": round(float(r[i, j]), 3), "days": int(n[i, j])})
+    return sorted(candidates, key=lambda c: -abs(c["r"]))[:limit]
+
+def _to_lists(array: "np.ndarray") -> List:
+    """Nested lists with None for NaN, as stored in MongoDB"""
+    import numpy as np
+    return np.where(np.isnan(array), None, np.round(array, 3)).tolist()
+
+class CorrelationService:
+    """How a user's metrics move together, on the same day and days apart"""
+
+    def __init__(self):
+        self.db = get_storage()
+
+    def compute(self, user_id: str, data_version: Optional[int] = None) -> Dict:
+        """Correlations over the user's full history"""
+        import numpy as np
+
+        daily = daily_values(self.db.iter_health_entries(user_id, analytics=True))
+        result = correlate(daily, Config.CORRELATION_MAX_LAG, Config.CORRELATION_MIN_DAYS)
+        return {
+            "user_id": ObjectId(user_id),
+            "metrics": CORRELATION_METRICS,
+            "days": int(np.any(~np.isnan(daily), axis=1).sum()),
+            "matrix": _to_lists(result["matrix"]),
+            "lagged": _to_lists(result["lagged"]),
+            "findings": strongest(result, Config.CORRELATION_MIN_STRENGTH),
+            "data_version": data_version,
+            "computed_at": datetime.utcnow()
+        }
+
+    def get_correlations(self, user_id: str) -> Dict:
+        """The user's correlations: cached, stored by the nightly batch, or computed now"""
+        return derived_cache.get_or_compute(user_id, 'health_entries', ('correlations',),
+                                            lambda: self._load_or_compute(user_id))
+
+    def _load_or_compute(self, user_id: str) -> Dict:
+        # Stored results are only trusted when versions are maintained (events mode) and match
+        version = derived_cache.version(user_id, 'health_entries')
+        if version is not None and self.db.supports('correlations'):
+            stored = self.db.get_correlations(user_id)
+            if stored and stored.get('data_version') == version:
+                return stored
+        return self.compute(user_id, version)
+
+    def compute_all(self, user_ids: Optional[List[str]] = None) -> Dict:
+        """Recompute and store every user's correlations (or the given users'), a chunk per write"""
+        totals = {"users": 0, "saved": 0}
+        chunk = []
+        for user_id in user_ids or self.db.iter_user_ids():
+            user_id = str(user_id)
+            # Read the version first: a write during the computation then leaves the result stale, never wrong
+            chunk.append(self.compute(user_id, derived_cache.version(user_id, 'health_entries')))
+            if len(chunk) >= Config.CORRELATION_BATCH_SIZE:
+                totals["saved"] += self.db.save_correlations(chunk)
+                totals["users"] += len(chunk)
+                chunk = []
+        totals["saved"] += self.db.save_correlations(chunk)
+        totals["users"] += len(chunk)
+        return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--user-id', action='append', help="Limit to these users (repeatable; default: all)")
+    args = parser.parse_args()
+
+    if not storage_supports('correlations'):
+        print("❌ Stored correlations need the MongoDB storage backend (STORAGE_BACKEND=mongodb)")
+        return 1
+
+    started = datetime.utcnow()
+    totals = CorrelationService().compute_all(args.user_id)
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    print(f"✅ Computed correlations for {totals['users']:,} users in {elapsed:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
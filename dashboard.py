@@ -4,22 +4,26 @@ Displays user's key health stats, progress, and streaks
 """
 
 import streamlit as st
+from datetime import datetime, timedelta
+from forecast_service import ForecastService
+from goals_service import GOAL_LABELS
 from health_service import HealthService
 from openai_service import OpenAIService
 from streak_service import StreakService
 from helpers import Helpers
+from service_registry import get_service
 
 def render(user_id):
-    health_service = HealthService()
-    ai_service = OpenAIService()
-    streak_service = StreakService()
+    health_service = get_service(HealthService)
+    ai_service = get_service(OpenAIService)
+    streak_service = get_service(StreakService)
 
     # Header
     st.markdown('<div class="main-header">📊 Your Health Dashboard</div>', unsafe_allow_html=True)
     st.markdown('<div class="sub-header">Your weekly snapshot, progress, and motivation in one place.</div>', unsafe_allow_html=True)
 
     # Weekly metrics
-    stats = health_service.get_statistics(user_id, days=7)
+    stats = health_service.get_rolling_statistics(user_id, window=7)
     m1, m2, m3, m4, m5 = st.columns(5)
     with m1:
         st.markdown(f"""
@@ -57,10 +61,22 @@ def render(user_id):
         </div>
         """, unsafe_allow_html=True)
 
+    today_entry = health_service.get_today_entry(user_id)
+
+    # Today's targets from the nightly next-week forecast
+    targets = get_service(ForecastService).get_targets(user_id)
+    if targets:
+        st.markdown("#### 🎯 Today's Targets")
+        for column, (metric, target) in zip(st.columns(len(targets)), targets.items()):
+            label, unit = GOAL_LABELS[metric]
+            actual = (today_entry or {}).get(metric) or 0
+            with column:
+                st.progress(min(1.0, actual / target) if target > 0 else 1.0,
+                            text=f"{label}: {actual:,g} of {target:,g} {unit}")
+
     # Today's score and streak
     c1, c2 = st.columns([1.2, 1])
     with c1:
-        today_entry = health_service.get_today_entry(user_id)
         if today_entry:
             score = health_service.calculate_health_score(today_entry)
             status, icon, txt = Helpers.get_health_status(score)
@@ -88,6 +104,15 @@ def render(user_id):
             </div>
             """, unsafe_allow_html=True)
 
+    # Unusual readings in the last week
+    for anomaly in health_service.anomalies.get_recent_anomalies(user_id, days=7):
+        st.warning(f"⚠️ {health_service.anomalies.describe(anomaly)}")
+
+    # Goal milestones reached in the last week
+    for milestone in health_service.goals.get_recent_milestones(user_id, limit=3):
+        if milestone['date'] >= datetime.utcnow() - timedelta(days=7):
+            st.success(health_service.goals.describe(milestone))
+
     # AI tip of the day
     ai_tip = ai_service.generate_health_tip(user_id, stats)
     if ai_tip["success"]:
@@ -3,58 +3,211 @@ MongoDB Database Manager
 Handles all database operations with connection pooling
 """
 
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.errors import ConnectionFailure, DuplicateKeyError
+import os
+import threading
+from pymongo import MongoClient, ASCENDING, DESCENDING, DeleteOne, ReturnDocument, UpdateOne
+from pymongo.read_preferences import Nearest, PrimaryPreferred, ReadPreference, Secondary, SecondaryPreferred
+from pymongo.errors import CollectionInvalid, ConnectionFailure, DuplicateKeyError
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import streamlit as st
+from typing import Dict, Iterator, List, Optional, Tuple
 from config import Config
+from instrumentation import instrument_methods, CommandTimingListener, PoolWaitListener
+from query_analysis import SlowQueryListener
+from models import ARCHIVED_ENTRY_FIELDS, EntryArchiveBucket
+from storage_backend import StorageBackend, CAPABILITIES
 
-class DatabaseManager:
-    """Singleton database manager for MongoDB operations"""
+# Read preferences allowed for analytics reads; 'primary' turns routing off
+ANALYTICS_READ_PREFERENCES = {
+    'primary': None,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest
+}
+
+# Smallest maxStalenessSeconds MongoDB accepts
+MIN_MAX_STALENESS_SECONDS = 90
+
+@instrument_methods
+class DatabaseManager(StorageBackend):
+    """Singleton database manager for MongoDB operations (the default storage backend)"""
     
+    CAPABILITIES = frozenset(CAPABILITIES)
     _instance = None
-    _client = None
-    _db = None
+    _connection = None  # (client, database, analytics database) once connected
+    _lock = threading.RLock()
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(DatabaseManager, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(DatabaseManager, cls).__new__(cls)
         return cls._instance
     
     def __init__(self):
-        """Initialize database connection"""
-        if self._client is None:
+        """Create the manager; the connection is opened on first database access"""
+    
+    def connect(self):
+        """Open the database connection and set up collections and indexes (idempotent)"""
+        if self._connection is not None:
+            return
+        with self._lock:
+            if self._connection is not None:
+                return
+            client = None
             try:
-                self._client = MongoClient(
+                listeners = [CommandTimingListener(), PoolWaitListener()]
+                slow_queries = SlowQueryListener(Config.SLOW_QUERY_MS) if Config.SLOW_QUERY_MS > 0 else None
+                if slow_queries:
+                    listeners.append(slow_queries)
+                client = MongoClient(
                     Config.MONGODB_URI,
                     serverSelectionTimeoutMS=5000,
-                    maxPoolSize=50
+                    maxPoolSize=50,
+                    event_listeners=listeners
                 )
+                if slow_queries:
+                    slow_queries.attach(client)
                 # Test connection
-                self._client.admin.command('ping')
-                self._db = self._client[Config.MONGODB_DB_NAME]
-                self._setup_indexes()
+                client.admin.command('ping')
+                connection = (
+                    client,
+                    client[Config.MONGODB_DB_NAME],
+                    client.get_database(Config.MONGODB_DB_NAME, read_preference=self._analytics_read_preference())
+                )
+                self._setup_collections(connection[1])
+                self._setup_indexes(connection[1])
+                # Published last: other threads skip the lock once it is set
+                self._connection = connection
                 print("✅ MongoDB connected successfully")
-            except ConnectionFailure as e:
-                print(f"❌ MongoDB connection failed: {e}")
+            except Exception as e:
+                if client is not None:
+                    client.close()
+                label = "connection" if isinstance(e, ConnectionFailure) else "setup"
+                print(f"❌ MongoDB {label} failed: {e}")
                 raise
     
-    def _setup_indexes(self):
+    @property
+    def _client(self):
+        if self._connection is None:
+            self.connect()
+        return self._connection[0]
+    
+    @property
+    def _db(self):
+        if self._connection is None:
+            self.connect()
+        return self._connection[1]
+    
+    @property
+    def _analytics_db(self):
+        """Database handle for analytics, export and batch reads (secondaries when available)"""
+        if self._connection is None:
+            self.connect()
+        return self._connection[2]
+    
+    def _reader(self, analytics: bool):
+        # Interactive and read-your-writes paths always read from the primary
+        return self._analytics_db if analytics else self._db
+    
+    @staticmethod
+    def _analytics_read_preference():
+        """Read preference for analytics reads, from ANALYTICS_READ_PREFERENCE / ANALYTICS_MAX_STALENESS_SECONDS"""
+        mode = Config.ANALYTICS_READ_PREFERENCE
+        if mode not in ANALYTICS_READ_PREFERENCES:
+            print(f"⚠️ Unknown ANALYTICS_READ_PREFERENCE '{mode}'; analytics reads use the primary")
+            return ReadPreference.PRIMARY
+        if mode == 'primary':
+            return ReadPreference.PRIMARY
+        
+        max_staleness = Config.ANALYTICS_MAX_STALENESS_SECONDS
+        if 0 <= max_staleness < MIN_MAX_STALENESS_SECONDS:
+            # The server rejects smaller bounds (they must exceed the heartbeat interval)
+            print(f"⚠️ ANALYTICS_MAX_STALENESS_SECONDS raised to the minimum of {MIN_MAX_STALENESS_SECONDS}")
+            max_staleness = MIN_MAX_STALENESS_SECONDS
+        return ANALYTICS_READ_PREFERENCES[mode](max_staleness=max_staleness)
+    
+    @classmethod
+    def shutdown(cls):
+        """Close the shared connection; the next query reconnects"""
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.close_connection()
+    
+    @classmethod
+    def _reset_after_fork(cls):
+        # A MongoClient must not be shared across fork; the child connects afresh
+        cls._lock = threading.RLock()
+        cls._instance = None
+    
+    def _setup_collections(self, db):
+        """Create collections that need explicit options"""
+        if "intraday_samples" not in db.list_collection_names():
+            try:
+                # Time-series collection: samples are bucketed per user, keeping
+                # thousands of per-minute readings per day compact on disk
+                db.create_collection(
+                    "intraday_samples",
+                    timeseries={"timeField": "ts", "metaField": "user_id", "granularity": "minutes"}
+                )
+            except CollectionInvalid:
+                pass  # Created concurrently by another process
+    
+    def _setup_indexes(self, db):
         """Create database indexes for better performance"""
         # Users collection indexes
-        self._db.users.create_index([("email", ASCENDING)], unique=True)
-        self._db.users.create_index([("username", ASCENDING)], unique=True)
+        db.users.create_index([("email", ASCENDING)], unique=True)
+        db.users.create_index([("username", ASCENDING)], unique=True)
+        # Only users with reminders enabled have a next send time
+        db.users.create_index([("reminder.next_send_at", ASCENDING)], sparse=True)
         
         # Health entries collection indexes
-        self._db.health_entries.create_index([("user_id", ASCENDING), ("date", DESCENDING)])
-        self._db.health_entries.create_index([("user_id", ASCENDING)])
+        db.health_entries.create_index([("user_id", ASCENDING), ("date", DESCENDING)])
+        db.health_entries.create_index([("user_id", ASCENDING)])
         
         # Streaks collection indexes
-        self._db.streaks.create_index([("user_id", ASCENDING)], unique=True)
+        db.streaks.create_index([("user_id", ASCENDING)], unique=True)
+        db.streaks.create_index([("last_login", DESCENDING)])
+        
+        # Tips collection indexes (keyset paging: _id breaks created_at ties)
+        db.tips.create_index([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+        db.tips.create_index(
+            [("user_id", ASCENDING), ("category", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        
+        # Rolling metrics collection indexes
+        db.rolling_metrics.create_index([("user_id", ASCENDING)], unique=True)
+        
+        # Anomaly detection collection indexes
+        db.anomaly_state.create_index([("user_id", ASCENDING)], unique=True)
+        db.anomalies.create_index(
+            [("user_id", ASCENDING), ("metric", ASCENDING), ("date", ASCENDING)], unique=True
+        )
+        db.anomalies.create_index([("user_id", ASCENDING), ("date", DESCENDING)])
+        
+        # Intraday samples (time-series) indexes
+        db.intraday_samples.create_index([("user_id", ASCENDING), ("ts", ASCENDING)])
         
-        # Tips collection indexes
-        self._db.tips.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
+        # Monthly archive buckets of old entries
+        db.health_entries_archive.create_index([("user_id", ASCENDING), ("month", ASCENDING)], unique=True)
+        
+        # Nightly correlation results and forecasts, one document per user
+        db.correlations.create_index([("user_id", ASCENDING)], unique=True)
+        db.forecasts.create_index([("user_id", ASCENDING)], unique=True)
+        
+        # Goal milestone indexes
+        db.milestone_state.create_index([("user_id", ASCENDING)], unique=True)
+        db.milestones.create_index([("user_id", ASCENDING), ("key", ASCENDING)], unique=True)
+        db.milestones.create_index([("user_id", ASCENDING), ("date", DESCENDING)])
+        
+        # Login throttle counters expire with their window
+        db.login_throttle.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        
+        # Notification queue indexes (sent notifications expire)
+        db.notification_queue.create_index([("status", ASCENDING), ("available_at", ASCENDING)])
+        db.notification_queue.create_index(
+            [("sent_at", ASCENDING)], expireAfterSeconds=Config.NOTIFICATION_RETENTION_DAYS * 86400
+        )
     
     # ============= USER OPERATIONS =============
     
@@ -64,6 +217,7 @@ class DatabaseManager:
             user_data['created_at'] = datetime.utcnow()
             user_data['updated_at'] = datetime.utcnow()
             result = self._db.users.insert_one(user_data)
+            self.increment_counters(['signups'])
             return str(result.inserted_id)
         except DuplicateKeyError:
             return None
@@ -93,18 +247,27 @@ class DatabaseManager:
         """Create a new health entry"""
         entry_data['created_at'] = datetime.utcnow()
         result = self._db.health_entries.insert_one(entry_data)
+        self.increment_counters(['entries'])
         return str(result.inserted_id)
     
-    def get_health_entries(self, user_id: str, days: int = 30) -> List[Dict]:
-        """Get health entries for a user for the last N days"""
+    def get_health_entries(self, user_id: str, days: int = 30, analytics: bool = False) -> List[Dict]:
+        """Get health entries for a user for the last N days (from a secondary for analytics)"""
         from bson import ObjectId
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        entries = list(self._db.health_entries.find({
+        reader = self._reader(analytics)
+        entries = list(reader.health_entries.find({
             "user_id": ObjectId(user_id),
             "date": {"$gte": start_date}
         }).sort("date", DESCENDING))
         
+        horizon = self._archive_horizon()
+        if horizon and start_date < horizon:
+            # The window reaches back into archived months
+            start_of_day = datetime(start_date.year, start_date.month, start_date.day)
+            archived = [e for e in self._archived_entries(reader, user_id, start_date, horizon)
+                        if e['date'] >= start_of_day]
+            entries = self._merge_entries(entries, archived)
         return entries
     
     def get_entry_by_date(self, user_id: str, date: datetime) -> Optional[Dict]:
@@ -114,10 +277,17 @@ class DatabaseManager:
         start_of_day = datetime(date.year, date.month, date.day)
         end_of_day = start_of_day + timedelta(days=1)
         
-        return self._db.health_entries.find_one({
+        entry = self._db.health_entries.find_one({
             "user_id": ObjectId(user_id),
             "date": {"$gte": start_of_day, "$lt": end_of_day}
         })
+        
+        horizon = self._archive_horizon()
+        if entry is None and horizon and start_of_day < horizon:
+            for archived in self._archived_entries(self._db, user_id, start_of_day, end_of_day):
+                if archived['date'] == start_of_day:
+                    return archived
+        return entry
     
     def update_health_entry(self, entry_id: str, update_data: Dict) -> bool:
         """Update a health entry"""
@@ -128,11 +298,46 @@ class DatabaseManager:
         )
         return result.modified_count > 0
     
-    def get_health_stats(self, user_id: str, days: int = 30) -> Dict:
-        """Get aggregated health statistics"""
+    def bulk_upsert_health_entries(self, user_id: str, entries: List[Dict]) -> int:
+        """Create or overwrite one entry per day for a user in a single bulk write"""
+        from bson import ObjectId
+        if not entries:
+            return 0
+        
+        now = datetime.utcnow()
+        operations = []
+        for entry in entries:
+            date = entry['date']
+            start_of_day = datetime(date.year, date.month, date.day)
+            fields = {k: v for k, v in entry.items() if k not in ('_id', 'user_id', 'created_at')}
+            operations.append(UpdateOne(
+                {
+                    "user_id": ObjectId(user_id),
+                    "date": {"$gte": start_of_day, "$lt": start_of_day + timedelta(days=1)}
+                },
+                {
+                    "$set": fields,
+                    "$setOnInsert": {"user_id": ObjectId(user_id), "created_at": now}
+                },
+                upsert=True
+            ))
+        
+        # Ordered so that the last entry for a day wins, as with repeated single writes
+        result = self._db.health_entries.bulk_write(operations, ordered=True)
+        if result.upserted_count:
+            self.increment_counters(['entries'], result.upserted_count)
+        return result.upserted_count + result.matched_count
+    
+    def get_health_stats(self, user_id: str, days: int = 30, analytics: bool = False) -> Dict:
+        """Get aggregated health statistics (from a secondary for analytics)"""
         from bson import ObjectId
         start_date = datetime.utcnow() - timedelta(days=days)
         
+        horizon = self._archive_horizon()
+        if horizon and start_date < horizon:
+            # Long windows include archived months; average the merged entries instead
+            return self._entry_stats(self.get_health_entries(user_id, days, analytics=analytics))
+        
         pipeline = [
             {
                 "$match": {
@@ -153,9 +358,326 @@ class DatabaseManager:
             }
         ]
         
-        result = list(self._db.health_entries.aggregate(pipeline))
+        result = list(self._reader(analytics).health_entries.aggregate(pipeline))
         return result[0] if result else {}
     
+    # ============= ARCHIVE OPERATIONS =============
+    
+    @staticmethod
+    def _archive_horizon() -> Optional[datetime]:
+        """Archived entries are all older than this; None when archiving is off"""
+        if Config.ARCHIVE_AFTER_DAYS <= 0:
+            return None
+        return datetime.utcnow() - timedelta(days=Config.ARCHIVE_AFTER_DAYS)
+    
+    @staticmethod
+    def _archived_entries(reader, user_id: str, start: datetime, end: datetime) -> List[Dict]:
+        """Expanded archived entries of the months overlapping [start, end), oldest first"""
+        from bson import ObjectId
+        buckets = reader.health_entries_archive.find({
+            "user_id": ObjectId(user_id),
+            "month": {"$gte": EntryArchiveBucket.month_start(start), "$lt": end}
+        }).sort("month", ASCENDING)
+        return [entry for bucket in buckets for entry in EntryArchiveBucket.expand(bucket)]
+    
+    @staticmethod
+    def _merge_entries(hot: List[Dict], archived: List[Dict]) -> List[Dict]:
+        """Hot and archived entries newest first, one per day (the hot entry wins)"""
+        by_day = {entry['date'].date(): entry for entry in archived}
+        by_day.update((entry['date'].date(), entry) for entry in hot)
+        return sorted(by_day.values(), key=lambda entry: entry['date'], reverse=True)
+    
+    @staticmethod
+    def _merge_sorted_entries(archived: Iterator[Dict], hot: Iterator[Dict]) -> Iterator[Dict]:
+        """Merge two oldest-first entry streams, one per day (the hot entry wins)"""
+        archived, hot = iter(archived), iter(hot)
+        next_archived, next_hot = next(archived, None), next(hot, None)
+        while next_archived is not None or next_hot is not None:
+            if next_hot is None or (next_archived is not None and next_archived['date'].date() < next_hot['date'].date()):
+                yield next_archived
+                next_archived = next(archived, None)
+                continue
+            if next_archived is not None and next_archived['date'].date() == next_hot['date'].date():
+                next_archived = next(archived, None)
+            yield next_hot
+            next_hot = next(hot, None)
+    
+    @staticmethod
+    def _entry_stats(entries: List[Dict]) -> Dict:
+        """Averages in the same shape as the get_health_stats aggregation"""
+        if not entries:
+            return {}
+        
+        def average(field):
+            values = [entry[field] for entry in entries if entry.get(field) is not None]
+            return sum(values) / len(values) if values else None
+        
+        return {
+            "_id": None,
+            "avg_steps": average('steps'),
+            "avg_calories": average('calories'),
+            "avg_heart_rate": average('heart_rate'),
+            "avg_sleep": average('sleep_hours'),
+            "avg_water": average('water_intake'),
+            "total_entries": len(entries)
+        }
+    
+    def get_entries_before(self, user_id: str, cutoff: datetime) -> List[Dict]:
+        """Get a user's hot entries dated before the cutoff, oldest first"""
+        from bson import ObjectId
+        return list(self._db.health_entries.find({
+            "user_id": ObjectId(user_id),
+            "date": {"$lt": cutoff}
+        }).sort("date", ASCENDING))
+    
+    def get_archive_bucket(self, user_id: str, month: datetime) -> Optional[Dict]:
+        """Get one archived month for a user"""
+        from bson import ObjectId
+        return self._db.health_entries_archive.find_one({"user_id": ObjectId(user_id), "month": month})
+    
+    def save_archive_bucket(self, bucket: Dict) -> bool:
+        """Create or replace an archived month"""
+        bucket = dict(bucket, archived_at=datetime.utcnow())
+        result = self._db.health_entries_archive.replace_one(
+            {"user_id": bucket['user_id'], "month": bucket['month']},
+            bucket,
+            upsert=True
+        )
+        return result.acknowledged
+    
+    def delete_health_entries(self, entries: List[Dict]) -> int:
+        """Delete archived hot entries, each only if it still holds the values that were archived.
+        
+        An entry updated after it was read survives; reads prefer it over the
+        archived copy, and the next archive run folds it in.
+        """
+        if not entries:
+            return 0
+        
+        operations = []
+        for entry in entries:
+            unchanged = {
+                field: entry[field] if field in entry else {"$exists": False}
+                for field in ('date',) + ARCHIVED_ENTRY_FIELDS
+            }
+            operations.append(DeleteOne(dict(unchanged, _id=entry['_id'])))
+        result = self._db.health_entries.bulk_write(operations, ordered=False)
+        return result.deleted_count
+    
+    # ============= INTRADAY OPERATIONS =============
+    
+    def insert_intraday_samples(self, samples: List[Dict], batch_size: int = 5000) -> int:
+        """Insert intraday samples in unordered batches"""
+        inserted = 0
+        for start in range(0, len(samples), batch_size):
+            result = self._db.intraday_samples.insert_many(samples[start:start + batch_size], ordered=False)
+            inserted += len(result.inserted_ids)
+        return inserted
+    
+    def get_intraday_samples(self, user_id: str, start: datetime, end: datetime,
+                             metric: Optional[str] = None) -> List[Dict]:
+        """Get raw intraday samples for a user in [start, end)"""
+        from bson import ObjectId
+        query = {"user_id": ObjectId(user_id), "ts": {"$gte": start, "$lt": end}}
+        projection = {"_id": 0, "ts": 1, "heart_rate": 1, "steps": 1}
+        if metric:
+            query[metric] = {"$exists": True}
+            projection = {"_id": 0, "ts": 1, metric: 1}
+        
+        return list(self._db.intraday_samples.find(query, projection).sort("ts", ASCENDING))
+    
+    def downsample_intraday(self, user_id: str, start: datetime, end: datetime,
+                            bucket_minutes: int = 15) -> List[Dict]:
+        """Aggregate intraday samples for a user into fixed-size time buckets"""
+        from bson import ObjectId
+        pipeline = [
+            {
+                "$match": {
+                    "user_id": ObjectId(user_id),
+                    "ts": {"$gte": start, "$lt": end}
+                }
+            },
+            {
+                "$group": {
+                    "_id": {"$dateTrunc": {"date": "$ts", "unit": "minute", "binSize": bucket_minutes}},
+                    "avg_heart_rate": {"$avg": "$heart_rate"},
+                    "min_heart_rate": {"$min": "$heart_rate"},
+                    "max_heart_rate": {"$max": "$heart_rate"},
+                    "steps": {"$sum": "$steps"},
+                    "samples": {"$sum": 1}
+                }
+            },
+            {"$sort": {"_id": ASCENDING}},
+            {"$project": {"_id": 0, "ts": "$_id", "avg_heart_rate": 1, "min_heart_rate": 1,
+                          "max_heart_rate": 1, "steps": 1, "samples": 1}}
+        ]
+        return list(self._db.intraday_samples.aggregate(pipeline))
+    
+    def get_intraday_daily_totals(self, user_id: str, start: datetime, end: datetime) -> List[Dict]:
+        """Get per-day step totals and average heart rate from intraday samples"""
+        from bson import ObjectId
+        pipeline = [
+            {
+                "$match": {
+                    "user_id": ObjectId(user_id),
+                    "ts": {"$gte": start, "$lt": end}
+                }
+            },
+            {
+                "$group": {
+                    "_id": {"$dateTrunc": {"date": "$ts", "unit": "day"}},
+                    "steps": {"$sum": "$steps"},
+                    "heart_rate": {"$avg": "$heart_rate"},
+                    "samples": {"$sum": 1}
+                }
+            },
+            {"$sort": {"_id": ASCENDING}}
+        ]
+        return list(self._db.intraday_samples.aggregate(pipeline))
+    
+    # ============= ROLLING METRICS OPERATIONS =============
+    
+    def get_rolling_metrics(self, user_id: str) -> Optional[Dict]:
+        """Get the rolling-window accumulators for a user"""
+        from bson import ObjectId
+        return self._db.rolling_metrics.find_one({"user_id": ObjectId(user_id)})
+    
+    def save_rolling_metrics(self, user_id: str, metrics_data: Dict, expected_version: int) -> bool:
+        """Save rolling-window accumulators if nobody else changed them since they were read"""
+        from bson import ObjectId
+        update_data = {k: v for k, v in metrics_data.items() if k not in ('_id', 'user_id', 'version')}
+        update_data['updated_at'] = datetime.utcnow()
+        
+        try:
+            result = self._db.rolling_metrics.update_one(
+                {"user_id": ObjectId(user_id), "version": expected_version},
+                {
+                    "$set": update_data,
+                    "$inc": {"version": 1},
+                    "$setOnInsert": {"user_id": ObjectId(user_id)}
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another writer updated the document first
+            return False
+        return result.acknowledged
+    
+    # ============= CORRELATION OPERATIONS =============
+    
+    def get_correlations(self, user_id: str) -> Optional[Dict]:
+        """Get a user's stored metric correlations"""
+        from bson import ObjectId
+        return self._db.correlations.find_one({"user_id": ObjectId(user_id)}, {"_id": 0})
+    
+    def save_correlations(self, documents: List[Dict]) -> int:
+        """Replace the stored correlations of several users in one round trip"""
+        if not documents:
+            return 0
+        
+        operations = [
+            UpdateOne({"user_id": doc['user_id']}, {"$set": doc}, upsert=True)
+            for doc in documents
+        ]
+        result = self._db.correlations.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+    
+    # ============= FORECAST OPERATIONS =============
+    
+    def get_recent_entries_for_users(self, user_ids: List, since: datetime, fields: List[str]) -> Iterator[Dict]:
+        """Entries dated at or after `since` for many users in one query (user_id, date and `fields` only).
+        
+        Reads hot entries only, so `since` must be within the archive horizon.
+        """
+        projection = dict.fromkeys(["user_id", "date"] + fields, 1)
+        projection["_id"] = 0
+        return self._reader(True).health_entries.find(
+            {"user_id": {"$in": list(user_ids)}, "date": {"$gte": since}}, projection
+        ).batch_size(10000)
+    
+    def get_forecast(self, user_id: str) -> Optional[Dict]:
+        """Get a user's stored forecast"""
+        from bson import ObjectId
+        return self._db.forecasts.find_one({"user_id": ObjectId(user_id)}, {"_id": 0})
+    
+    def save_forecasts(self, documents: List[Dict]) -> int:
+        """Replace the stored forecasts of several users in one round trip"""
+        if not documents:
+            return 0
+        
+        operations = [
+            UpdateOne({"user_id": doc['user_id']}, {"$set": doc}, upsert=True)
+            for doc in documents
+        ]
+        result = self._db.forecasts.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+    
+    # ============= ANOMALY OPERATIONS =============
+    
+    def get_anomaly_state(self, user_id: str) -> Optional[Dict]:
+        """Get the per-metric anomaly baselines for a user"""
+        from bson import ObjectId
+        return self._db.anomaly_state.find_one({"user_id": ObjectId(user_id)})
+    
+    def save_anomaly_state(self, user_id: str, metric_states: Dict, expected_version: int) -> bool:
+        """Set the anomaly baselines for the given metrics if nobody else changed them since they were read"""
+        from bson import ObjectId
+        update_data = {f"metrics.{metric}": state for metric, state in metric_states.items()}
+        update_data['updated_at'] = datetime.utcnow()
+        # Documents written before versioning have no version field; they count as version 0
+        version = expected_version if expected_version else {"$in": [0, None]}
+        
+        try:
+            result = self._db.anomaly_state.update_one(
+                {"user_id": ObjectId(user_id), "version": version},
+                {
+                    "$set": update_data,
+                    "$inc": {"version": 1},
+                    "$setOnInsert": {"user_id": ObjectId(user_id)}
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another writer updated the document first
+            return False
+        return result.acknowledged
+    
+    def save_anomalies(self, anomalies: List[Dict]) -> int:
+        """Store flagged anomalies (one per user, metric and day)"""
+        if not anomalies:
+            return 0
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"user_id": a['user_id'], "metric": a['metric'], "date": a['date']},
+                {"$set": a, "$setOnInsert": {"created_at": now}},
+                upsert=True
+            )
+            for a in anomalies
+        ]
+        result = self._db.anomalies.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+    
+    def clear_anomalies(self, user_id: str, date: datetime, metrics: List[str]) -> int:
+        """Remove anomalies for a day that is being re-scored"""
+        from bson import ObjectId
+        result = self._db.anomalies.delete_many({
+            "user_id": ObjectId(user_id),
+            "metric": {"$in": metrics},
+            "date": date
+        })
+        return result.deleted_count
+    
+    def get_anomalies(self, user_id: str, days: int = 7) -> List[Dict]:
+        """Get anomalies flagged for the last N days"""
+        from bson import ObjectId
+        start_date = datetime.utcnow() - timedelta(days=days)
+        return list(self._db.anomalies.find({
+            "user_id": ObjectId(user_id),
+            "date": {"$gte": start_date}
+        }).sort("date", DESCENDING))
+    
     # ============= STREAK OPERATIONS =============
     
     def upsert_streak(self, user_id: str, streak_data: Dict) -> bool:
@@ -197,6 +719,33 @@ class DatabaseManager:
         }).sort("created_at", DESCENDING).limit(limit))
         return tips
     
+    def get_tips_page(self, user_id: str, limit: int = 10, category: Optional[str] = None,
+                      before: Optional[Tuple[datetime, object]] = None) -> Tuple[List[Dict], Optional[Tuple]]:
+        """Get one page of tips, newest first, optionally for a single category.
+
+        `before` is the cursor returned with the previous page: the (created_at, _id) of
+        its last tip. Returns the tips and the cursor for the next (older) page, or None
+        when there are no older tips.
+        """
+        from bson import ObjectId
+        query = {"user_id": ObjectId(user_id)}
+        if category:
+            query["category"] = category
+        if before:
+            created_at, tip_id = before
+            # Bounded on created_at so the scan starts at the cursor; _id breaks ties
+            query["created_at"] = {"$lte": created_at}
+            query["$or"] = [{"created_at": {"$lt": created_at}}, {"_id": {"$lt": tip_id}}]
+
+        # One extra tip tells whether an older page exists
+        tips = list(self._db.tips.find(query).sort(
+            [("created_at", DESCENDING), ("_id", DESCENDING)]
+        ).limit(limit + 1))
+        if len(tips) <= limit:
+            return tips, None
+        tips = tips[:limit]
+        return tips, (tips[-1]['created_at'], tips[-1]['_id'])
+    
     def get_tip_for_today(self, user_id: str) -> Optional[Dict]:
         """Get tip generated today"""
         from bson import ObjectId
@@ -206,18 +755,293 @@ class DatabaseManager:
             "created_at": {"$gte": today_start}
         })
     
+    # ============= GOAL & MILESTONE OPERATIONS =============
+    
+    def get_user_goals(self, user_id: str) -> Dict:
+        """Get the goals a user has set (empty if they use the defaults)"""
+        from bson import ObjectId
+        user = self._db.users.find_one({"_id": ObjectId(user_id)}, {"goals": 1})
+        return (user or {}).get('goals') or {}
+    
+    def get_milestone_state(self, user_id: str) -> Optional[Dict]:
+        """Get the goal streaks, personal bests and totals for a user"""
+        from bson import ObjectId
+        return self._db.milestone_state.find_one({"user_id": ObjectId(user_id)})
+    
+    def save_milestone_state(self, user_id: str, state_data: Dict, expected_version: int) -> bool:
+        """Save milestone state if nobody else changed it since it was read"""
+        from bson import ObjectId
+        update_data = {k: v for k, v in state_data.items() if k not in ('_id', 'user_id', 'version')}
+        update_data['updated_at'] = datetime.utcnow()
+        
+        try:
+            result = self._db.milestone_state.update_one(
+                {"user_id": ObjectId(user_id), "version": expected_version},
+                {
+                    "$set": update_data,
+                    "$inc": {"version": 1},
+                    "$setOnInsert": {"user_id": ObjectId(user_id)}
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another writer updated the document first
+            return False
+        return result.acknowledged
+    
+    def save_milestones(self, milestones: List[Dict]) -> List[Dict]:
+        """Store reached milestones; returns the ones not reached before"""
+        if not milestones:
+            return []
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"user_id": m['user_id'], "key": m['key']},
+                {"$setOnInsert": dict(m, created_at=now)},
+                upsert=True
+            )
+            for m in milestones
+        ]
+        result = self._db.milestones.bulk_write(operations, ordered=False)
+        return [milestones[index] for index in result.upserted_ids]
+    
+    def get_milestones(self, user_id: str, limit: int = 10) -> List[Dict]:
+        """Get a user's most recent milestones"""
+        from bson import ObjectId
+        return list(self._db.milestones.find(
+            {"user_id": ObjectId(user_id)}
+        ).sort("date", DESCENDING).limit(limit))
+    
+    # ============= NOTIFICATION QUEUE OPERATIONS =============
+    
+    def enqueue_notifications(self, notifications: List[Dict]) -> int:
+        """Queue notifications ({user_id, kind, message}) for the notification worker"""
+        if not notifications:
+            return 0
+        
+        now = datetime.utcnow()
+        documents = [
+            dict(n, status="pending", attempts=0, available_at=now, created_at=now)
+            for n in notifications
+        ]
+        result = self._db.notification_queue.insert_many(documents, ordered=False)
+        return len(result.inserted_ids)
+    
+    def claim_notification(self, lease_seconds: int) -> Optional[Dict]:
+        """Atomically take the oldest due notification.
+        
+        The claim pushes `available_at` past the lease instead of changing the status,
+        so a notification whose worker dies is picked up again once the lease expires.
+        """
+        now = datetime.utcnow()
+        return self._db.notification_queue.find_one_and_update(
+            {"status": "pending", "available_at": {"$lte": now}},
+            {"$set": {"available_at": now + timedelta(seconds=lease_seconds)}, "$inc": {"attempts": 1}},
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+    
+    def complete_notification(self, notification_id, sid: Optional[str] = None) -> bool:
+        """Mark a notification as sent"""
+        result = self._db.notification_queue.update_one(
+            {"_id": notification_id},
+            {"$set": {"status": "sent", "sent_at": datetime.utcnow(), "sid": sid}}
+        )
+        return result.modified_count > 0
+    
+    def fail_notification(self, notification_id, error: str, retry_at: Optional[datetime] = None) -> bool:
+        """Record a failed attempt; retried at `retry_at`, or given up on without one"""
+        update_data = {"last_error": error}
+        if retry_at:
+            update_data['available_at'] = retry_at
+        else:
+            update_data['status'] = "failed"
+        result = self._db.notification_queue.update_one({"_id": notification_id}, {"$set": update_data})
+        return result.modified_count > 0
+    
+    def count_pending_notifications(self) -> int:
+        """Count notifications waiting to be sent"""
+        return self._db.notification_queue.count_documents({"status": "pending"})
+    
+    # ============= REMINDER OPERATIONS =============
+    
+    def get_reminder(self, user_id: str) -> Optional[Dict]:
+        """Get a user's reminder preferences"""
+        from bson import ObjectId
+        user = self._db.users.find_one({"_id": ObjectId(user_id)}, {"reminder": 1})
+        return (user or {}).get('reminder')
+    
+    def set_reminder(self, user_id: str, reminder: Dict) -> bool:
+        """Replace a user's reminder preferences (without next_send_at when disabled)"""
+        from bson import ObjectId
+        result = self._db.users.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$set": {"reminder": reminder, "updated_at": datetime.utcnow()}}
+        )
+        return result.matched_count > 0
+    
+    def get_due_reminders(self, now: datetime, limit: int) -> List[Dict]:
+        """Users whose reminder is due, earliest first (a range scan of the next_send_at index)"""
+        return list(self._db.users.find(
+            {"reminder.next_send_at": {"$lte": now}},
+            {"username": 1, "phone": 1, "reminder": 1}
+        ).sort("reminder.next_send_at", ASCENDING).limit(limit))
+    
+    def advance_reminder(self, user_id, expected: datetime, next_send_at: datetime) -> bool:
+        """Move a due reminder to its next send time, only if no other scheduler moved it first"""
+        result = self._db.users.update_one(
+            {"_id": user_id, "reminder.next_send_at": expected},
+            {"$set": {"reminder.next_send_at": next_send_at}}
+        )
+        return result.modified_count > 0
+    
+    def get_latest_entry_dates(self, user_ids: List, since: datetime) -> Dict:
+        """Latest entry date at or after `since` for each of the users that have one"""
+        pipeline = [
+            {"$match": {"user_id": {"$in": list(user_ids)}, "date": {"$gte": since}}},
+            {"$group": {"_id": "$user_id", "latest": {"$max": "$date"}}}
+        ]
+        return {row['_id']: row['latest'] for row in self._db.health_entries.aggregate(pipeline)}
+    
+    # ============= THROTTLE OPERATIONS =============
+    
+    def increment_throttle_counter(self, key: str, expires_at: datetime) -> int:
+        """Count one attempt against a throttle window key; returns the window's count so far"""
+        counter = self._db.login_throttle.find_one_and_update(
+            {"_id": key},
+            {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter['count']
+    
+    # ============= CHANGE STREAM OPERATIONS =============
+    
+    def watch_changes(self, pipeline: List[Dict], resume_after: Optional[Dict] = None):
+        """Open a database change stream with the current version of updated documents"""
+        return self._db.watch(
+            pipeline,
+            full_document='updateLookup',
+            resume_after=resume_after,
+            max_await_time_ms=1000
+        )
+    
+    def get_resume_token(self, consumer: str) -> Optional[Dict]:
+        """Get the last resume token a change stream consumer saved"""
+        offset = self._db.event_offsets.find_one({"_id": consumer})
+        return offset.get('token') if offset else None
+    
+    def save_resume_token(self, consumer: str, token: Optional[Dict]) -> bool:
+        """Save a change stream consumer's position"""
+        result = self._db.event_offsets.update_one(
+            {"_id": consumer},
+            {"$set": {"token": token, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return result.acknowledged
+    
+    def bump_data_version(self, user_id, collection: str) -> bool:
+        """Advance a user's data version for a collection (invalidates cached derived data)"""
+        from bson import ObjectId
+        result = self._db.data_versions.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$inc": {collection: 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return result.acknowledged
+    
+    def get_data_version(self, user_id) -> Dict:
+        """Get a user's data versions by collection"""
+        from bson import ObjectId
+        return self._db.data_versions.find_one({"_id": ObjectId(user_id)}) or {}
+    
+    # ============= EXPORT OPERATIONS =============
+    
+    def iter_user_ids(self, batch_size: int = 1000, analytics: bool = True) -> Iterator:
+        """Iterate over all user ids in _id order"""
+        # Page by _id rather than holding one cursor open for a long-running export
+        query = {}
+        while True:
+            page = list(self._reader(analytics).users.find(query, {"_id": 1}).sort("_id", ASCENDING).limit(batch_size))
+            yield from (user['_id'] for user in page)
+            if len(page) < batch_size:
+                return
+            query = {"_id": {"$gt": page[-1]['_id']}}
+    
+    def iter_health_entries(self, user_id: str, batch_size: int = 1000, analytics: bool = False) -> Iterator[Dict]:
+        """Iterate over a user's full entry history (archived months included), oldest first"""
+        from bson import ObjectId
+        reader = self._reader(analytics)
+        hot = reader.health_entries.find(
+            {"user_id": ObjectId(user_id)}
+        ).sort("date", ASCENDING).batch_size(batch_size)
+        if not self._archive_horizon():
+            return hot
+        
+        archived = (
+            entry
+            for bucket in reader.health_entries_archive.find(
+                {"user_id": ObjectId(user_id)}
+            ).sort("month", ASCENDING).batch_size(max(1, batch_size // 31))
+            for entry in EntryArchiveBucket.expand(bucket)
+        )
+        return self._merge_sorted_entries(archived, hot)
+    
+    def iter_tips(self, user_id: str, batch_size: int = 1000, analytics: bool = False) -> Iterator[Dict]:
+        """Iterate over all tips for a user, oldest first"""
+        from bson import ObjectId
+        return self._reader(analytics).tips.find(
+            {"user_id": ObjectId(user_id)}
+        ).sort("created_at", ASCENDING).batch_size(batch_size)
+    
+    def iter_intraday_samples(self, user_id: str, batch_size: int = 1000, analytics: bool = False) -> Iterator[Dict]:
+        """Iterate over all intraday samples for a user, oldest first"""
+        from bson import ObjectId
+        return self._reader(analytics).intraday_samples.find(
+            {"user_id": ObjectId(user_id)}, {"_id": 0}
+        ).sort("ts", ASCENDING).batch_size(batch_size)
+    
     # ============= ADMIN OPERATIONS =============
     
     def get_all_users_count(self) -> int:
-        """Get total number of users"""
-        return self._db.users.count_documents({})
+        """Get total number of users (from collection metadata on an analytics member, no scan)"""
+        return self._analytics_db.users.estimated_document_count()
     
     def get_total_entries_count(self) -> int:
-        """Get total number of health entries"""
-        return self._db.health_entries.count_documents({})
+        """Get total number of health entries, hot and archived (collection metadata and a counter, no scan)"""
+        hot = self._analytics_db.health_entries.estimated_document_count()
+        return hot + self.get_counters(['archived_entries'])['archived_entries']
+    
+    def increment_counters(self, names: List[str], amount: int = 1) -> bool:
+        """Increment event counters, both all-time and for today"""
+        today = datetime.utcnow().strftime('%Y-%m-%d')
+        operations = []
+        for name in names:
+            for key in (name, f"{name}:{today}"):
+                operations.append(UpdateOne({"_id": key}, {"$inc": {"value": amount}}, upsert=True))
+        
+        result = self._db.counters.bulk_write(operations, ordered=False)
+        return result.acknowledged
+    
+    def get_counters(self, keys: List[str]) -> Dict[str, int]:
+        """Get counter values by key (missing counters are 0)"""
+        values = {key: 0 for key in keys}
+        for counter in self._db.counters.find({"_id": {"$in": keys}}):
+            values[counter['_id']] = counter.get('value', 0)
+        return values
+    
+    def count_active_users(self, since: datetime) -> int:
+        """Count users whose last login is at or after `since` (index range count on an analytics member)"""
+        return self._analytics_db.streaks.count_documents({"last_login": {"$gte": since}})
     
     def close_connection(self):
         """Close database connection"""
-        if self._client:
-            self._client.close()
+        if self._connection:
+            # Services keep this instance; their next query reconnects through it
+            self._connection[0].close()
+            self._connection = None
             print("MongoDB connection closed")
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=DatabaseManager._reset_after_fork)
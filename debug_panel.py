@@ -0,0 +1,43 @@
+"""
+Debug Panel
+Sidebar view of in-process latency metrics (enabled with DEBUG_METRICS)
+"""
+
+import pandas as pd
+import streamlit as st
+from instrumentation import registry
+
+def _histogram_rows():
+    rows = []
+    for metric in registry.metrics():
+        if metric.kind != 'histogram':
+            continue
+        for key in sorted(metric.samples()):
+            summary = metric.summary(key)
+            rows.append({
+                "Metric": metric.name.replace('health_tracker_', '').replace('_seconds', ''),
+                "Labels": ", ".join(key) or "-",
+                "Count": summary['count'],
+                "Mean (ms)": round(summary['mean'] * 1000, 2),
+                "p50 (ms)": round(summary['p50'] * 1000, 2),
+                "p95 (ms)": round(summary['p95'] * 1000, 2),
+                "p99 (ms)": round(summary['p99'] * 1000, 2)
+            })
+    return rows
+
+def render():
+    rows = _histogram_rows()
+    if rows:
+        # Slowest operations first
+        df = pd.DataFrame(rows).sort_values("p95 (ms)", ascending=False)
+        st.dataframe(df, hide_index=True, use_container_width=True)
+    else:
+        st.caption("No timings recorded yet.")
+
+    st.download_button(
+        "⬇️ Prometheus metrics",
+        data=registry.render_prometheus(),
+        file_name="metrics.prom",
+        mime="text/plain"
+    )
+    st.caption("Percentiles are estimated from histogram buckets for this server process.")
@@ -0,0 +1,234 @@
+"""
+Event Bus
+Change-stream consumer that maintains derived data once per change:
+
+    python event_bus.py
+
+Watches health_entries, streaks and tips and fans every insert/update out to the
+handlers registered for its collection: rolling metrics and anomaly baselines,
+goal milestones, and the per-user data versions that keep the app's caches fresh
+across replicas. The resume token is saved in `event_offsets`, so a restarted
+consumer carries on where it stopped; handlers may see an event twice and are
+idempotent. A failing handler is retried; if it keeps failing the consumer
+stops without checkpointing past that change, so a restart retries it instead
+of leaving derived data silently wrong. Change streams need a replica set; a single local node is enough
+(`mongod --replSet rs0`, then `rs.initiate()` in mongosh). Set
+DERIVED_DATA_MODE=events so the app stops maintaining derived data inline.
+"""
+
+import signal
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Hashable, List, Optional
+from pymongo.errors import OperationFailure
+from config import Config
+from db_manager import DatabaseManager
+from instrumentation import registry, timed
+from storage_backend import storage_supports
+
+WATCHED_COLLECTIONS = ('health_entries', 'streaks', 'tips')
+CONSUMER_NAME = 'derived_data'
+
+# Save the resume token after this many events, and whenever the stream goes idle
+CHECKPOINT_EVERY = 100
+
+# Tries per handler and change before the consumer stops, with exponential backoff between them
+HANDLER_ATTEMPTS = 4
+RETRY_BACKOFF_SECONDS = 0.5
+
+# Server errors meaning the resume token has fallen off the oplog
+HISTORY_LOST_CODES = (260, 280, 286)
+
+EVENT_HANDLER_SECONDS = registry.histogram(
+    'health_tracker_event_handler_seconds', 'Change-stream handler latency', ['collection', 'handler'])
+EVENT_HANDLER_ERRORS = registry.counter(
+    'health_tracker_event_handler_errors_total', 'Change-stream handlers that raised', ['collection', 'handler'])
+
+def events_mode() -> bool:
+    return Config.DERIVED_DATA_MODE == 'events' and storage_supports('change_streams')
+
+# ============= CONSUMER =============
+
+class HandlerFailed(Exception):
+    """A handler kept failing on a change; it is left unacknowledged so a restart retries it"""
+
+class EventBus:
+    """Reads the change stream and dispatches each change to its collection's handlers"""
+
+    def __init__(self, name: str = CONSUMER_NAME):
+        self.db = DatabaseManager()
+        self.name = name
+        self.handlers: Dict[str, List[Callable[[Dict], None]]] = {}
+        self.stopping = threading.Event()
+
+    def subscribe(self, collection: str, handler: Callable[[Dict], None]):
+        """Call handler(change) for every insert/update/replace in the collection"""
+        self.handlers.setdefault(collection, []).append(handler)
+
+    def dispatch(self, change: Dict):
+        """Run the handlers for one change, retrying each; raises HandlerFailed if one keeps failing"""
+        collection = change['ns']['coll']
+        for handler in self.handlers.get(collection, []):
+            for attempt in range(1, HANDLER_ATTEMPTS + 1):
+                try:
+                    with timed(EVENT_HANDLER_SECONDS, EVENT_HANDLER_ERRORS,
+                               collection=collection, handler=handler.__name__):
+                        handler(change)
+                    break
+                except Exception as e:
+                    print(f"⚠️ {handler.__name__} failed for {collection} {change['documentKey']['_id']} "
+                          f"(attempt {attempt}/{HANDLER_ATTEMPTS}): {e}")
+                    if attempt == HANDLER_ATTEMPTS or self.stopping.wait(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)):
+                        raise HandlerFailed(f"{handler.__name__} failed for {collection} "
+                                            f"{change['documentKey']['_id']}") from e
+
+    def _open_stream(self):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(self.handlers)},
+            # Deletes are left out on purpose: the only ones are the archiver's
+            # (delete_health_entries), which move entries into monthly buckets without
+            # changing any data, so they must not bump data versions or refold rollups
+            "operationType": {"$in": ["insert", "update", "replace"]}
+        }}]
+        token = self.db.get_resume_token(self.name)
+        try:
+            return self.db.watch_changes(pipeline, resume_after=token)
+        except OperationFailure as e:
+            if token is None or e.code not in HISTORY_LOST_CODES:
+                raise
+            print("⚠️ Resume token is no longer in the oplog; starting from now "
+                  "(derived data may have missed changes until rebuilt)")
+            return self.db.watch_changes(pipeline)
+
+    def run(self):
+        """Consume changes until stopped, checkpointing the resume token as it goes"""
+        pending = 0
+        with self._open_stream() as stream:
+            acknowledged = stream.resume_token
+            while not self.stopping.is_set() and stream.alive:
+                change = stream.try_next()  # Waits up to max_await_time_ms
+                if change is not None:
+                    try:
+                        self.dispatch(change)
+                    except HandlerFailed:
+                        # Keep the progress before this change, but never move past it
+                        if pending:
+                            self.db.save_resume_token(self.name, acknowledged)
+                        raise
+                    pending += 1
+                acknowledged = stream.resume_token
+                if pending and (change is None or pending >= CHECKPOINT_EVERY):
+                    self.db.save_resume_token(self.name, acknowledged)
+                    pending = 0
+            if pending:
+                self.db.save_resume_token(self.name, stream.resume_token)
+
+# ============= HANDLERS =============
+
+def update_rollups(change: Dict):
+    """Fold the written entry into rolling metrics and anomaly baselines"""
+    from health_service import HealthService
+    from service_registry import get_service
+    entry = change.get('fullDocument')
+    if entry:
+        get_service(HealthService).update_rollups(str(entry['user_id']), [entry], alert=_is_recent(entry))
+
+def check_milestones(change: Dict):
+    """Fold the written entry into goal streaks, bests and totals"""
+    from goals_service import GoalsService
+    from service_registry import get_service
+    entry = change.get('fullDocument')
+    if entry:
+        get_service(GoalsService).observe_batch(str(entry['user_id']), [entry], alert=True)
+
+def invalidate_caches(change: Dict):
+    """Bump the user's data version for the changed collection"""
+    document = change.get('fullDocument')
+    if document and document.get('user_id'):
+        DatabaseManager().bump_data_version(document['user_id'], change['ns']['coll'])
+
+def _is_recent(entry: Dict) -> bool:
+    # As with batch imports, only fresh data raises alerts
+    recent = datetime.utcnow() - timedelta(days=1)
+    return entry['date'] >= datetime(recent.year, recent.month, recent.day)
+
+def default_bus() -> EventBus:
+    bus = EventBus()
+    bus.subscribe('health_entries', update_rollups)
+    bus.subscribe('health_entries', check_milestones)
+    for collection in WATCHED_COLLECTIONS:
+        bus.subscribe(collection, invalidate_caches)
+    return bus
+
+# ============= VERSIONED CACHE =============
+
+class VersionedCache:
+    """Process-wide LRU of derived values, valid while the user's data version is unchanged.
+
+    Only used in events mode, where the consumer bumps the version on every change;
+    inline, values are computed on every call as before. A read right after a write
+    can see the previous value until the consumer has caught up.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._values: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, user_id, collection: str) -> Optional[int]:
+        """The user's data version for a collection, or None when versions are not maintained"""
+        if not events_mode():
+            return None
+        return DatabaseManager().get_data_version(user_id).get(collection, 0)
+
+    def get_or_compute(self, user_id, collection: str, key: Hashable, compute: Callable):
+        version = self.version(user_id, collection)
+        if version is None:
+            return compute()
+
+        cache_key = (str(user_id), collection, key)
+        with self._lock:
+            cached = self._values.get(cache_key)
+            if cached and cached[0] == version:
+                self._values.move_to_end(cache_key)
+                return cached[1]
+
+        value = compute()
+        with self._lock:
+            self._values[cache_key] = (version, value)
+            self._values.move_to_end(cache_key)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+        return value
+
+derived_cache = VersionedCache()
+
+def main():
+    """Run the consumer until interrupted"""
+    if not storage_supports('change_streams'):
+        print("❌ The event bus needs the MongoDB storage backend (STORAGE_BACKEND=mongodb)")
+        return 1
+    if not events_mode():
+        print("ℹ️ DERIVED_DATA_MODE is not 'events'; the app also maintains derived data inline")
+
+    bus = default_bus()
+    signal.signal(signal.SIGTERM, lambda *_: bus.stopping.set())
+    print(f"✅ Event bus consuming {', '.join(bus.handlers)}")
+    try:
+        bus.run()
+    except OperationFailure as e:
+        print(f"❌ Change stream failed (is MongoDB running as a replica set?): {e}")
+        return 1
+    except HandlerFailed as e:
+        print(f"❌ {e}; stopped before this change so a restart retries it")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        from service_registry import shutdown_services
+        shutdown_services()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
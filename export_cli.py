@@ -0,0 +1,45 @@
+"""
+Export CLI
+Bulk exports of user history for compliance and data requests:
+
+    python export_cli.py --out exports/ --format parquet
+    python export_cli.py --user-id 65f0c0ffee... --dataset entries --format csv --out exports/
+
+Each dataset is streamed from the database into one file covering the
+selected users, so memory stays flat regardless of history length.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from export_service import ExportService, EXPORT_DATASETS, EXPORT_FORMATS
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True, help="Output directory")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='jsonl')
+    parser.add_argument('--dataset', choices=list(EXPORT_DATASETS), action='append',
+                        help="Dataset to export (repeatable; default: all)")
+    parser.add_argument('--user-id', action='append', help="Limit to these users (repeatable; default: all)")
+    args = parser.parse_args()
+
+    export_service = ExportService()
+    if not export_service.is_format_available(args.format):
+        print(f"❌ {args.format} export is not available (install pyarrow for Parquet)")
+        return 1
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    for dataset in args.dataset or list(EXPORT_DATASETS):
+        path = out_dir / f"{dataset}.{args.format}"
+        with open(path, 'wb') as out:
+            if args.user_id:
+                rows = export_service.export(dataset, args.format, out, args.user_id)
+            else:
+                rows = export_service.export_all_users(dataset, args.format, out)
+        print(f"✅ {dataset}: {rows:,} rows -> {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
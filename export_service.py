@@ -0,0 +1,165 @@
+"""
+Export Service
+Streams a user's full history to CSV, JSONL or Parquet with flat memory use
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+from bson import ObjectId
+from config import Config
+from storage_backend import get_storage
+
+# Columns and their types for each exportable dataset
+EXPORT_DATASETS = {
+    'entries': {
+        'user_id': 'string',
+        'date': 'timestamp',
+        'steps': 'int',
+        'calories': 'int',
+        'heart_rate': 'int',
+        'sleep_hours': 'float',
+        'water_intake': 'int',
+        'notes': 'string',
+        'created_at': 'timestamp'
+    },
+    'tips': {
+        'user_id': 'string',
+        'created_at': 'timestamp',
+        'category': 'string',
+        'tip_text': 'string'
+    },
+    'streaks': {
+        'user_id': 'string',
+        'login_date': 'string'
+    },
+    'intraday': {
+        'user_id': 'string',
+        'ts': 'timestamp',
+        'heart_rate': 'int',
+        'steps': 'int'
+    }
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+class ExportService:
+    """Service for streaming data exports"""
+
+    def __init__(self):
+        self.db = get_storage()
+        self.batch_size = Config.EXPORT_BATCH_SIZE
+
+    @staticmethod
+    def is_format_available(fmt: str) -> bool:
+        """Parquet needs the optional pyarrow package"""
+        if fmt != 'parquet':
+            return fmt in EXPORT_FORMATS
+        try:
+            import pyarrow  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _iter_user_documents(self, dataset: str, user_id: str) -> Iterator[Dict]:
+        if dataset == 'entries':
+            return iter(self.db.iter_health_entries(user_id, self.batch_size, analytics=True))
+        if dataset == 'tips':
+            return iter(self.db.iter_tips(user_id, self.batch_size, analytics=True))
+        if dataset == 'intraday':
+            if not self.db.supports('intraday'):
+                return iter(())
+            return iter(self.db.iter_intraday_samples(user_id, self.batch_size, analytics=True))
+
+        # Streak history is the login date list on the single streak document
+        streak = self.db.get_streak(user_id) or {}
+        return ({"user_id": user_id, "login_date": day} for day in streak.get('login_dates', []))
+
+    def iter_rows(self, dataset: str, user_ids: Iterable) -> Iterator[Dict]:
+        """Yield export rows for the given users, one cursor batch at a time"""
+        columns = EXPORT_DATASETS[dataset]
+        for user_id in user_ids:
+            for document in self._iter_user_documents(dataset, str(user_id)):
+                row = {}
+                for column in columns:
+                    value = document.get(column)
+                    row[column] = str(value) if isinstance(value, ObjectId) else value
+                yield row
+
+    def export(self, dataset: str, fmt: str, out: BinaryIO, user_ids: Iterable) -> int:
+        """Write the dataset for the given users to a binary stream; returns rows written"""
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Unknown dataset: {dataset}")
+        if not self.is_format_available(fmt):
+            raise ValueError(f"Export format not available: {fmt}")
+
+        rows = self.iter_rows(dataset, user_ids)
+        columns = EXPORT_DATASETS[dataset]
+
+        if fmt == 'csv':
+            return self._write_csv(rows, columns, out)
+        if fmt == 'jsonl':
+            return self._write_jsonl(rows, out)
+        return self._write_parquet(rows, columns, out)
+
+    def export_user(self, user_id: str, dataset: str, fmt: str, out: BinaryIO) -> int:
+        """Write one user's dataset to a binary stream"""
+        return self.export(dataset, fmt, out, [user_id])
+
+    def export_all_users(self, dataset: str, fmt: str, out: BinaryIO) -> int:
+        """Write the dataset for every user to a binary stream"""
+        return self.export(dataset, fmt, out, self.db.iter_user_ids(self.batch_size))
+
+    # ============= WRITERS =============
+
+    @staticmethod
+    def _text_value(value):
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    def _write_csv(self, rows: Iterator[Dict], columns: Dict, out: BinaryIO) -> int:
+        text = io.TextIOWrapper(out, encoding='utf-8', newline='')
+        writer = csv.DictWriter(text, fieldnames=list(columns))
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow({k: self._text_value(v) for k, v in row.items()})
+            count += 1
+        text.flush()
+        text.detach()  # Leave the caller's stream open
+        return count
+
+    def _write_jsonl(self, rows: Iterator[Dict], out: BinaryIO) -> int:
+        count = 0
+        for row in rows:
+            out.write(json.dumps({k: self._text_value(v) for k, v in row.items()}).encode('utf-8'))
+            out.write(b"\n")
+            count += 1
+        return count
+
+    def _write_parquet(self, rows: Iterator[Dict], columns: Dict, out: BinaryIO) -> int:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {'string': pa.string(), 'timestamp': pa.timestamp('ms'), 'int': pa.int64(), 'float': pa.float64()}
+        schema = pa.schema([(name, types[kind]) for name, kind in columns.items()])
+
+        count = 0
+        batch: List[Dict] = []
+        with pq.ParquetWriter(out, schema) as writer:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    # One row group per batch keeps memory bounded by the batch size
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    count += len(batch)
+                    batch = []
+            if batch or count == 0:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+        return count
@@ -0,0 +1,187 @@
+"""
+Forecast Service
+Next-week forecasts of steps, sleep and water, fitted for many users at once:
+
+    python forecast_service.py                      # forecast every user (e.g. nightly from cron)
+    python forecast_service.py --user-id 65f0c0ffee...
+
+Users are processed FORECAST_BATCH_SIZE at a time. Each chunk's last
+FORECAST_HISTORY_WEEKS weeks are read in one query into a users x days x
+metrics array, and both models are fitted across the whole chunk with array
+operations:
+- simple exponential smoothing (FORECAST_ALPHA), a flat forecast of the level
+- seasonal naive, each weekday's mean over the last FORECAST_SEASONS weeks
+
+Each user's metric gets whichever model forecast the latest week better from
+the weeks before it. Forecasts are stored one document per user, so the
+dashboard reads its targets with a single lookup.
+"""
+
+import argparse
+from datetime import datetime, time, timedelta
+from itertools import islice
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from bson import ObjectId
+from config import Config
+from storage_backend import get_storage, storage_supports
+
+if TYPE_CHECKING:
+    import numpy as np
+
+FORECAST_METRICS = ['steps', 'sleep_hours', 'water_intake']
+HORIZON_DAYS = 7  # Next week, which is also the seasonal period
+DECIMALS = {'steps': 0, 'sleep_hours': 1, 'water_intake': 1}
+
+def _mean_ignoring_nan(values: "np.ndarray", axis: int) -> "np.ndarray":
+    """nanmean without the warning for all-NaN slices (which stay NaN)"""
+    import numpy as np
+
+    present = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(present, values, 0.0).sum(axis=axis) / present.sum(axis=axis)
+
+def smoothed_level(values: "np.ndarray", alpha: float) -> "np.ndarray":
+    """Final exponential smoothing level of (users, days, metrics) values; days not logged leave it unchanged"""
+    import numpy as np
+
+    level = np.full((values.shape[0], values.shape[2]), np.nan)
+    for day in values.transpose(1, 0, 2):
+        updated = np.where(np.isnan(level), day, alpha * day + (1 - alpha) * level)
+        level = np.where(np.isnan(day), level, updated)
+    return level
+
+def seasonal_means(values: "np.ndarray", seasons: int) -> "np.ndarray":
+    """(users, 7, metrics) mean of each weekday over the last `seasons` weeks.
+
+    `values` covers whole weeks ending the day before the forecast starts, so
+    column p of every week falls on the same weekday as forecast day p.
+    """
+    weeks = values[:, -seasons * HORIZON_DAYS:]
+    weeks = weeks.reshape(values.shape[0], -1, HORIZON_DAYS, values.shape[2])
+    return _mean_ignoring_nan(weeks, axis=1)
+
+def fit_models(values: "np.ndarray", alpha: float, seasons: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Smoothing and seasonal naive forecasts for the week after `values`, each (users, 7, metrics)"""
+    import numpy as np
+
+    smoothing = np.repeat(smoothed_level(values, alpha)[:, None, :], HORIZON_DAYS, axis=1)
+    # Weekdays never logged recently fall back to the smoothed level
+    seasonal = seasonal_means(values, seasons)
+    return smoothing, np.where(np.isnan(seasonal), smoothing, seasonal)
+
+def forecast(values: "np.ndarray", alpha: float, seasons: int) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Next-week forecast (users, 7, metrics), and where the seasonal model was chosen (users, metrics).
+
+    Both models forecast the last week of `values` from the weeks before it; the
+    one with the lower mean absolute error is refitted on all of it.
+    """
+    import numpy as np
+
+    held_out = values[:, -HORIZON_DAYS:]
+    smoothing, seasonal = fit_models(values[:, :-HORIZON_DAYS], alpha, seasons)
+    smoothing_error = _mean_ignoring_nan(np.abs(smoothing - held_out), axis=1)
+    seasonal_error = _mean_ignoring_nan(np.abs(seasonal - held_out), axis=1)
+    seasonal_wins = seasonal_error < smoothing_error  # NaN (nothing to compare) keeps smoothing
+
+    smoothing, seasonal = fit_models(values, alpha, seasons)
+    return np.where(seasonal_wins[:, None, :], seasonal, smoothing), seasonal_wins
+
+class ForecastService:
+    """Nightly next-week forecasts, read back as daily targets"""
+
+    def __init__(self):
+        self.db = get_storage()
+
+    @staticmethod
+    def history_days() -> int:
+        # At least two weeks: one to fit on and one to choose the model with
+        return max(2, Config.FORECAST_HISTORY_WEEKS) * HORIZON_DAYS
+
+    def _load_history(self, user_ids: List[ObjectId], start: datetime) -> "np.ndarray":
+        """(users, days, metrics) values for the days before `start`, NaN where not logged"""
+        import numpy as np
+
+        days = self.history_days()
+        first = start - timedelta(days=days)
+        position = {user_id: i for i, user_id in enumerate(user_ids)}
+        rows, columns, values = [], [], []
+        for entry in self.db.get_recent_entries_for_users(user_ids, first, FORECAST_METRICS):
+            day = (entry['date'] - first).days
+            if day < days:
+                rows.append(position[entry['user_id']])
+                columns.append(day)
+                values.append([entry.get(metric) for metric in FORECAST_METRICS])
+
+        history = np.full((len(user_ids), days, len(FORECAST_METRICS)), np.nan)
+        if values:
+            history[rows, columns] = np.array(values, dtype=float)  # None becomes NaN
+        return history
+
+    def forecast_users(self, user_ids: List[ObjectId], start: datetime) -> List[Dict]:
+        """Forecast documents for the week from `start` (a UTC midnight), for users with enough data"""
+        import numpy as np
+
+        history = self._load_history(user_ids, start)
+        predicted, seasonal_wins = forecast(history, Config.FORECAST_ALPHA, Config.FORECAST_SEASONS)
+        enough = (~np.isnan(history)).sum(axis=1) >= Config.FORECAST_MIN_DAYS
+
+        now = datetime.utcnow()
+        documents = []
+        for i in np.flatnonzero(enough.any(axis=1)):
+            metrics = {
+                metric: {
+                    "daily": np.round(predicted[i, :, j], DECIMALS[metric]).tolist(),
+                    "model": "seasonal_naive" if seasonal_wins[i, j] else "smoothing"
+                }
+                for j, metric in enumerate(FORECAST_METRICS) if enough[i, j]
+            }
+            documents.append({"user_id": user_ids[i], "start": start, "metrics": metrics, "generated_at": now})
+        return documents
+
+    def forecast_all(self, user_ids: Optional[List[str]] = None, start: Optional[datetime] = None) -> Dict:
+        """Forecast and store every user (or the given users), one chunk of users per read and write"""
+        start = start or datetime.combine(datetime.utcnow().date(), time())
+        ids = (ObjectId(str(user_id)) for user_id in (user_ids or self.db.iter_user_ids()))
+        totals = {"users": 0, "forecasts": 0}
+        while True:
+            chunk = list(islice(ids, Config.FORECAST_BATCH_SIZE))
+            if not chunk:
+                return totals
+            documents = self.forecast_users(chunk, start)
+            self.db.save_forecasts(documents)
+            totals["users"] += len(chunk)
+            totals["forecasts"] += len(documents)
+
+    def get_targets(self, user_id: str, day: Optional[datetime] = None) -> Dict[str, float]:
+        """Forecast values for `day` (default today) by metric; empty without a current forecast"""
+        if not self.db.supports('forecasts'):
+            return {}
+        document = self.db.get_forecast(user_id)
+        if not document:
+            return {}
+        offset = ((day or datetime.utcnow()).date() - document['start'].date()).days
+        if not 0 <= offset < HORIZON_DAYS:
+            return {}
+        return {metric: values['daily'][offset] for metric, values in document['metrics'].items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--user-id', action='append', help="Limit to these users (repeatable; default: all)")
+    args = parser.parse_args()
+
+    if not storage_supports('forecasts'):
+        print("❌ Forecasts need the MongoDB storage backend (STORAGE_BACKEND=mongodb)")
+        return 1
+    if 0 < Config.ARCHIVE_AFTER_DAYS <= ForecastService.history_days():
+        # History is read from hot entries only
+        print(f"❌ FORECAST_HISTORY_WEEKS must cover fewer days than ARCHIVE_AFTER_DAYS ({Config.ARCHIVE_AFTER_DAYS})")
+        return 1
+
+    started = datetime.utcnow()
+    totals = ForecastService().forecast_all(args.user_id)
+    elapsed = (datetime.utcnow() - started).total_seconds()
+    print(f"✅ Forecast next week for {totals['forecasts']:,} of {totals['users']:,} users in {elapsed:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""
+Goals Service
+Per-user daily goals and milestone detection on every entry write
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+from config import Config
+from storage_backend import get_storage
+from milestones import MilestoneState, GOAL_METRICS
+from validators import HEALTH_BOUNDS
+
+# Label and unit for each goal metric, for forms and alerts
+GOAL_LABELS = {
+    'steps': ('Steps', 'steps'),
+    'water_intake': ('Water', 'glasses'),
+    'sleep_hours': ('Sleep', 'hours'),
+    'calories': ('Calories', 'kcal')
+}
+
+def default_goals() -> Dict:
+    return {
+        'steps': Config.DEFAULT_STEP_GOAL,
+        'water_intake': Config.DEFAULT_WATER_GOAL,
+        'sleep_hours': Config.DEFAULT_SLEEP_GOAL,
+        'calories': Config.DEFAULT_CALORIE_GOAL
+    }
+
+class GoalsService:
+    """Goals and milestones, maintained from precomputed per-user state"""
+
+    def __init__(self):
+        self.db = get_storage()
+
+    def get_goals(self, user_id: str) -> Dict:
+        """The user's goals, falling back to the defaults"""
+        return dict(default_goals(), **self.db.get_user_goals(user_id))
+
+    def set_goals(self, user_id: str, goals: Dict) -> Dict:
+        """Save new goals and recompute streaks against them"""
+        errors = []
+        for metric, value in goals.items():
+            if metric not in GOAL_METRICS:
+                errors.append(f"Unknown goal: {metric}")
+                continue
+            low, high, _ = HEALTH_BOUNDS[metric]
+            if not (low < value <= high):
+                errors.append(f"{GOAL_LABELS[metric][0]} goal must be between {low} and {high:,}")
+        if errors:
+            return {"success": False, "message": "; ".join(errors)}
+
+        if not self.db.update_user(user_id, {"goals": goals}):
+            return {"success": False, "message": "Failed to update goals"}
+        # Streaks depend on the goals, so this one-off change replays the history
+        self.rebuild(user_id, alert=False)
+        return {"success": True, "message": "Goals updated successfully"}
+
+    # ============= MILESTONE DETECTION =============
+
+    def observe(self, user_id: str, entry: Dict) -> List[Dict]:
+        """Fold one written entry into the user's milestone state"""
+        return self.observe_batch(user_id, [entry], alert=True)
+
+    def observe_batch(self, user_id: str, entries: List[Dict], alert: bool = True,
+                      retries: int = 3) -> List[Dict]:
+        """Fold written entries (in date order) in; returns the milestones newly reached"""
+        if not self.db.supports('goals'):
+            return []
+        for _ in range(retries):
+            document = self.db.get_milestone_state(user_id)
+            if not document:
+                # Seed from history; the entries just written are already included
+                return self.rebuild(user_id, alert=alert)
+
+            state = MilestoneState(document)
+            reached = []
+            for entry in entries:
+                milestones = state.record(entry['date'].toordinal(), entry)
+                if milestones is None:
+                    # Backfilled day: streaks after it may change
+                    return self.rebuild(user_id, alert=alert)
+                reached.extend(milestones)
+            if self.db.save_milestone_state(user_id, state.to_document(), state.version):
+                return self._record(user_id, reached, alert)
+
+        print(f"Milestone state update conflicted for user {user_id}; rebuilding")
+        return self.rebuild(user_id, alert=alert)
+
+    def rebuild(self, user_id: str, alert: bool = False) -> List[Dict]:
+        """Recompute milestone state from the full entry history"""
+        if not self.db.supports('goals'):
+            return []
+        document = self.db.get_milestone_state(user_id)
+        version = document.get('version', 0) if document else 0
+
+        state = MilestoneState(goals=self.get_goals(user_id))
+        reached = []
+        for entry in self.db.iter_health_entries(user_id):
+            reached.extend(state.record(entry['date'].toordinal(), entry) or [])
+
+        self.db.save_milestone_state(user_id, state.to_document(), version)
+        return self._record(user_id, reached, alert)
+
+    def _record(self, user_id: str, reached: List[Dict], alert: bool) -> List[Dict]:
+        """Store milestones and queue alerts for the ones that are new and recent"""
+        from bson import ObjectId
+        if not reached:
+            return []
+
+        milestones = [
+            {
+                "user_id": ObjectId(user_id),
+                "key": m['key'],
+                "kind": m['kind'],
+                "metric": m['metric'],
+                "value": m['value'],
+                "date": datetime.fromordinal(m['day'])
+            }
+            for m in reached
+        ]
+        new = self.db.save_milestones(milestones)
+
+        if alert and new and Config.MILESTONE_SMS_ALERTS and Config.is_feature_enabled('sms_notifications'):
+            # Only alert on fresh data, not on historical imports or rebuilds
+            recent = datetime.utcnow() - timedelta(days=1)
+            recent = datetime(recent.year, recent.month, recent.day)
+            self.db.enqueue_notifications([
+                {"user_id": m['user_id'], "kind": "milestone", "message": self.describe(m)}
+                for m in new if m['date'] >= recent
+            ])
+        return new
+
+    # ============= READS =============
+
+    def get_progress(self, user_id: str) -> Dict:
+        """Goals with current/longest streaks, personal bests and lifetime totals"""
+        # Without milestone storage, progress starts from empty state
+        document = self.db.get_milestone_state(user_id) if self.db.supports('goals') else None
+        state = MilestoneState(document, goals=self.get_goals(user_id))
+        today = datetime.utcnow().toordinal()
+        return {
+            "goals": state.goals,
+            "streaks": {
+                metric: {
+                    "current": state.current_streak(metric, today),
+                    "longest": state.stats['streaks'][metric]['longest']
+                }
+                for metric in GOAL_METRICS
+            },
+            "bests": {metric: best['value'] for metric, best in state.stats['bests'].items()},
+            "totals": dict(state.stats['totals'])
+        }
+
+    def get_recent_milestones(self, user_id: str, limit: int = 5) -> List[Dict]:
+        if not self.db.supports('goals'):
+            return []
+        return self.db.get_milestones(user_id, limit)
+
+    def describe(self, milestone: Dict) -> str:
+        """Human readable summary of a milestone"""
+        label, unit = GOAL_LABELS[milestone['metric']]
+        value = milestone['value']
+        if milestone['kind'] == 'streak':
+            return f"🎯 {value}-day streak of meeting your {label.lower()} goal"
+        if milestone['kind'] == 'best':
+            return f"🏅 New personal best: {value:,g} {unit} in a day"
+        return f"🏆 {value:,g} {unit} logged in total"
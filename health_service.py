@@ -5,24 +5,33 @@ Manages health data operations and analytics
 
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-from db_manager import DatabaseManager
+from storage_backend import get_storage
 from models import HealthEntry
+from rolling_metrics import RollingMetrics, BUFFER_DAYS
+from anomaly_service import AnomalyService
+from goals_service import GoalsService
+from validators import Validators, HEALTH_BOUNDS
+from event_bus import derived_cache, events_mode
 from bson import ObjectId
 
 class HealthService:
     """Service for managing health data"""
     
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_storage()
+        self.anomalies = AnomalyService()
+        self.goals = GoalsService()
     
     def add_entry(self, user_id: str, entry_data: Dict) -> Dict:
         """Add a new health entry"""
         # Check if entry for today already exists
         existing_entry = self.db.get_entry_by_date(user_id, entry_data['date'])
         
-        if existing_entry:
+        if existing_entry and not existing_entry.get('archived'):
             # Update existing entry
             success = self.db.update_health_entry(str(existing_entry['_id']), entry_data)
+            if success:
+                self._after_write(user_id, entry_data)
             return {
                 "success": success,
                 "message": "Entry updated successfully" if success else "Failed to update entry"
@@ -40,16 +49,17 @@ class HealthService:
                 notes=entry_data.get('notes', '')
             )
             
-            entry_id = self.db.create_health_entry(entry.to_dict())
+            entry_id = self.db.create_health_entry(entry.to_document())
             
             if entry_id:
+                self._after_write(user_id, entry_data)
                 return {"success": True, "message": "Entry added successfully"}
             else:
                 return {"success": False, "message": "Failed to add entry"}
     
-    def get_entries(self, user_id: str, days: int = 30) -> List[Dict]:
-        """Get health entries for a user"""
-        return self.db.get_health_entries(user_id, days)
+    def get_entries(self, user_id: str, days: int = 30, analytics: bool = False) -> List[Dict]:
+        """Get health entries for a user (analytics reads may come from a secondary)"""
+        return self.db.get_health_entries(user_id, days, analytics=analytics)
     
     def get_today_entry(self, user_id: str) -> Optional[Dict]:
         """Get today's health entry"""
@@ -57,7 +67,13 @@ class HealthService:
     
     def get_statistics(self, user_id: str, days: int = 30) -> Dict:
         """Get health statistics"""
-        stats = self.db.get_health_stats(user_id, days)
+        # Keyed by day as well, since the window moves even when the data does not
+        today = datetime.utcnow().date()
+        return derived_cache.get_or_compute(user_id, 'health_entries', ('statistics', days, today),
+                                            lambda: self._compute_statistics(user_id, days))
+    
+    def _compute_statistics(self, user_id: str, days: int) -> Dict:
+        stats = self.db.get_health_stats(user_id, days, analytics=True)
         
         # Format and round values
         formatted_stats = {}
@@ -73,9 +89,129 @@ class HealthService:
         
         return formatted_stats
     
+    def import_entries(self, user_id: str, entries: List[Dict], validate: bool = True) -> Dict:
+        """Bulk import daily entries for a user (one entry per day, last one wins)"""
+        valid_entries = []
+        errors = []
+        if validate and entries:
+            columns = {field: [entry.get(field, 0) for entry in entries] for field in HEALTH_BOUNDS}
+            valid, _, messages = Validators.validate_batch(columns)
+            valid_entries = [entry for entry, ok in zip(entries, valid.tolist()) if ok]
+            errors = [{"index": index, "errors": errs} for index, errs in sorted(messages.items())]
+        else:
+            valid_entries = entries
+        
+        if not valid_entries:
+            return {"success": False, "imported": 0, "errors": errors, "message": "No valid entries"}
+        
+        # Normalized through the model (typed fields, no stray keys) like single writes
+        documents = [
+            HealthEntry.from_document(
+                dict(entry, user_id=user_id, **{field: float(entry.get(field, 0)) for field in HEALTH_BOUNDS})
+            ).to_document()
+            for entry in valid_entries
+        ]
+        
+        # Written in date order (stable, so the last entry for a day still wins) so
+        # change-stream consumers see days in order too
+        ordered = sorted(documents, key=lambda x: x['date'])
+        written = self.db.bulk_upsert_health_entries(user_id, ordered)
+        
+        if not events_mode():
+            self.update_rollups(user_id, ordered)
+            self.goals.observe_batch(user_id, ordered, alert=True)
+        
+        return {
+            "success": True,
+            "imported": written,
+            "errors": errors,
+            "message": f"Imported {written} entries"
+        }
+    
+    def _after_write(self, user_id: str, entry_data: Dict):
+        """Maintain derived data after a single entry write"""
+        if events_mode():
+            return  # The event bus consumer maintains it from the change stream
+        self.update_rollups(user_id, [entry_data])
+        self.goals.observe(user_id, entry_data)
+    
+    def update_rollups(self, user_id: str, entries: List[Dict], alert: bool = True):
+        """Fold written entries (in date order) into rolling metrics and anomaly baselines"""
+        self._update_rolling_metrics(user_id, entries)
+        if len(entries) == 1:
+            self.anomalies.observe(user_id, entries[0], alert=alert)
+        else:
+            self.anomalies.observe_batch(user_id, entries, alert=alert)
+    
+    def _update_rolling_metrics(self, user_id: str, entries: List[Dict], retries: int = 3):
+        """Fold written entries (in date order) into the user's rolling-window accumulators"""
+        if not self.db.supports('rolling_metrics'):
+            return  # Recomputed from recent entries on read instead
+        for _ in range(retries):
+            document = self.db.get_rolling_metrics(user_id)
+            if not document:
+                # Seed from history; the entries just written are already included
+                self.rebuild_rolling_metrics(user_id)
+                return
+            
+            rolling = RollingMetrics(document)
+            changed = False
+            for entry in entries:
+                changed = rolling.record(RollingMetrics.day_number(entry['date']), entry) or changed
+            if not changed:
+                return  # Older than every window
+            if self.db.save_rolling_metrics(user_id, rolling.to_document(), rolling.version):
+                return
+        
+        print(f"Rolling metrics update conflicted for user {user_id}; rebuilding")
+        self.rebuild_rolling_metrics(user_id)
+    
+    def rebuild_rolling_metrics(self, user_id: str) -> RollingMetrics:
+        """Recompute the rolling-window accumulators from recent entries"""
+        stored = self.db.supports('rolling_metrics')
+        document = self.db.get_rolling_metrics(user_id) if stored else None
+        version = document.get('version', 0) if document else 0
+        
+        rolling = RollingMetrics()
+        for entry in sorted(self.get_entries(user_id, days=BUFFER_DAYS), key=lambda x: x['date']):
+            rolling.record(RollingMetrics.day_number(entry['date']), entry)
+        
+        if stored:
+            self.db.save_rolling_metrics(user_id, rolling.to_document(), version)
+        return rolling
+    
+    def get_rolling_metrics(self, user_id: str) -> Dict:
+        """Get rolling 7/30-day mean, variance and trend slope for each metric"""
+        document = self.db.get_rolling_metrics(user_id) if self.db.supports('rolling_metrics') else None
+        rolling = RollingMetrics(document) if document else self.rebuild_rolling_metrics(user_id)
+        
+        # Expire days that have aged out since the last write (in memory only)
+        rolling.advance(RollingMetrics.day_number(datetime.utcnow()))
+        return rolling.summary()
+    
+    def get_rolling_statistics(self, user_id: str, window: int = 7) -> Dict:
+        """Get rolling averages in the same format as get_statistics"""
+        metrics = self.get_rolling_metrics(user_id).get(f"{window}d")
+        if not metrics or not any(m['count'] for m in metrics.values()):
+            return {}
+        
+        return {
+            'avg_steps': round(metrics['steps']['mean']),
+            'avg_calories': round(metrics['calories']['mean']),
+            'avg_heart_rate': round(metrics['heart_rate']['mean']),
+            'avg_sleep': round(metrics['sleep_hours']['mean'], 1),
+            'avg_water': round(metrics['water_intake']['mean'], 1),
+            'total_entries': max(m['count'] for m in metrics.values())
+        }
+    
     def get_weekly_trends(self, user_id: str) -> Dict:
         """Get weekly trend data for charts"""
-        entries = self.get_entries(user_id, days=7)
+        today = datetime.utcnow().date()
+        return derived_cache.get_or_compute(user_id, 'health_entries', ('weekly_trends', today),
+                                            lambda: self._compute_weekly_trends(user_id))
+    
+    def _compute_weekly_trends(self, user_id: str) -> Dict:
+        entries = self.get_entries(user_id, days=7, analytics=True)
         
         # Sort by date
         entries.sort(key=lambda x: x['date'])
@@ -3,11 +3,14 @@ Helper Utilities
 Common utility functions
 """
 
+import hashlib
 from datetime import datetime, timedelta
-from typing import List, Dict
-import pandas as pd
+from typing import List, Dict, TYPE_CHECKING
 from bson import ObjectId
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 class Helpers:
     """Helper utility functions"""
     
@@ -42,8 +45,10 @@ class Helpers:
             return ("Needs Attention", "🔴", "Focus on improving your health habits.")
     
     @staticmethod
-    def entries_to_dataframe(entries: List[Dict]) -> pd.DataFrame:
+    def entries_to_dataframe(entries: List[Dict]) -> "pd.DataFrame":
         """Convert health entries to pandas DataFrame"""
+        import pandas as pd
+        
         if not entries:
             return pd.DataFrame()
         
@@ -55,6 +60,14 @@ class Helpers:
         df['date'] = pd.to_datetime(df['date'])
         return df
     
+    @staticmethod
+    def data_version(df: "pd.DataFrame", columns: List[str]) -> str:
+        """Get a content hash of the given DataFrame columns for cache keys"""
+        import pandas as pd
+        
+        row_hashes = pd.util.hash_pandas_object(df[columns], index=False)
+        return hashlib.sha1(row_hashes.values.tobytes()).hexdigest()
+    
     @staticmethod
     def get_greeting() -> str:
         """Get time-appropriate greeting"""
@@ -0,0 +1,98 @@
+"""
+Ingestion Load Test
+Drives the ingestion service with concurrent batched payloads:
+
+    python ingest_load_test.py --users 50 --days 365 --batch 200 --concurrency 16
+
+Run it against `python ingest_server.py` backed by a local mongod. Entries are
+synthetic and written for random user ids, so use a throwaway database.
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import requests
+from bson import ObjectId
+from config import Config
+
+def make_entries(days: int) -> list:
+    """Synthetic daily entries ending today"""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return [
+        {
+            "date": (today - timedelta(days=i)).date().isoformat(),
+            "steps": random.randint(2000, 15000),
+            "calories": random.randint(1500, 3000),
+            "heart_rate": random.randint(55, 85),
+            "sleep_hours": round(random.uniform(5, 9), 1),
+            "water_intake": random.randint(3, 12)
+        }
+        for i in range(days - 1, -1, -1)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=f"http://{Config.INGEST_HOST}:{Config.INGEST_PORT}")
+    parser.add_argument('--token', default=Config.INGEST_API_TOKEN)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--batch', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--max-retries', type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = []
+    for _ in range(args.users):
+        user_id = str(ObjectId())
+        entries = make_entries(args.days)
+        for start in range(0, len(entries), args.batch):
+            payloads.append({"user_id": user_id, "entries": entries[start:start + args.batch]})
+
+    local = threading.local()
+    latencies = []
+    counts = {"accepted": 0, "throttled": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def send(payload):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+            session.headers['X-API-Key'] = args.token
+
+        for _ in range(args.max_retries):
+            started = time.perf_counter()
+            response = session.post(f"{args.url}/v1/entries", json=payload, timeout=30)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code == 202:
+                    counts['accepted'] += response.json()['accepted']
+                    return
+                if response.status_code != 429:
+                    counts['failed'] += 1
+                    return
+                counts['throttled'] += 1
+            time.sleep(float(response.headers.get('Retry-After', 1)))
+        with lock:
+            counts['failed'] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(send, payloads))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f"Requests:   {len(latencies)} ({len(payloads)} batches, {counts['throttled']} throttled, {counts['failed']} failed)")
+    print(f"Entries:    {counts['accepted']} accepted in {duration:.2f}s ({counts['accepted'] / duration:,.0f}/s)")
+    print(f"Latency:    p50 {quantiles[49] * 1000:.1f} ms, p95 {quantiles[94] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms")
+
+    health = requests.get(f"{args.url}/healthz", timeout=5).json()
+    print(f"Server:     {health}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Ingestion Service
+Headless HTTP endpoint for batched device sync, run separately from the Streamlit app:
+
+    python ingest_server.py
+
+POST /v1/entries   {"user_id": "...", "entries": [{"date": "2024-05-01", "steps": 8000, ...}]}
+POST /v1/samples   {"user_id": "...", "samples": [{"ts": "2024-05-01T08:00:00Z", "heart_rate": 62}]}
+GET  /healthz
+GET  /metrics      Prometheus text format
+
+Requests must send the INGEST_API_TOKEN in an X-API-Key header. Valid batches are
+queued and answered with 202; when the bounded queue is full the server answers
+429 with Retry-After so clients back off instead of piling up work.
+"""
+
+import hmac
+import json
+import queue
+import signal
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from bson import ObjectId
+from config import Config
+from instrumentation import registry
+from service_registry import get_service, shutdown_services
+from health_service import HealthService
+from intraday_service import IntradayService
+from validators import Validators
+
+ENTRY_FIELDS = {
+    'steps': int,
+    'calories': int,
+    'heart_rate': int,
+    'sleep_hours': float,
+    'water_intake': int
+}
+
+class IngestQueue:
+    """Bounded job queue drained by a fixed pool of worker threads"""
+
+    def __init__(self, maxsize: int, workers: int):
+        self.jobs = queue.Queue(maxsize=maxsize)
+        self.health_service = get_service(HealthService)
+        self.intraday_service = get_service(IntradayService)
+        self.stats = {"accepted": 0, "busy": 0, "written": 0, "failed": 0}
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"ingest-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def submit(self, kind: str, user_id: str, items: List[Dict]) -> bool:
+        """Queue a batch without blocking; False means the queue is full"""
+        try:
+            self.jobs.put_nowait((kind, user_id, items))
+        except queue.Full:
+            self._count('busy')
+            return False
+        self._count('accepted')
+        return True
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                kind, user_id, items = job
+                if kind == 'entries':
+                    result = self.health_service.import_entries(user_id, items, validate=False)
+                    self._count('written', result.get('imported', 0))
+                else:
+                    result = self.intraday_service.ingest(user_id, items)
+                    self._count('written', result.get('inserted', 0))
+            except Exception as e:
+                print(f"Ingestion job failed: {e}")
+                self._count('failed')
+            finally:
+                self.jobs.task_done()
+
+    def stop(self):
+        """Finish queued jobs, then stop the workers"""
+        self.jobs.join()
+        for _ in self._threads:
+            self.jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+def parse_entries(raw_entries: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Convert and validate a batch of JSON entries; returns (entries, errors)"""
+    candidates = []
+    errors = []
+
+    for index, raw in enumerate(raw_entries):
+        if not isinstance(raw, dict):
+            errors.append({"index": index, "errors": ["Entry must be an object"]})
+            continue
+        try:
+            date = datetime.fromisoformat(str(raw.get('date')).replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            errors.append({"index": index, "errors": ["Date must be an ISO-8601 date"]})
+            continue
+        candidates.append((index, date, raw))
+
+    if not candidates:
+        return [], errors
+
+    # Range checks for the whole batch in one vectorized pass
+    columns = {field: [raw.get(field, 0) for _, _, raw in candidates] for field in ENTRY_FIELDS}
+    valid, _, messages = Validators.validate_batch(columns)
+
+    entries = []
+    for position, (index, date, raw) in enumerate(candidates):
+        if not valid[position]:
+            errors.append({"index": index, "errors": messages[position]})
+            continue
+        entry = {field: cast(float(raw.get(field, 0))) for field, cast in ENTRY_FIELDS.items()}
+        entry['date'] = date
+        entry['notes'] = str(raw.get('notes') or '')[:320]
+        entries.append(entry)
+
+    errors.sort(key=lambda e: e['index'])
+    return entries, errors
+
+class IngestHandler(BaseHTTPRequestHandler):
+    """HTTP handler for batched ingestion requests"""
+
+    server_version = "HealthTrackerIngest/1.0"
+
+    def log_message(self, format, *args):
+        # Per-request access logs are too noisy at device-sync volumes
+        pass
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/healthz':
+            ingest_queue = self.server.ingest_queue
+            self._send_json(200, {"status": "ok", "queue_depth": ingest_queue.jobs.qsize(), **ingest_queue.stats})
+        elif self.path == '/metrics':
+            body = registry.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        routes = {'/v1/entries': 'entries', '/v1/samples': 'samples'}
+        kind = routes.get(self.path)
+        if not kind:
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        api_key = self.headers.get('X-API-Key', '')
+        if not hmac.compare_digest(api_key.encode('utf-8'), Config.INGEST_API_TOKEN.encode('utf-8')):
+            self._send_json(401, {"error": "Invalid API key"})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > Config.INGEST_MAX_BODY_BYTES:
+            self._send_json(413, {"error": "Request body too large"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._send_json(400, {"error": "Body must be JSON"})
+            return
+
+        user_id = payload.get('user_id') if isinstance(payload, dict) else None
+        items = payload.get(kind) if isinstance(payload, dict) else None
+        if not user_id or not ObjectId.is_valid(user_id) or not isinstance(items, list):
+            self._send_json(400, {"error": f"Expected user_id and a list of {kind}"})
+            return
+        if len(items) > Config.INGEST_MAX_BATCH:
+            self._send_json(413, {"error": f"At most {Config.INGEST_MAX_BATCH} {kind} per request"})
+            return
+
+        errors = []
+        if kind == 'entries':
+            items, errors = parse_entries(items)
+            if not items:
+                self._send_json(422, {"accepted": 0, "errors": errors})
+                return
+
+        if not self.server.ingest_queue.submit(kind, user_id, items):
+            self._send_json(429, {"error": "Ingestion queue is full, retry later"}, {"Retry-After": "1"})
+            return
+
+        self._send_json(202, {"accepted": len(items), "errors": errors})
+
+def main():
+    """Run the ingestion service until interrupted"""
+    if not Config.INGEST_API_TOKEN:
+        print("❌ INGEST_API_TOKEN is not set; refusing to start an unauthenticated endpoint")
+        return 1
+
+    ingest_queue = IngestQueue(Config.INGEST_QUEUE_SIZE, Config.INGEST_WORKERS)
+    ingest_queue.start()
+
+    server = ThreadingHTTPServer((Config.INGEST_HOST, Config.INGEST_PORT), IngestHandler)
+    server.daemon_threads = True
+    server.ingest_queue = ingest_queue
+
+    # serve_forever() must be stopped from another thread
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+
+    print(f"✅ Ingestion service listening on http://{Config.INGEST_HOST}:{Config.INGEST_PORT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Draining ingestion queue...")
+        ingest_queue.stop()
+        shutdown_services()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,300 @@
+"""
+Instrumentation
+In-process timing histograms and counters with Prometheus text export
+"""
+
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+from pymongo import monitoring
+
+# Latency buckets in seconds (upper bounds), as used by Prometheus clients
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _label_key(labelnames: Tuple[str, ...], labels: Dict) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                for key, value in sorted(self.samples().items())]
+
+class Histogram:
+    """Fixed-bucket latency histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + seconds)
+
+    def samples(self) -> Dict[Tuple[str, ...], Tuple[List[int], float]]:
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+
+    def summary(self, key: Tuple[str, ...]) -> Dict:
+        """Count, mean and estimated p50/p95/p99 for one label set"""
+        counts, total = self.samples().get(key, ([0] * (len(self.buckets) + 1), 0.0))
+        count = sum(counts)
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": self._quantile(counts, 0.50),
+            "p95": self._quantile(counts, 0.95),
+            "p99": self._quantile(counts, 0.99)
+        }
+
+    def _quantile(self, counts: List[int], q: float) -> float:
+        """Estimate a quantile by linear interpolation within the bucket"""
+        count = sum(counts)
+        if not count:
+            return 0.0
+        rank = q * count
+        cumulative = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if cumulative + bucket_count >= rank and bucket_count:
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = upper
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self.samples().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Process-wide registry of metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames))
+
+    def metrics(self) -> List:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+DB_OPERATION_SECONDS = registry.histogram(
+    'health_tracker_db_operation_seconds', 'DatabaseManager method latency', ['operation'])
+DB_OPERATION_ERRORS = registry.counter(
+    'health_tracker_db_operation_errors_total', 'DatabaseManager method failures', ['operation'])
+MONGO_COMMAND_SECONDS = registry.histogram(
+    'health_tracker_mongo_command_seconds', 'MongoDB command round-trip latency', ['command'])
+MONGO_COMMAND_FAILURES = registry.counter(
+    'health_tracker_mongo_command_failures_total', 'MongoDB commands that failed', ['command'])
+MONGO_POOL_WAIT_SECONDS = registry.histogram(
+    'health_tracker_mongo_pool_wait_seconds', 'Time spent waiting to check out a pooled connection')
+MONGO_POOL_CHECKOUT_FAILURES = registry.counter(
+    'health_tracker_mongo_pool_checkout_failures_total', 'Connection checkouts that failed', ['reason'])
+EXTERNAL_CALL_SECONDS = registry.histogram(
+    'health_tracker_external_call_seconds', 'Latency of calls to external APIs', ['service', 'operation'])
+EXTERNAL_CALL_ERRORS = registry.counter(
+    'health_tracker_external_call_errors_total', 'Failed calls to external APIs', ['service', 'operation'])
+PAGE_RENDER_SECONDS = registry.histogram(
+    'health_tracker_page_render_seconds', 'Streamlit page render latency', ['page'])
+
+@contextmanager
+def timed(histogram: Histogram, errors: Optional[Counter] = None, **labels):
+    """Time a block into a histogram, counting exceptions in `errors`"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        if errors is not None:
+            errors.inc(**labels)
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+def instrument_methods(cls):
+    """Class decorator: time every public method into DB_OPERATION_SECONDS"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(method):
+            continue
+
+        def wrap(func, operation):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with timed(DB_OPERATION_SECONDS, DB_OPERATION_ERRORS, operation=operation):
+                    return func(*args, **kwargs)
+            return wrapper
+
+        setattr(cls, name, wrap(method, name))
+    return cls
+
+class CommandTimingListener(monitoring.CommandListener):
+    """Records every MongoDB command's server round-trip time"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name)
+        MONGO_COMMAND_FAILURES.inc(command=event.command_name)
+
+class PoolWaitListener(monitoring.ConnectionPoolListener):
+    """Records how long operations wait for a pooled connection"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        if started is not None:
+            MONGO_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+            self._local.started = None
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        MONGO_POOL_CHECKOUT_FAILURES.inc(reason=event.reason)
+
+    # Remaining pool events are not needed for wait timing
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry at GET /metrics"""
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the app's log
+        pass
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+def start_metrics_server(host: str, port: int) -> bool:
+    """Serve this process's metrics at http://host:port/metrics from a daemon thread.
+
+    Safe to call on every Streamlit rerun: only the first call starts a server,
+    and a port that cannot be bound is reported once rather than retried.
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+                _metrics_server.daemon_threads = True
+            except OSError as e:
+                _metrics_server = False
+                print(f"⚠️ Metrics exporter could not listen on {host}:{port}: {e}")
+                return False
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics-exporter", daemon=True).start()
+            print(f"✅ Metrics exporter listening on http://{host}:{port}/metrics")
+        return bool(_metrics_server)
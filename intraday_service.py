@@ -0,0 +1,113 @@
+"""
+Intraday Service
+Stores per-minute wearable samples and derives daily values from them
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from bson import ObjectId
+from config import Config
+from storage_backend import get_storage
+from models import IntradaySample
+from validators import Validators
+
+class IntradayService:
+    """Service for intraday (per-minute) heart rate and step samples"""
+
+    def __init__(self):
+        self.db = get_storage()
+
+    @staticmethod
+    def _parse_timestamp(value) -> Optional[datetime]:
+        """Accept datetimes or ISO-8601 strings; returns naive UTC (naive input is taken as UTC)"""
+        if not isinstance(value, datetime):
+            try:
+                value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            except ValueError:
+                return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def ingest(self, user_id: str, samples: List[Dict]) -> Dict:
+        """Validate and store a batch of samples for a user"""
+        if not self.db.supports('intraday'):
+            return {"success": False, "inserted": 0, "rejected": len(samples),
+                    "message": "Intraday samples need the MongoDB storage backend"}
+        documents = []
+        rejected = 0
+
+        for sample in samples:
+            ts = self._parse_timestamp(sample.get('ts'))
+            heart_rate = sample.get('heart_rate')
+            steps = sample.get('steps')
+
+            if ts is None or (heart_rate is None and steps is None):
+                rejected += 1
+                continue
+            if heart_rate is not None and not Validators.is_valid_health_value(heart_rate, 30, 220):
+                rejected += 1
+                continue
+            if steps is not None and not Validators.is_valid_health_value(steps, 0, 100000):
+                rejected += 1
+                continue
+
+            documents.append(IntradaySample(
+                user_id=ObjectId(user_id),
+                ts=ts,
+                # Validated with float(), so "72.5" is accepted and must convert the same way
+                heart_rate=int(round(float(heart_rate))) if heart_rate is not None else None,
+                steps=int(float(steps)) if steps is not None else None
+            ).to_document())
+
+        inserted = self.db.insert_intraday_samples(documents, Config.INTRADAY_BATCH_SIZE) if documents else 0
+        return {"success": inserted > 0, "inserted": inserted, "rejected": rejected}
+
+    def get_samples(self, user_id: str, start: datetime, end: datetime,
+                    metric: Optional[str] = None) -> List[Dict]:
+        """Get raw samples in [start, end), optionally only those with a given metric"""
+        if not self.db.supports('intraday'):
+            return []
+        return self.db.get_intraday_samples(user_id, start, end, metric)
+
+    def downsample(self, user_id: str, start: datetime, end: datetime,
+                   bucket_minutes: int = 15) -> List[Dict]:
+        """Get samples aggregated into buckets of the given size"""
+        if not self.db.supports('intraday'):
+            return []
+        return self.db.downsample_intraday(user_id, start, end, bucket_minutes)
+
+    def derive_daily_values(self, user_id: str, date: datetime) -> Dict:
+        """Derive a day's steps (total) and heart rate (average) from intraday samples"""
+        if not self.db.supports('intraday'):
+            return {}
+        start_of_day = datetime(date.year, date.month, date.day)
+        totals = self.db.get_intraday_daily_totals(user_id, start_of_day, start_of_day + timedelta(days=1))
+
+        if not totals:
+            return {}
+
+        day = totals[0]
+        derived = {"date": start_of_day, "samples": day['samples']}
+        if day.get('steps'):
+            derived['steps'] = int(day['steps'])
+        if day.get('heart_rate') is not None:
+            derived['heart_rate'] = round(day['heart_rate'])
+        return derived
+
+    def sync_daily_entry(self, user_id: str, date: datetime) -> Dict:
+        """Overwrite a day's logged steps and heart rate with the derived values"""
+        from health_service import HealthService
+        from service_registry import get_service
+        derived = self.derive_daily_values(user_id, date)
+        if not derived:
+            return {"success": False, "message": "No intraday samples for this day"}
+
+        health_service = get_service(HealthService)
+        entry = health_service.db.get_entry_by_date(user_id, date)
+        if not entry:
+            return {"success": False, "message": "No daily entry to update", "derived": derived}
+
+        entry_data = {k: v for k, v in entry.items() if k not in ('_id', 'user_id', 'created_at', 'archived')}
+        entry_data.update({k: derived[k] for k in ('steps', 'heart_rate') if k in derived})
+        return health_service.add_entry(user_id, entry_data)
@@ -0,0 +1,155 @@
+"""
+Milestones
+Incrementally maintained goal streaks, personal bests and cumulative totals
+"""
+
+import copy
+from typing import Dict, List, Optional
+
+# Metrics with a daily goal, and whether the goal is a floor ('min') or a ceiling ('max')
+GOAL_METRICS = {
+    'steps': 'min',
+    'water_intake': 'min',
+    'sleep_hours': 'min',
+    'calories': 'max'
+}
+
+# Consecutive days meeting a goal that count as a milestone
+STREAK_MILESTONES = (3, 7, 14, 30, 60, 100, 180, 365)
+
+# Metrics with personal bests; bests only count once there is some history to beat
+BEST_METRICS = ('steps', 'water_intake')
+BEST_MIN_ENTRIES = 7
+
+# Lifetime totals that count as a milestone when crossed
+TOTAL_MILESTONES = {
+    'steps': (100000, 250000, 500000, 1000000, 2500000, 5000000, 10000000),
+    'water_intake': (100, 250, 500, 1000, 2500, 5000)
+}
+
+class MilestoneState:
+    """Per-user goal streaks, personal bests and lifetime totals.
+
+    Days are folded in in date order, each in O(metrics). The stats before the
+    latest day are kept so that day can be overwritten by rewinding to them. A
+    backfilled (older) day cannot be folded in; the caller rebuilds from history.
+    """
+
+    def __init__(self, document: Optional[Dict] = None, goals: Optional[Dict] = None):
+        document = document or {}
+        self.version = document.get('version', 0)
+        self.goals = goals or document.get('goals') or {}
+        self.latest_day = document.get('latest_day')
+        self.stats = document.get('stats') or self._empty_stats()
+        self.previous = document.get('previous')
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            "entries": 0,
+            "streaks": {metric: {"current": 0, "longest": 0, "start": None, "last_hit": None}
+                        for metric in GOAL_METRICS},
+            "bests": {metric: {"value": None, "day": None} for metric in BEST_METRICS},
+            "totals": {metric: 0 for metric in TOTAL_MILESTONES}
+        }
+
+    def goal_met(self, metric: str, value: float) -> bool:
+        goal = self.goals.get(metric)
+        if goal is None:
+            return False
+        return value <= goal if GOAL_METRICS[metric] == 'max' else value >= goal
+
+    # ============= UPDATES =============
+
+    def record(self, day: int, values: Dict) -> Optional[List[Dict]]:
+        """Fold in (or overwrite) the latest day's values.
+
+        Returns the milestones reached on that day, or None if the day is older than
+        the latest one and the state has to be rebuilt.
+        """
+        if self.latest_day is not None and day < self.latest_day:
+            return None
+        if day == self.latest_day:
+            # Overwrite of the latest day: start again from the stats before it
+            before = self.previous or self._empty_stats()
+        else:
+            before = self.stats
+
+        stats = copy.deepcopy(before)
+        reached = []
+        for metric in GOAL_METRICS:
+            value = values.get(metric)
+            if value is not None:
+                reached.extend(self._update_streak(stats['streaks'][metric], metric, day, value))
+        for metric in BEST_METRICS:
+            value = values.get(metric)
+            if value is not None:
+                reached.extend(self._update_best(stats['bests'][metric], metric, day, value, stats['entries']))
+        for metric in TOTAL_MILESTONES:
+            value = values.get(metric)
+            if value is not None:
+                reached.extend(self._update_total(stats['totals'], metric, day, value))
+        stats['entries'] += 1
+
+        self.previous = before
+        self.stats = stats
+        self.latest_day = day
+        return reached
+
+    def _update_streak(self, streak: Dict, metric: str, day: int, value: float) -> List[Dict]:
+        if not self.goal_met(metric, value):
+            streak['current'] = 0
+            return []
+        if streak['last_hit'] == day - 1 and streak['current']:
+            streak['current'] += 1
+        else:
+            streak['current'] = 1
+            streak['start'] = day
+        streak['last_hit'] = day
+        streak['longest'] = max(streak['longest'], streak['current'])
+        if streak['current'] not in STREAK_MILESTONES:
+            return []
+        # Keyed by the streak's first day: a new streak can reach the same length again
+        return [self._milestone('streak', metric, day, streak['current'],
+                                f"streak:{metric}:{streak['current']}:{streak['start']}")]
+
+    def _update_best(self, best: Dict, metric: str, day: int, value: float, entries: int) -> List[Dict]:
+        if best['value'] is not None and value <= best['value']:
+            return []
+        is_milestone = best['value'] is not None and entries >= BEST_MIN_ENTRIES
+        best['value'] = value
+        best['day'] = day
+        if not is_milestone:
+            return []
+        return [self._milestone('best', metric, day, value, f"best:{metric}:{day}")]
+
+    def _update_total(self, totals: Dict, metric: str, day: int, value: float) -> List[Dict]:
+        before = totals[metric]
+        totals[metric] = before + value
+        return [
+            self._milestone('total', metric, day, threshold, f"total:{metric}:{threshold}")
+            for threshold in TOTAL_MILESTONES[metric]
+            if before < threshold <= totals[metric]
+        ]
+
+    @staticmethod
+    def _milestone(kind: str, metric: str, day: int, value: float, key: str) -> Dict:
+        return {"kind": kind, "metric": metric, "day": day, "value": value, "key": key}
+
+    # ============= READS =============
+
+    def current_streak(self, metric: str, today: int) -> int:
+        """Streak length as of today (a streak whose last hit was before yesterday has lapsed)"""
+        streak = self.stats['streaks'][metric]
+        if streak['last_hit'] is None or streak['last_hit'] < today - 1:
+            return 0
+        return streak['current']
+
+    def to_document(self) -> Dict:
+        return {
+            "version": self.version,
+            "goals": self.goals,
+            "latest_day": self.latest_day,
+            "stats": self.stats,
+            "previous": self.previous
+        }
@@ -4,11 +4,71 @@ Defines the structure of data objects
 """
 
 from datetime import datetime
-from typing import Optional
-from dataclasses import dataclass, asdict
+from operator import attrgetter
+from typing import Callable, ClassVar, Dict, List, Optional, Tuple
+from dataclasses import dataclass, fields
+from bson import ObjectId
 
-@dataclass
-class User:
+# ============= FIELD CONVERTERS =============
+
+def to_object_id(value) -> ObjectId:
+    """Convert a string id to ObjectId (ObjectIds pass through)"""
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+def to_datetime(value) -> datetime:
+    """Convert an ISO-8601 string to datetime (datetimes pass through)"""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+class DocumentModel:
+    """Base for slotted models with flat MongoDB document codecs.
+
+    Documents are built field by field without the recursive deep copy done by
+    dataclasses.asdict. The optional `id` field maps to the document `_id`.
+    """
+    __slots__ = ()
+
+    _fields: ClassVar[Tuple[str, ...]] = ()
+    _values: ClassVar[Callable] = None
+    _converters: ClassVar[Dict[str, Callable]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._converters = dict(getattr(cls, 'CONVERTERS', {}))
+
+    def to_document(self) -> Dict:
+        """Convert to a MongoDB document (shallow; values are not copied)"""
+        document = dict(zip(self._fields, self._values(self)))
+        if getattr(self, 'id', None) is not None:
+            document['_id'] = self.id
+        return document
+
+    @classmethod
+    def from_document(cls, document: Dict):
+        """Build a model from a MongoDB document, converting typed fields"""
+        converters = cls._converters
+        values = {}
+        for name in cls._fields:
+            value = document.get(name)
+            if value is not None and name in converters:
+                value = converters[name](value)
+            if value is not None or name in document:
+                values[name] = value
+        if '_id' in document and 'id' in cls.__dataclass_fields__:
+            values['id'] = document['_id']
+        return cls(**values)
+
+    def to_dict(self):
+        return self.to_document()
+
+def document_model(cls):
+    """Finish a slotted document model: record its document field names"""
+    cls._fields = tuple(f.name for f in fields(cls) if f.name != 'id')
+    cls._values = attrgetter(*cls._fields)
+    return cls
+
+@document_model
+@dataclass(slots=True)
+class User(DocumentModel):
     """User model"""
     username: str
     email: str
@@ -16,12 +76,16 @@ class User:
     password_hash: str
     created_at: datetime = None
     updated_at: datetime = None
-    
-    def to_dict(self):
-        return asdict(self)
+    id: Optional[ObjectId] = None
+
+    CONVERTERS: ClassVar[Dict[str, Callable]] = {
+        'created_at': to_datetime,
+        'updated_at': to_datetime
+    }
 
-@dataclass
-class HealthEntry:
+@document_model
+@dataclass(slots=True)
+class HealthEntry(DocumentModel):
     """Health entry model"""
     user_id: str
     date: datetime
@@ -32,12 +96,22 @@ class HealthEntry:
     water_intake: int
     notes: Optional[str] = ""
     created_at: datetime = None
-    
-    def to_dict(self):
-        return asdict(self)
+    id: Optional[ObjectId] = None
 
-@dataclass
-class Streak:
+    CONVERTERS: ClassVar[Dict[str, Callable]] = {
+        'user_id': to_object_id,
+        'date': to_datetime,
+        'steps': int,
+        'calories': int,
+        'heart_rate': int,
+        'sleep_hours': float,
+        'water_intake': int,
+        'created_at': to_datetime
+    }
+
+@document_model
+@dataclass(slots=True)
+class Streak(DocumentModel):
     """Login streak model"""
     user_id: str
     current_streak: int
@@ -45,17 +119,90 @@ class Streak:
     last_login: datetime
     login_dates: list
     updated_at: datetime = None
-    
-    def to_dict(self):
-        return asdict(self)
+    id: Optional[ObjectId] = None
 
-@dataclass
-class HealthTip:
+    CONVERTERS: ClassVar[Dict[str, Callable]] = {
+        'user_id': to_object_id,
+        'current_streak': int,
+        'longest_streak': int,
+        'last_login': to_datetime,
+        'updated_at': to_datetime
+    }
+
+@document_model
+@dataclass(slots=True)
+class HealthTip(DocumentModel):
     """AI health tip model"""
     user_id: str
     tip_text: str
     category: str
     created_at: datetime = None
-    
-    def to_dict(self):
-        return asdict(self)
+    id: Optional[ObjectId] = None
+
+    CONVERTERS: ClassVar[Dict[str, Callable]] = {
+        'user_id': to_object_id,
+        'created_at': to_datetime
+    }
+
+@document_model
+@dataclass(slots=True)
+class IntradaySample(DocumentModel):
+    """Intraday wearable sample model"""
+    user_id: str
+    ts: datetime
+    heart_rate: Optional[int] = None
+    steps: Optional[int] = None
+
+    CONVERTERS: ClassVar[Dict[str, Callable]] = {
+        'user_id': to_object_id,
+        'ts': to_datetime,
+        'heart_rate': int,
+        'steps': int
+    }
+
+    def to_document(self) -> Dict:
+        # Omit metrics the device did not report to keep time-series buckets small
+        document = {"user_id": self.user_id, "ts": self.ts}
+        if self.heart_rate is not None:
+            document['heart_rate'] = self.heart_rate
+        if self.steps is not None:
+            document['steps'] = self.steps
+        return document
+
+# Per-day fields kept in monthly archive buckets, one array per field
+ARCHIVED_ENTRY_FIELDS = ('steps', 'calories', 'heart_rate', 'sleep_hours', 'water_intake', 'notes', 'created_at')
+
+class EntryArchiveBucket:
+    """Codec for one user-month of archived health entries.
+
+    A bucket stores the day of month of every archived entry in `days` (ascending)
+    and each metric as an array aligned with it, so a month costs one document and
+    one index key instead of up to 31.
+    """
+
+    @staticmethod
+    def month_start(value: datetime) -> datetime:
+        return datetime(value.year, value.month, 1)
+
+    @staticmethod
+    def to_document(user_id, month: datetime, entries: List[Dict]) -> Dict:
+        """Build a bucket from entries of one month (the last entry for a day wins)"""
+        by_day = {entry['date'].day: entry for entry in entries}
+        days = sorted(by_day)
+        document = {"user_id": to_object_id(user_id), "month": month, "days": days, "count": len(days)}
+        for field in ARCHIVED_ENTRY_FIELDS:
+            document[field] = [by_day[day].get(field) for day in days]
+        return document
+
+    @staticmethod
+    def expand(bucket: Dict) -> List[Dict]:
+        """Entries of a bucket as entry documents, oldest first (marked `archived`, no _id)"""
+        month = bucket['month']
+        entries = []
+        for i, day in enumerate(bucket['days']):
+            entry = {"user_id": bucket['user_id'], "date": month.replace(day=day), "archived": True}
+            for field in ARCHIVED_ENTRY_FIELDS:
+                values = bucket.get(field)
+                entry[field] = values[i] if values else None
+            entries.append(entry)
+        return entries
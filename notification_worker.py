@@ -0,0 +1,128 @@
+"""
+Notification Worker
+Delivers queued SMS notifications (milestones, anomaly alerts, daily reminders) through Twilio:
+
+    python notification_worker.py            # poll the queue until interrupted
+    python notification_worker.py --once     # drain what is due and exit (e.g. from cron)
+
+Entry writes only enqueue notifications, so a slow or failing SMS provider never
+holds up a page render or an ingestion batch. Each notification is claimed
+atomically with a lease, so several workers can run side by side; failed sends
+are retried with exponential backoff up to NOTIFICATION_MAX_ATTEMPTS.
+"""
+
+import argparse
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from config import Config
+from db_manager import DatabaseManager
+from service_registry import get_service, shutdown_services
+from storage_backend import storage_supports
+from twilio_service import TwilioService
+
+# TwilioService method used for each notification kind
+SENDERS = {
+    'milestone': 'send_milestone_alert',
+    'anomaly': 'send_anomaly_alert',
+    'reminder': 'send_daily_reminder'
+}
+
+MAX_BACKOFF_SECONDS = 3600
+
+class NotificationWorker:
+    """Claims due notifications from the queue and sends them"""
+
+    def __init__(self):
+        self.db = DatabaseManager()
+        self.twilio = get_service(TwilioService)
+        self.stopping = threading.Event()
+
+    def process_one(self) -> Optional[str]:
+        """Send the oldest due notification; returns its outcome, or None if none was due"""
+        notification = self.db.claim_notification(Config.NOTIFICATION_LEASE_SECONDS)
+        if not notification:
+            return None
+
+        result = self._deliver(notification)
+        if result["success"]:
+            self.db.complete_notification(notification['_id'], result.get('sid'))
+            return "sent"
+
+        attempts = notification['attempts']
+        if result.get('permanent') or attempts >= Config.NOTIFICATION_MAX_ATTEMPTS:
+            self.db.fail_notification(notification['_id'], result['message'])
+            return "failed"
+        backoff = min(30 * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+        self.db.fail_notification(notification['_id'], result['message'],
+                                  retry_at=datetime.utcnow() + timedelta(seconds=backoff))
+        return "retry"
+
+    def _deliver(self, notification: Dict) -> Dict:
+        sender = SENDERS.get(notification.get('kind'))
+        if not sender:
+            return {"success": False, "permanent": True,
+                    "message": f"Unknown notification kind: {notification.get('kind')}"}
+
+        user = self.db.get_user_by_id(str(notification['user_id']))
+        if not user or not user.get('phone'):
+            return {"success": False, "permanent": True, "message": "User has no phone number"}
+
+        # Reminders carry no message; the sender writes its own text
+        args = [notification['message']] if notification.get('message') else []
+        return getattr(self.twilio, sender)(user['phone'], user['username'], *args)
+
+    def drain(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Send due notifications until the queue has none left (or `limit` were handled)"""
+        outcomes = {"sent": 0, "retry": 0, "failed": 0}
+        handled = 0
+        while not self.stopping.is_set() and (limit is None or handled < limit):
+            outcome = self.process_one()
+            if outcome is None:
+                break
+            outcomes[outcome] += 1
+            handled += 1
+        return outcomes
+
+    def run(self, interval: float):
+        """Drain the queue, then poll every `interval` seconds until stopped"""
+        while not self.stopping.is_set():
+            outcomes = self.drain()
+            if any(outcomes.values()):
+                print(f"ℹ️ Notifications: {outcomes['sent']} sent, {outcomes['retry']} to retry, "
+                      f"{outcomes['failed']} failed")
+            self.stopping.wait(interval)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--once', action='store_true', help="Drain due notifications and exit")
+    parser.add_argument('--interval', type=float, default=Config.NOTIFICATION_POLL_SECONDS,
+                        help="Seconds between polls of an empty queue")
+    args = parser.parse_args()
+
+    if not storage_supports('notifications'):
+        print("❌ The notification queue needs the MongoDB storage backend (STORAGE_BACKEND=mongodb)")
+        return 1
+    worker = NotificationWorker()
+    if not worker.twilio.client:
+        print("❌ Twilio is not configured; notifications stay queued")
+        return 1
+
+    signal.signal(signal.SIGTERM, lambda *_: worker.stopping.set())
+    try:
+        if args.once:
+            outcomes = worker.drain()
+            print(f"✅ Notifications: {outcomes['sent']} sent, {outcomes['retry']} to retry, "
+                  f"{outcomes['failed']} failed")
+        else:
+            print(f"✅ Notification worker polling every {args.interval:g}s")
+            worker.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_services()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
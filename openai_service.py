@@ -3,19 +3,20 @@ OpenAI Service
 Generates personalized health tips using ChatGPT
 """
 
-from openai import OpenAI
 from typing import Dict, Optional
 from config import Config
-from db_manager import DatabaseManager
+from storage_backend import get_storage
+from instrumentation import timed, EXTERNAL_CALL_SECONDS, EXTERNAL_CALL_ERRORS
 
 class OpenAIService:
     """Service for AI-powered health tips"""
     
     def __init__(self):
         self.client = None
-        self.db = DatabaseManager()
+        self.db = get_storage()
         
         if Config.OPENAI_API_KEY:
+            from openai import OpenAI
             self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
         else:
             print("⚠️ OpenAI API key not configured. AI tips disabled.")
@@ -45,15 +46,16 @@ class OpenAIService:
             prompt = "Give a short, motivational health tip (2-3 sentences) for someone trying to maintain a healthy lifestyle."
         
         try:
-            response = self.client.chat.completions.create(
-                model=Config.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a friendly health coach providing concise, actionable health tips."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
-            )
+            with timed(EXTERNAL_CALL_SECONDS, EXTERNAL_CALL_ERRORS, service='openai', operation='chat_completion'):
+                response = self.client.chat.completions.create(
+                    model=Config.OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are a friendly health coach providing concise, actionable health tips."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=150,
+                    temperature=0.7
+                )
             
             tip_text = response.choices[0].message.content.strip()
             category = self._categorize_tip(tip_text)
@@ -111,6 +113,11 @@ class OpenAIService:
         else:
             return 'general'
     
+    def close(self):
+        """Close the HTTP client"""
+        if self.client:
+            self.client.close()
+    
     def get_category_emoji(self, category: str) -> str:
         """Get emoji for tip category"""
         emoji_map = {
@@ -3,14 +3,103 @@ Profile Page
 User's profile and stats summary
 """
 
+import tempfile
+from datetime import datetime
 import streamlit as st
 from auth_service import AuthService
+from export_service import ExportService, EXPORT_DATASETS, EXPORT_FORMATS
+from goals_service import GoalsService, GOAL_LABELS
+from reminder_service import ReminderService
+from service_registry import get_service
+
+@st.cache_data
+def available_timezones():
+    from zoneinfo import available_timezones as zones
+    return ['UTC'] + sorted(zone for zone in zones() if '/' in zone)
 
 def render(user_id, username, email):
     st.markdown('<div class="main-header">👤 My Profile</div>', unsafe_allow_html=True)
     st.write(f"**Username:** {username}")
     st.write(f"**Email:** {email}")
 
+    # Daily goals
+    st.markdown("---")
+    st.subheader("🎯 Daily Goals")
+    goals_service = get_service(GoalsService)
+    progress = goals_service.get_progress(str(user_id))
+    with st.form("goals"):
+        c1, c2 = st.columns(2)
+        goals = {}
+        for i, (metric, (label, unit)) in enumerate(GOAL_LABELS.items()):
+            current = progress['goals'][metric]
+            with (c1 if i % 2 == 0 else c2):
+                if metric == 'sleep_hours':
+                    goals[metric] = st.number_input(f"{label} ({unit})", min_value=0.5, max_value=24.0,
+                                                    step=0.5, value=float(current))
+                else:
+                    goals[metric] = st.number_input(f"{label} ({unit})", min_value=1, step=1, value=int(current))
+        if st.form_submit_button("Save Goals"):
+            result = goals_service.set_goals(str(user_id), goals)
+            if result["success"]:
+                st.success(result["message"])
+                progress = goals_service.get_progress(str(user_id))
+            else:
+                st.error(result["message"])
+
+    streaks = progress['streaks']
+    st.caption(" · ".join(
+        f"{GOAL_LABELS[metric][0]}: 🔥 {s['current']} days (best {s['longest']})" for metric, s in streaks.items()
+    ))
+    for milestone in goals_service.get_recent_milestones(str(user_id)):
+        st.write(f"{goals_service.describe(milestone)} — {milestone['date'].strftime('%Y-%m-%d')}")
+
+    # Daily reminder
+    reminder_service = get_service(ReminderService)
+    if reminder_service.is_available():
+        st.markdown("---")
+        st.subheader("⏰ Daily Reminder")
+        prefs = reminder_service.get_preferences(str(user_id))
+        timezones = available_timezones()
+        with st.form("reminder"):
+            enabled = st.checkbox("Text me if I haven't logged by", value=prefs['enabled'])
+            c1, c2 = st.columns(2)
+            with c1:
+                at = st.time_input("Time", value=datetime.strptime(prefs['time'], '%H:%M').time(), step=900)
+            with c2:
+                tz = st.selectbox("Timezone", timezones,
+                                  index=timezones.index(prefs['timezone']) if prefs['timezone'] in timezones else 0)
+            if st.form_submit_button("Save Reminder"):
+                result = reminder_service.set_preferences(str(user_id), enabled, at.strftime('%H:%M'), tz)
+                if result["success"]:
+                    st.success(result["message"])
+                else:
+                    st.error(result["message"])
+
+    # Data export
+    st.markdown("---")
+    st.subheader("📦 Export Your Data")
+    export_service = get_service(ExportService)
+    formats = [fmt for fmt in EXPORT_FORMATS if export_service.is_format_available(fmt)]
+    c1, c2 = st.columns(2)
+    with c1:
+        dataset = st.selectbox("Data", list(EXPORT_DATASETS), format_func=str.title)
+    with c2:
+        fmt = st.selectbox("Format", formats, format_func=str.upper)
+
+    if st.button("Prepare Export"):
+        # The export streams to disk, but st.download_button needs the whole file
+        # in memory; very large exports belong in export_cli.py, which streams end to end
+        with tempfile.TemporaryFile() as export_file:
+            rows = export_service.export_user(str(user_id), dataset, fmt, export_file)
+            export_file.seek(0)
+            data = export_file.read()
+        st.download_button(
+            f"⬇️ Download {rows:,} rows",
+            data=data,
+            file_name=f"{dataset}.{fmt}",
+            mime=EXPORT_FORMATS[fmt]
+        )
+
     # Profile update and password change can be implemented here
     st.markdown("---")
     st.info("🔒 For security, you can request a password change. More profile features coming soon!")
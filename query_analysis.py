@@ -0,0 +1,345 @@
+"""
+Query Analysis
+Index-usage assertions for the canonical queries, and slow-query capture for the app.
+
+Run the harness against a local mongod (it seeds and then drops a scratch database):
+
+    python query_analysis.py --uri mongodb://localhost:27017 --users 200 --days 180
+
+It exits non-zero when any canonical query is not served by an index scan or
+examines more documents than --max-ratio per returned document.
+"""
+
+import argparse
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from pymongo import monitoring
+from config import Config
+from instrumentation import registry
+
+# Commands whose plans are worth explaining
+EXPLAINABLE_COMMANDS = ('find', 'aggregate')
+
+# Re-explain a query shape at most this often
+EXPLAIN_INTERVAL_SECONDS = 300
+
+SLOW_QUERIES = registry.counter(
+    'health_tracker_slow_queries_total', 'Queries slower than SLOW_QUERY_MS', ['collection', 'command'])
+
+# ============= PLAN SUMMARIES =============
+
+_DRIVER_FIELDS = ('lsid', 'txnNumber', 'cursor', 'batchSize', 'readConcern', 'writeConcern',
+                  'apiVersion', 'apiStrict', 'apiDeprecationErrors')
+
+def _explainable(command: Dict) -> Dict:
+    """Strip session and driver fields so a captured command can be wrapped in explain"""
+    return {k: v for k, v in command.items()
+            if not k.startswith('$') and k not in _DRIVER_FIELDS}
+
+def explain_command(database, command: Dict) -> Dict:
+    """Run explain with execution stats for a captured find/aggregate command"""
+    command = _explainable(command)
+    if 'aggregate' in command:
+        command['cursor'] = {}
+    return database.command({"explain": command, "verbosity": "executionStats"})
+
+def _plan_stages(plan: Dict) -> List[str]:
+    """Flatten a plan tree into its stage names, root first"""
+    stages = []
+    pending = [plan]
+    while pending:
+        node = pending.pop(0)
+        if not isinstance(node, dict):
+            continue
+        if 'stage' in node:
+            stages.append(node['stage'])
+        pending.extend(node.get('inputStages', []))
+        if 'inputStage' in node:
+            pending.append(node['inputStage'])
+    return stages
+
+def summarize_plan(explain: Dict) -> Dict:
+    """Reduce explain output to the winning plan's stages, index and examined/returned counts"""
+    # Aggregations that are not fully pushed down nest the find plan in a $cursor stage
+    if 'queryPlanner' not in explain:
+        for stage in explain.get('stages', []):
+            if '$cursor' in stage:
+                explain = stage['$cursor']
+                break
+
+    planner = explain.get('queryPlanner', {})
+    winning = planner.get('winningPlan', {})
+    # The slot-based engine wraps the classic plan tree in queryPlan
+    stages = _plan_stages(winning.get('queryPlan', winning))
+
+    index_names = []
+    pending = [winning.get('queryPlan', winning)]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            if node.get('indexName'):
+                index_names.append(node['indexName'])
+            pending.extend(node.get('inputStages', []))
+            pending.append(node.get('inputStage'))
+
+    stats = explain.get('executionStats', {})
+    docs_examined = stats.get('totalDocsExamined', 0)
+    returned = stats.get('nReturned', 0)
+    return {
+        "namespace": planner.get('namespace'),
+        "stages": stages,
+        "indexes": index_names,
+        "uses_index": any(s in ('IXSCAN', 'IDHACK') or s.startswith('EXPRESS') for s in stages),
+        "collection_scan": 'COLLSCAN' in stages,
+        "keys_examined": stats.get('totalKeysExamined', 0),
+        "docs_examined": docs_examined,
+        "returned": returned,
+        "examined_ratio": docs_examined / max(returned, 1),
+        "millis": stats.get('executionTimeMillis', 0)
+    }
+
+def format_plan(summary: Dict) -> str:
+    """One-line description of a plan summary"""
+    indexes = ', '.join(summary['indexes']) or 'no index'
+    return (f"{' <- '.join(summary['stages'])} [{indexes}] "
+            f"keys={summary['keys_examined']} docs={summary['docs_examined']} returned={summary['returned']}")
+
+def query_shape(value):
+    """Replace literal values with placeholders so queries differing only in values compare equal"""
+    if isinstance(value, dict):
+        return '{' + ','.join(f"{k}:{query_shape(v)}" for k, v in value.items()) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + (query_shape(value[0]) if value else '') + ']'
+    return '?'
+
+# ============= SLOW QUERY LOGGING =============
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Logs find/aggregate commands slower than a threshold, with their plan summary.
+
+    Commands are remembered by request id when they start; slow ones are explained
+    on a background thread, once per query shape per EXPLAIN_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, threshold_ms: int):
+        self.threshold_micros = threshold_ms * 1000
+        self.client = None
+        self._pending: Dict[int, Tuple[str, Dict]] = {}
+        self._plans: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue(maxsize=100)
+        self._worker = None
+
+    def attach(self, client):
+        """Set the client used to run explains (listeners exist before the client does)"""
+        self.client = client
+
+    def started(self, event):
+        if event.command_name in EXPLAINABLE_COMMANDS:
+            with self._lock:
+                self._pending[event.request_id] = (event.database_name, dict(event.command))
+
+    def failed(self, event):
+        with self._lock:
+            self._pending.pop(event.request_id, None)
+
+    def succeeded(self, event):
+        with self._lock:
+            captured = self._pending.pop(event.request_id, None)
+        if captured is None or event.duration_micros < self.threshold_micros:
+            return
+
+        database_name, command = captured
+        collection = command.get(event.command_name)
+        SLOW_QUERIES.inc(collection=collection, command=event.command_name)
+
+        shape = f"{database_name}.{collection}:{event.command_name}:" + query_shape(
+            command.get('filter', command.get('pipeline', {})))
+        millis = event.duration_micros / 1000
+        with self._lock:
+            explained_at, plan = self._plans.get(shape, (0.0, None))
+            stale = time.monotonic() - explained_at > EXPLAIN_INTERVAL_SECONDS
+            if stale:
+                # Claim the shape so concurrent slow runs do not queue duplicate explains
+                self._plans[shape] = (time.monotonic(), plan)
+
+        if not stale:
+            print(f"⚠️ Slow query ({millis:.0f} ms) {database_name}.{collection}: {plan or 'plan pending'}")
+            return
+        try:
+            self._jobs.put_nowait((shape, millis, database_name, collection, command))
+            self._ensure_worker()
+        except queue.Full:
+            print(f"⚠️ Slow query ({millis:.0f} ms) {database_name}.{collection}: plan not captured")
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            shape, millis, database_name, collection, command = self._jobs.get()
+            try:
+                if self.client is None:
+                    continue
+                summary = summarize_plan(explain_command(self.client[database_name], command))
+                plan = format_plan(summary)
+                with self._lock:
+                    self._plans[shape] = (time.monotonic(), plan)
+                flag = " (collection scan)" if summary['collection_scan'] else ""
+                print(f"⚠️ Slow query ({millis:.0f} ms) {database_name}.{collection}{flag}: {plan}")
+            except Exception as e:
+                print(f"⚠️ Slow query ({millis:.0f} ms) {database_name}.{collection}: explain failed: {e}")
+            finally:
+                self._jobs.task_done()
+
+# ============= INDEX-USAGE HARNESS =============
+
+class CaptureListener(monitoring.CommandListener):
+    """Records find/aggregate commands issued while capturing is on"""
+
+    def __init__(self):
+        self.commands: List[Tuple[str, Dict]] = []
+        self.capturing = False
+
+    def started(self, event):
+        if self.capturing and event.command_name in EXPLAINABLE_COMMANDS:
+            self.commands.append((event.database_name, dict(event.command)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def canonical_queries(user_id: str, day: datetime) -> List[Tuple[str, Callable]]:
+    """The hot read paths whose plans must stay on an index"""
+    return [
+        ('get_health_entries', lambda db: db.get_health_entries(user_id, days=30)),
+        ('get_entry_by_date', lambda db: db.get_entry_by_date(user_id, day)),
+        ('get_tip_for_today', lambda db: db.get_tip_for_today(user_id)),
+        ('get_recent_tips', lambda db: db.get_recent_tips(user_id, limit=10)),
+        ('get_tips_page', lambda db: db.get_tips_page(user_id, limit=5)),
+        ('get_tips_page_older', lambda db: db.get_tips_page(
+            user_id, limit=5, before=db.get_tips_page(user_id, limit=5)[1])),
+        ('get_tips_page_category', lambda db: db.get_tips_page(user_id, limit=5, category='hydration')),
+        ('get_streak', lambda db: db.get_streak(user_id))
+    ]
+
+def seed(database, users: int, days: int, tips_per_user: int = 20) -> List:
+    """Insert synthetic users, entries, tips and streaks; returns the user ids"""
+    rng = random.Random(42)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    user_ids = database.users.insert_many([
+        {"username": f"qa_user_{i}", "email": f"qa_user_{i}@example.com", "phone": "",
+         "password_hash": "", "created_at": today, "updated_at": today}
+        for i in range(users)
+    ]).inserted_ids
+
+    for user_id in user_ids:
+        database.health_entries.insert_many([
+            {"user_id": user_id, "date": today - timedelta(days=d), "steps": rng.randint(2000, 15000),
+             "calories": rng.randint(1500, 3000), "heart_rate": rng.randint(55, 90),
+             "sleep_hours": round(rng.uniform(5, 9), 1), "water_intake": rng.randint(2, 12),
+             "notes": "", "created_at": today - timedelta(days=d)}
+            for d in range(days)
+        ])
+        database.tips.insert_many([
+            {"user_id": user_id, "tip_text": "Drink water", "category": "hydration",
+             "created_at": datetime.utcnow() - timedelta(days=t)}
+            for t in range(tips_per_user)
+        ])
+
+    database.streaks.insert_many([
+        {"user_id": user_id, "current_streak": 1, "longest_streak": 1, "last_login": today,
+         "login_dates": [today.strftime('%Y-%m-%d')], "updated_at": today}
+        for user_id in user_ids
+    ])
+    return user_ids
+
+def analyze(db_manager, capture: CaptureListener, user_id: str, day: datetime,
+            max_ratio: float) -> List[Dict]:
+    """Explain every command the canonical queries issue and check it against the rules"""
+    results = []
+    for name, run in canonical_queries(user_id, day):
+        capture.commands = []
+        capture.capturing = True
+        try:
+            run(db_manager)
+        finally:
+            capture.capturing = False
+
+        if not capture.commands:
+            results.append({"query": name, "passed": False, "problems": ["issued no find/aggregate command"]})
+            continue
+
+        for database_name, command in capture.commands:
+            summary = summarize_plan(explain_command(db_manager._client[database_name], command))
+            problems = []
+            if summary['collection_scan'] or not summary['uses_index']:
+                problems.append("not an index scan")
+            if summary['examined_ratio'] > max_ratio:
+                problems.append(f"examines {summary['examined_ratio']:.1f} docs per returned doc")
+            results.append({"query": name, "passed": not problems, "problems": problems, "plan": summary})
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Assert that canonical queries use indexes")
+    parser.add_argument('--uri', default=Config.MONGODB_URI, help="MongoDB URI (a local mongod)")
+    parser.add_argument('--db', default='health_tracker_query_analysis', help="Scratch database name")
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--max-ratio', type=float, default=2.0,
+                        help="Maximum documents examined per document returned")
+    parser.add_argument('--keep', action='store_true', help="Keep the seeded database afterwards")
+    args = parser.parse_args(argv)
+
+    # Listeners registered globally apply to clients created afterwards
+    capture = CaptureListener()
+    monitoring.register(capture)
+
+    Config.MONGODB_URI = args.uri
+    Config.MONGODB_DB_NAME = args.db
+    Config.SLOW_QUERY_MS = 0
+    from db_manager import DatabaseManager
+    try:
+        db_manager = DatabaseManager()
+        db_manager.connect()
+    except Exception as e:
+        print(f"❌ Could not connect to {args.uri}: {e}")
+        return 2
+
+    database = db_manager._client[args.db]
+    try:
+        print(f"ℹ️ Seeding {args.users} users x {args.days} days into {args.db}...")
+        user_ids = seed(database, args.users, args.days)
+        # A user in the middle of the id range, so neither end of an index is favoured
+        user_id = str(user_ids[len(user_ids) // 2])
+        day = datetime.utcnow() - timedelta(days=args.days // 2)
+
+        results = analyze(db_manager, capture, user_id, day, args.max_ratio)
+    finally:
+        if not args.keep:
+            db_manager._client.drop_database(args.db)
+
+    failures = 0
+    for result in results:
+        plan = format_plan(result['plan']) if 'plan' in result else ''
+        if result['passed']:
+            print(f"✅ {result['query']}: {plan}")
+        else:
+            failures += 1
+            print(f"❌ {result['query']}: {'; '.join(result['problems'])} {plan}")
+
+    print(f"{len(results) - failures}/{len(results)} query plans passed")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""
+Reminder Scheduler
+Queues daily "log your data" reminders at each user's chosen local time:
+
+    python reminder_scheduler.py            # check for due reminders every REMINDER_POLL_SECONDS
+    python reminder_scheduler.py --once     # queue what is due and exit (e.g. from cron)
+
+Each user with reminders enabled carries an indexed `reminder.next_send_at`, so a
+tick reads only the users that are due, in batches of REMINDER_BATCH_SIZE, and
+its cost grows with reminders sent rather than with users. Users who already
+logged an entry today are found with one aggregation per batch and skipped.
+A reminder's send time is advanced with a compare-and-swap before it is queued,
+so schedulers running side by side never queue the same reminder twice.
+The notification worker delivers the queued reminders.
+"""
+
+import argparse
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from config import Config
+from db_manager import DatabaseManager
+from reminder_service import get_timezone, local_day_start, next_send_time
+from service_registry import get_service, shutdown_services
+from storage_backend import storage_supports
+from twilio_service import TwilioService
+
+class ReminderScheduler:
+    """Moves due reminders onto the notification queue"""
+
+    def __init__(self):
+        self.db = DatabaseManager()
+        self.stopping = threading.Event()
+
+    def tick(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Queue every reminder due at `now` (naive UTC); returns counts"""
+        now = now or datetime.utcnow()
+        totals = {"sent": 0, "logged": 0, "late": 0}
+        while not self.stopping.is_set():
+            users = self.db.get_due_reminders(now, Config.REMINDER_BATCH_SIZE)
+            if not users:
+                break
+            for outcome, count in self._process_batch(users, now).items():
+                totals[outcome] += count
+            if len(users) < Config.REMINDER_BATCH_SIZE:
+                break
+        return totals
+
+    def _process_batch(self, users, now: datetime) -> Dict[str, int]:
+        counts = {"sent": 0, "logged": 0, "late": 0}
+        day_starts = {}
+        for user in users:
+            zone = get_timezone(user['reminder'].get('timezone', 'UTC')) or get_timezone('UTC')
+            day_starts[user['_id']] = local_day_start(zone, now)
+
+        # Anti-join: one aggregation finds who has already logged today
+        latest = self.db.get_latest_entry_dates(list(day_starts), min(day_starts.values()))
+        max_late = timedelta(minutes=Config.REMINDER_MAX_LATE_MINUTES)
+
+        queued = []
+        for user in users:
+            reminder = user['reminder']
+            due_at = reminder['next_send_at']
+            following = next_send_time(reminder['time'], reminder.get('timezone', 'UTC'), now)
+            # Advance first: a reminder that another scheduler already moved is not ours to send
+            if not self.db.advance_reminder(user['_id'], due_at, following):
+                continue
+
+            if latest.get(user['_id'], datetime.min) >= day_starts[user['_id']]:
+                counts["logged"] += 1
+            elif now - due_at > max_late:
+                counts["late"] += 1  # e.g. the scheduler was down; tomorrow's will go out on time
+            else:
+                queued.append({"user_id": user['_id'], "kind": "reminder"})
+
+        counts["sent"] = self.db.enqueue_notifications(queued)
+        return counts
+
+    def run(self, interval: float):
+        """Queue due reminders every `interval` seconds until stopped"""
+        while not self.stopping.is_set():
+            totals = self.tick()
+            if any(totals.values()):
+                print(f"ℹ️ Reminders: {totals['sent']} queued, {totals['logged']} already logged, "
+                      f"{totals['late']} too late")
+            self.stopping.wait(interval)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--once', action='store_true', help="Queue due reminders and exit")
+    parser.add_argument('--interval', type=float, default=Config.REMINDER_POLL_SECONDS,
+                        help="Seconds between checks for due reminders")
+    args = parser.parse_args()
+
+    if not storage_supports('notifications'):
+        print("❌ Reminders need the MongoDB storage backend (STORAGE_BACKEND=mongodb)")
+        return 1
+    if not get_service(TwilioService).client:
+        print("⚠️ Twilio is not configured; reminders will stay queued until it is")
+
+    scheduler = ReminderScheduler()
+    signal.signal(signal.SIGTERM, lambda *_: scheduler.stopping.set())
+    try:
+        if args.once:
+            totals = scheduler.tick()
+            print(f"✅ Reminders: {totals['sent']} queued, {totals['logged']} already logged, "
+                  f"{totals['late']} too late")
+        else:
+            print(f"✅ Reminder scheduler checking every {args.interval:g}s")
+            scheduler.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shutdown_services()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""
+Reminder Service
+Per-user daily reminder preferences (local time and timezone) and send-time scheduling
+"""
+
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Optional
+from config import Config
+from storage_backend import get_storage
+
+def parse_time_of_day(value: str) -> Optional[time]:
+    """'HH:MM' as a time, or None if it is not one"""
+    try:
+        return datetime.strptime(value.strip(), '%H:%M').time()
+    except (AttributeError, ValueError):
+        return None
+
+def get_timezone(name: str):
+    """ZoneInfo for an IANA name, or None if it is unknown"""
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+def local_day_start(zone, now: datetime) -> datetime:
+    """Start of the user's current local day, as naive UTC"""
+    local_now = now.replace(tzinfo=timezone.utc).astimezone(zone)
+    midnight = datetime.combine(local_now.date(), time(), tzinfo=zone)
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+def next_send_time(time_of_day: str, timezone_name: str, after: datetime) -> datetime:
+    """First moment after `after` (naive UTC) when the local clock shows time_of_day, as naive UTC"""
+    zone = get_timezone(timezone_name)
+    at = parse_time_of_day(time_of_day)
+    local_after = after.replace(tzinfo=timezone.utc).astimezone(zone)
+
+    day = local_after.date()
+    while True:
+        # Round-tripping through UTC moves times skipped by a DST change forward
+        candidate = datetime.combine(day, at, tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+        if candidate > after:
+            return candidate
+        day += timedelta(days=1)
+
+class ReminderService:
+    """Daily "log your data" reminders at each user's chosen local time"""
+
+    def __init__(self):
+        self.db = get_storage()
+
+    def is_available(self) -> bool:
+        """Reminders go through the notification queue, which needs the MongoDB backend"""
+        return self.db.supports('notifications')
+
+    def get_preferences(self, user_id: str) -> Dict:
+        """The user's reminder settings, falling back to disabled at the default time in UTC"""
+        reminder = self.db.get_reminder(user_id) if self.is_available() else None
+        return dict({"enabled": False, "time": Config.REMINDER_DEFAULT_TIME, "timezone": "UTC"}, **(reminder or {}))
+
+    def set_preferences(self, user_id: str, enabled: bool, time_of_day: str, timezone_name: str) -> Dict:
+        """Save reminder settings and schedule the next reminder"""
+        if not self.is_available():
+            return {"success": False, "message": "Reminders are not available with this storage backend"}
+        if parse_time_of_day(time_of_day) is None:
+            return {"success": False, "message": "Reminder time must be HH:MM"}
+        if get_timezone(timezone_name) is None:
+            return {"success": False, "message": f"Unknown timezone: {timezone_name}"}
+
+        reminder = {"enabled": bool(enabled), "time": time_of_day.strip(), "timezone": timezone_name}
+        if enabled:
+            # Disabled reminders have no send time, so they stay out of the scheduler's index
+            reminder["next_send_at"] = next_send_time(reminder["time"], timezone_name, datetime.utcnow())
+        if not self.db.set_reminder(user_id, reminder):
+            return {"success": False, "message": "Failed to update reminder"}
+        return {"success": True, "message": "Reminder updated successfully", "next_send_at": reminder.get("next_send_at")}
@@ -0,0 +1,176 @@
+"""
+Rolling Metrics
+Incrementally maintained rolling-window statistics for daily health metrics
+"""
+
+import math
+from datetime import date
+from typing import Dict, Optional
+
+ROLLING_METRICS = ['steps', 'calories', 'heart_rate', 'sleep_hours', 'water_intake']
+ROLLING_WINDOWS = (7, 30)
+BUFFER_DAYS = max(ROLLING_WINDOWS)
+
+# Re-anchor the slope accumulators after this many days to bound float drift
+REBASE_AFTER_DAYS = 3650
+
+class RollingMetrics:
+    """Per-user rolling windows over daily metrics.
+
+    Keeps a ring buffer of the last BUFFER_DAYS daily values (slot = day % size)
+    and, per window and metric, Welford mean/variance plus the sums needed for a
+    least-squares trend slope. Adding, overwriting or expiring a day is O(window).
+    """
+
+    def __init__(self, document: Optional[Dict] = None):
+        document = document or {}
+        self.anchor = document.get('anchor')
+        self.latest_day = document.get('latest_day')
+        self.version = document.get('version', 0)
+        self.slots = document.get('slots') or [None] * BUFFER_DAYS
+        self.windows = document.get('windows') or {
+            str(size): {metric: self._empty_accumulator() for metric in ROLLING_METRICS}
+            for size in ROLLING_WINDOWS
+        }
+
+    @staticmethod
+    def _empty_accumulator() -> Dict:
+        return {"count": 0, "mean": 0.0, "m2": 0.0, "sum_x": 0.0, "sum_xx": 0.0, "sum_xy": 0.0}
+
+    # ============= ACCUMULATOR UPDATES =============
+
+    @staticmethod
+    def _add(acc: Dict, x: int, y: float):
+        """Welford insert of value y observed on day offset x"""
+        acc['count'] += 1
+        delta = y - acc['mean']
+        acc['mean'] += delta / acc['count']
+        acc['m2'] += delta * (y - acc['mean'])
+        acc['sum_x'] += x
+        acc['sum_xx'] += x * x
+        acc['sum_xy'] += x * y
+
+    @staticmethod
+    def _remove(acc: Dict, x: int, y: float):
+        """Welford removal of value y observed on day offset x"""
+        if acc['count'] <= 1:
+            acc.update(RollingMetrics._empty_accumulator())
+            return
+        old_mean = acc['mean']
+        acc['count'] -= 1
+        acc['mean'] = old_mean - (y - old_mean) / acc['count']
+        acc['m2'] = max(acc['m2'] - (y - old_mean) * (y - acc['mean']), 0.0)
+        acc['sum_x'] -= x
+        acc['sum_xx'] -= x * x
+        acc['sum_xy'] -= x * y
+
+    def _slot(self, day: int) -> Optional[Dict]:
+        slot = self.slots[day % BUFFER_DAYS]
+        return slot if slot and slot['day'] == day else None
+
+    def _apply_to_windows(self, day: int, values: Dict, remove: bool = False):
+        """Add or remove one day's values in every window that covers it"""
+        x = day - self.anchor
+        for size in ROLLING_WINDOWS:
+            if day <= self.latest_day - size:
+                continue
+            for metric in ROLLING_METRICS:
+                value = values.get(metric)
+                if value is None:
+                    continue
+                acc = self.windows[str(size)][metric]
+                if remove:
+                    self._remove(acc, x, float(value))
+                else:
+                    self._add(acc, x, float(value))
+
+    def _rebuild_windows(self):
+        """Recompute all window accumulators from the ring buffer"""
+        self.windows = {
+            str(size): {metric: self._empty_accumulator() for metric in ROLLING_METRICS}
+            for size in ROLLING_WINDOWS
+        }
+        for slot in self.slots:
+            if slot and slot['day'] > self.latest_day - BUFFER_DAYS:
+                self._apply_to_windows(slot['day'], slot['values'])
+
+    def advance(self, day: int):
+        """Slide all windows forward so that `day` is the newest day"""
+        if self.latest_day is None or day <= self.latest_day:
+            return
+
+        # Expire days that fall out of each window; bounded by the window size
+        for size in ROLLING_WINDOWS:
+            for old_day in range(self.latest_day - size + 1, min(self.latest_day, day - size) + 1):
+                slot = self._slot(old_day)
+                if not slot:
+                    continue
+                x = old_day - self.anchor
+                for metric in ROLLING_METRICS:
+                    value = slot['values'].get(metric)
+                    if value is not None:
+                        self._remove(self.windows[str(size)][metric], x, float(value))
+
+        self.latest_day = day
+        if day - self.anchor > REBASE_AFTER_DAYS:
+            self.anchor = day
+            self._rebuild_windows()
+
+    def record(self, day: int, values: Dict) -> bool:
+        """Record (or overwrite) the metrics for a day. Returns False if too old."""
+        if self.latest_day is None:
+            self.anchor = day
+            self.latest_day = day
+        elif day > self.latest_day:
+            self.advance(day)
+        elif day <= self.latest_day - BUFFER_DAYS:
+            return False
+
+        values = {metric: values.get(metric) for metric in ROLLING_METRICS}
+        existing = self._slot(day)
+        if existing:
+            self._apply_to_windows(day, existing['values'], remove=True)
+        self._apply_to_windows(day, values)
+        self.slots[day % BUFFER_DAYS] = {"day": day, "values": values}
+        return True
+
+    # ============= READS =============
+
+    def summary(self) -> Dict:
+        """Mean, variance and trend slope (per day) for every window and metric"""
+        result = {}
+        for size in ROLLING_WINDOWS:
+            window = {}
+            for metric, acc in self.windows[str(size)].items():
+                n = acc['count']
+                variance = acc['m2'] / (n - 1) if n > 1 else 0.0
+                slope = 0.0
+                denominator = n * acc['sum_xx'] - acc['sum_x'] ** 2
+                if n > 1 and denominator > 0:
+                    sum_y = acc['mean'] * n
+                    slope = (n * acc['sum_xy'] - acc['sum_x'] * sum_y) / denominator
+                window[metric] = {
+                    "count": n,
+                    "mean": acc['mean'],
+                    "variance": variance,
+                    "std": math.sqrt(variance),
+                    "slope": slope
+                }
+            result[f"{size}d"] = window
+        return result
+
+    def to_document(self) -> Dict:
+        return {
+            "anchor": self.anchor,
+            "latest_day": self.latest_day,
+            "version": self.version,
+            "slots": self.slots,
+            "windows": self.windows
+        }
+
+    @staticmethod
+    def day_number(value) -> int:
+        """Convert a date/datetime to the day ordinal used as the window key"""
+        if isinstance(value, date):
+            return value.toordinal()
+        return int(value)
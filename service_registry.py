@@ -0,0 +1,92 @@
+"""
+Service Registry
+Thread-safe, lazily created process-wide service instances with explicit lifecycle
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Type, TypeVar
+
+T = TypeVar('T')
+
+class ServiceRegistry:
+    """Process-wide service instances, created on first use and shared by every session.
+
+    Services are keyed by class. Each is built once (by calling the class, or a factory
+    registered for it) and reused across reruns and sessions, so HTTP clients and
+    connection pools are shared instead of rebuilt per page render. After a fork the
+    child discards inherited instances and builds its own on first use.
+    """
+
+    def __init__(self):
+        self._factories: Dict[type, Callable] = {}
+        self._closers: Dict[type, Callable] = {}
+        self._instances: Dict[type, object] = {}
+        self._order: List[type] = []
+        # Reentrant: building one service may get() another
+        self._lock = threading.RLock()
+
+    def register(self, cls: Type[T], factory: Optional[Callable[[], T]] = None,
+                 close: Optional[Callable[[T], None]] = None):
+        """Set how a service is built and closed; replaces any existing instance"""
+        with self._lock:
+            self._discard(cls, close_instance=True)
+            if factory:
+                self._factories[cls] = factory
+            if close:
+                self._closers[cls] = close
+
+    def get(self, cls: Type[T]) -> T:
+        """Get the shared instance of a service, creating it on first use"""
+        instance = self._instances.get(cls)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(cls)
+            if instance is None:
+                instance = self._factories.get(cls, cls)()
+                self._instances[cls] = instance
+                self._order.append(cls)
+            return instance
+
+    def _discard(self, cls: type, close_instance: bool):
+        instance = self._instances.pop(cls, None)
+        if instance is None:
+            return
+        self._order.remove(cls)
+        if not close_instance:
+            return
+        # An explicit closer, else the service's own close() if it has one
+        closer = self._closers.get(cls) or (lambda service: getattr(service, 'close', lambda: None)())
+        try:
+            closer(instance)
+        except Exception as e:
+            print(f"⚠️ Failed to close {cls.__name__}: {e}")
+
+    def shutdown(self):
+        """Close every service (newest first); later get() calls build fresh instances"""
+        with self._lock:
+            for cls in reversed(list(self._order)):
+                self._discard(cls, close_instance=True)
+
+    def reset_after_fork(self):
+        """Forget inherited instances without closing them (they belong to the parent)"""
+        self._lock = threading.RLock()
+        self._instances = {}
+        self._order = []
+
+registry = ServiceRegistry()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry.reset_after_fork)
+
+def get_service(cls: Type[T]) -> T:
+    """Get the process-wide instance of a service"""
+    return registry.get(cls)
+
+def shutdown_services():
+    """Close all services and the database connection"""
+    from storage_backend import shutdown_storage
+    registry.shutdown()
+    shutdown_storage()
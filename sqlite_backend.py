@@ -0,0 +1,448 @@
+"""
+SQLite Storage Backend
+Embedded storage for the core user, entry, streak and tip operations (STORAGE_BACKEND=sqlite)
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from bson import ObjectId, json_util
+from config import Config
+from instrumentation import instrument_methods
+from models import to_object_id
+from storage_backend import StorageBackend
+
+# Documents are stored as extended JSON, so ObjectIds and datetimes round-trip
+# (datetimes at millisecond precision, as in MongoDB)
+JSON_OPTIONS = json_util.JSONOptions(json_mode=json_util.JSONMode.RELAXED, tz_aware=False)
+
+# Each table keeps the fields it is queried by in indexed columns and the full document in `doc`
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    username TEXT NOT NULL UNIQUE,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS health_entries (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    date TEXT NOT NULL,
+    doc TEXT NOT NULL,
+    UNIQUE (user_id, day)
+);
+CREATE INDEX IF NOT EXISTS health_entries_user_date ON health_entries (user_id, date);
+CREATE TABLE IF NOT EXISTS streaks (
+    user_id TEXT PRIMARY KEY,
+    id TEXT NOT NULL,
+    last_login TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS streaks_last_login ON streaks (last_login);
+CREATE TABLE IF NOT EXISTS tips (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    category TEXT,
+    created_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tips_user_created ON tips (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS tips_user_category_created ON tips (user_id, category, created_at, id);
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+def _id(value) -> str:
+    """Column value of an id (validated like ObjectId(user_id) in the MongoDB backend)"""
+    return str(to_object_id(value))
+
+def _ts(value: Optional[datetime]) -> Optional[str]:
+    """Sortable column value of a naive UTC datetime"""
+    return value.isoformat(timespec='milliseconds') if value is not None else None
+
+def _dump(document: Dict) -> str:
+    return json_util.dumps({k: v for k, v in document.items() if k != '_id'}, json_options=JSON_OPTIONS)
+
+def _load(row) -> Dict:
+    """Document from an (id, doc) row"""
+    return {'_id': ObjectId(row[0]), **json_util.loads(row[1], json_options=JSON_OPTIONS)}
+
+@instrument_methods
+class SqliteBackend(StorageBackend):
+    """Singleton SQLite storage in WAL mode, with one connection per thread.
+
+    WAL lets readers run alongside the single writer, so page renders are not
+    blocked by an entry write. Optional features (rolling metrics, anomalies,
+    milestones, intraday samples, notifications, change streams, archiving)
+    need the MongoDB backend.
+    """
+
+    _instance = None
+    _lock = threading.RLock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(SqliteBackend, cls).__new__(cls)
+                    instance._local = threading.local()
+                    instance._connections = []
+                    instance._schema_ready = False
+                    cls._instance = instance
+        return cls._instance
+
+    def __init__(self):
+        """Create the backend; each thread opens its connection on first use"""
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        path = Config.SQLITE_PATH
+        # Autocommit; writes that read first take the write lock with BEGIN IMMEDIATE
+        conn = sqlite3.connect(path, timeout=5.0, isolation_level=None,
+                               check_same_thread=False, uri=path.startswith('file:'))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; safe in WAL mode
+        with self._lock:
+            if not self._schema_ready:
+                conn.executescript(SCHEMA)
+                self._schema_ready = True
+                print(f"✅ SQLite storage ready at {path}")
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """Transaction holding the write lock from the start (read-modify-write safe)"""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _find_one(self, query: str, params: tuple) -> Optional[Dict]:
+        row = self._conn.execute(query, params).fetchone()
+        return _load(row) if row else None
+
+    def _find(self, query: str, params: tuple) -> List[Dict]:
+        return [_load(row) for row in self._conn.execute(query, params)]
+
+    @classmethod
+    def shutdown(cls):
+        """Close every thread's connection; the next SqliteBackend() reconnects"""
+        with cls._lock:
+            if cls._instance is not None:
+                cls._instance.close_connection()
+
+    @classmethod
+    def _reset_after_fork(cls):
+        # Connections must not be used across fork; the child opens its own
+        cls._lock = threading.RLock()
+        cls._instance = None
+
+    # ============= USER OPERATIONS =============
+
+    def create_user(self, user_data: Dict) -> Optional[str]:
+        """Create a new user"""
+        user_data['_id'] = ObjectId()
+        user_data['created_at'] = datetime.utcnow()
+        user_data['updated_at'] = datetime.utcnow()
+        try:
+            self._conn.execute(
+                "INSERT INTO users (id, email, username, doc) VALUES (?, ?, ?, ?)",
+                (str(user_data['_id']), user_data['email'], user_data['username'], _dump(user_data))
+            )
+        except sqlite3.IntegrityError:
+            return None
+        self.increment_counters(['signups'])
+        return str(user_data['_id'])
+
+    def get_user_by_email(self, email: str) -> Optional[Dict]:
+        """Get user by email"""
+        return self._find_one("SELECT id, doc FROM users WHERE email = ?", (email,))
+
+    def get_user_by_id(self, user_id: str) -> Optional[Dict]:
+        """Get user by ID"""
+        return self._find_one("SELECT id, doc FROM users WHERE id = ?", (_id(user_id),))
+
+    def update_user(self, user_id: str, update_data: Dict) -> bool:
+        """Update user information"""
+        update_data['updated_at'] = datetime.utcnow()
+        with self._write() as conn:
+            row = conn.execute("SELECT id, doc FROM users WHERE id = ?", (_id(user_id),)).fetchone()
+            if not row:
+                return False
+            user = dict(_load(row), **update_data)
+            conn.execute("UPDATE users SET email = ?, username = ?, doc = ? WHERE id = ?",
+                         (user['email'], user['username'], _dump(user), row[0]))
+        return True
+
+    def get_user_goals(self, user_id: str) -> Dict:
+        """Get the goals a user has set (empty if they use the defaults)"""
+        return (self.get_user_by_id(user_id) or {}).get('goals') or {}
+
+    # ============= HEALTH ENTRY OPERATIONS =============
+
+    def create_health_entry(self, entry_data: Dict) -> Optional[str]:
+        """Create a new health entry"""
+        entry_data['_id'] = ObjectId()
+        entry_data['created_at'] = datetime.utcnow()
+        date = entry_data['date']
+        try:
+            self._conn.execute(
+                "INSERT INTO health_entries (id, user_id, day, date, doc) VALUES (?, ?, ?, ?, ?)",
+                (str(entry_data['_id']), _id(entry_data['user_id']), date.strftime('%Y-%m-%d'), _ts(date),
+                 _dump(entry_data))
+            )
+        except sqlite3.IntegrityError:
+            return None  # Already an entry for that day
+        self.increment_counters(['entries'])
+        return str(entry_data['_id'])
+
+    def get_health_entries(self, user_id: str, days: int = 30, analytics: bool = False) -> List[Dict]:
+        """Get health entries for a user for the last N days"""
+        start_date = datetime.utcnow() - timedelta(days=days)
+        return self._find(
+            "SELECT id, doc FROM health_entries WHERE user_id = ? AND date >= ? ORDER BY date DESC",
+            (_id(user_id), _ts(start_date))
+        )
+
+    def get_entry_by_date(self, user_id: str, date: datetime) -> Optional[Dict]:
+        """Get health entry for a specific date"""
+        return self._find_one("SELECT id, doc FROM health_entries WHERE user_id = ? AND day = ?",
+                              (_id(user_id), date.strftime('%Y-%m-%d')))
+
+    def update_health_entry(self, entry_id: str, update_data: Dict) -> bool:
+        """Update a health entry"""
+        with self._write() as conn:
+            row = conn.execute("SELECT id, doc FROM health_entries WHERE id = ?", (_id(entry_id),)).fetchone()
+            if not row:
+                return False
+            current = _load(row)
+            entry = dict(current, **update_data)
+            if _dump(entry) == _dump(current):
+                return False  # Nothing changed, like modified_count == 0 in the MongoDB backend
+            try:
+                conn.execute("UPDATE health_entries SET day = ?, date = ?, doc = ? WHERE id = ?",
+                             (entry['date'].strftime('%Y-%m-%d'), _ts(entry['date']), _dump(entry), row[0]))
+            except sqlite3.IntegrityError:
+                return False  # Moved onto a day that already has an entry
+        return True
+
+    def bulk_upsert_health_entries(self, user_id: str, entries: List[Dict]) -> int:
+        """Create or overwrite one entry per day for a user in a single transaction"""
+        if not entries:
+            return 0
+
+        now = datetime.utcnow()
+        inserted = matched = 0
+        with self._write() as conn:
+            for entry in entries:
+                date = entry['date']
+                day = date.strftime('%Y-%m-%d')
+                fields = {k: v for k, v in entry.items() if k not in ('_id', 'user_id', 'created_at')}
+                row = conn.execute("SELECT id, doc FROM health_entries WHERE user_id = ? AND day = ?",
+                                   (_id(user_id), day)).fetchone()
+                if row:
+                    document = dict(_load(row), **fields)
+                    conn.execute("UPDATE health_entries SET date = ?, doc = ? WHERE id = ?",
+                                 (_ts(date), _dump(document), row[0]))
+                    matched += 1
+                else:
+                    document = dict(fields, user_id=to_object_id(user_id), created_at=now)
+                    conn.execute(
+                        "INSERT INTO health_entries (id, user_id, day, date, doc) VALUES (?, ?, ?, ?, ?)",
+                        (str(ObjectId()), _id(user_id), day, _ts(date), _dump(document))
+                    )
+                    inserted += 1
+        if inserted:
+            self.increment_counters(['entries'], inserted)
+        return inserted + matched
+
+    def get_health_stats(self, user_id: str, days: int = 30, analytics: bool = False) -> Dict:
+        """Get aggregated health statistics"""
+        start_date = datetime.utcnow() - timedelta(days=days)
+        row = self._conn.execute("""
+            SELECT AVG(json_extract(doc, '$.steps')), AVG(json_extract(doc, '$.calories')),
+                   AVG(json_extract(doc, '$.heart_rate')), AVG(json_extract(doc, '$.sleep_hours')),
+                   AVG(json_extract(doc, '$.water_intake')), COUNT(*)
+            FROM health_entries WHERE user_id = ? AND date >= ?
+        """, (_id(user_id), _ts(start_date))).fetchone()
+        if not row[5]:
+            return {}
+        return {
+            "_id": None,
+            "avg_steps": row[0],
+            "avg_calories": row[1],
+            "avg_heart_rate": row[2],
+            "avg_sleep": row[3],
+            "avg_water": row[4],
+            "total_entries": row[5]
+        }
+
+    def iter_health_entries(self, user_id: str, batch_size: int = 1000, analytics: bool = False) -> Iterator[Dict]:
+        """Iterate over a user's full entry history, oldest first"""
+        # Keyset pages, so no statement stays open between batches
+        yield from self._iter_pages("health_entries", "date", _id(user_id), batch_size)
+
+    def _iter_pages(self, table: str, order_column: str, user_id: str, batch_size: int) -> Iterator[Dict]:
+        query = (f"SELECT id, doc, {order_column} FROM {table} WHERE user_id = ? "
+                 f"AND ({order_column} > ? OR ({order_column} = ? AND id > ?)) "
+                 f"ORDER BY {order_column}, id LIMIT ?")
+        last_value, last_id = '', ''
+        while True:
+            rows = self._conn.execute(query, (user_id, last_value, last_value, last_id, batch_size)).fetchall()
+            yield from (_load(row) for row in rows)
+            if len(rows) < batch_size:
+                return
+            last_id, last_value = rows[-1][0], rows[-1][2]
+
+    # ============= STREAK OPERATIONS =============
+
+    def upsert_streak(self, user_id: str, streak_data: Dict) -> bool:
+        """Create or update user streak"""
+        update_data = {k: v for k, v in streak_data.items() if k != 'user_id'}
+        update_data['updated_at'] = datetime.utcnow()
+        with self._write() as conn:
+            row = conn.execute("SELECT id, doc FROM streaks WHERE user_id = ?", (_id(user_id),)).fetchone()
+            streak = _load(row) if row else {'_id': ObjectId(), 'user_id': to_object_id(user_id)}
+            streak.update(update_data)
+            conn.execute(
+                "INSERT INTO streaks (user_id, id, last_login, doc) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET last_login = excluded.last_login, doc = excluded.doc",
+                (_id(user_id), str(streak['_id']), _ts(streak.get('last_login')), _dump(streak))
+            )
+        return True
+
+    def get_streak(self, user_id: str) -> Optional[Dict]:
+        """Get user streak data"""
+        return self._find_one("SELECT id, doc FROM streaks WHERE user_id = ?", (_id(user_id),))
+
+    # ============= TIPS OPERATIONS =============
+
+    def save_tip(self, tip_data: Dict) -> Optional[str]:
+        """Save an AI-generated tip"""
+        tip_data['_id'] = ObjectId()
+        tip_data['created_at'] = datetime.utcnow()
+        self._conn.execute(
+            "INSERT INTO tips (id, user_id, category, created_at, doc) VALUES (?, ?, ?, ?, ?)",
+            (str(tip_data['_id']), _id(tip_data['user_id']), tip_data.get('category'),
+             _ts(tip_data['created_at']), _dump(tip_data))
+        )
+        return str(tip_data['_id'])
+
+    def get_recent_tips(self, user_id: str, limit: int = 10) -> List[Dict]:
+        """Get recent tips for a user"""
+        return self._find(
+            "SELECT id, doc FROM tips WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+            (_id(user_id), limit)
+        )
+
+    def get_tips_page(self, user_id: str, limit: int = 10, category: Optional[str] = None,
+                      before: Optional[Tuple[datetime, object]] = None) -> Tuple[List[Dict], Optional[Tuple]]:
+        """Get one page of tips, newest first, optionally for a single category.
+
+        `before` is the cursor returned with the previous page: the (created_at, _id) of
+        its last tip. Returns the tips and the cursor for the next (older) page, or None
+        when there are no older tips.
+        """
+        query = "SELECT id, doc FROM tips WHERE user_id = ?"
+        params = [_id(user_id)]
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        if before:
+            created_at, tip_id = before
+            query += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params += [_ts(created_at), _ts(created_at), str(tip_id)]
+
+        # One extra tip tells whether an older page exists
+        tips = self._find(query + " ORDER BY created_at DESC, id DESC LIMIT ?", (*params, limit + 1))
+        if len(tips) <= limit:
+            return tips, None
+        tips = tips[:limit]
+        return tips, (tips[-1]['created_at'], tips[-1]['_id'])
+
+    def get_tip_for_today(self, user_id: str) -> Optional[Dict]:
+        """Get tip generated today"""
+        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self._find_one("SELECT id, doc FROM tips WHERE user_id = ? AND created_at >= ? LIMIT 1",
+                              (_id(user_id), _ts(today_start)))
+
+    def iter_tips(self, user_id: str, batch_size: int = 1000, analytics: bool = False) -> Iterator[Dict]:
+        """Iterate over all tips for a user, oldest first"""
+        yield from self._iter_pages("tips", "created_at", _id(user_id), batch_size)
+
+    # ============= EXPORT & ADMIN OPERATIONS =============
+
+    def iter_user_ids(self, batch_size: int = 1000, analytics: bool = True) -> Iterator:
+        """Iterate over all user ids in _id order"""
+        last_id = ''
+        while True:
+            rows = self._conn.execute("SELECT id FROM users WHERE id > ? ORDER BY id LIMIT ?",
+                                      (last_id, batch_size)).fetchall()
+            yield from (ObjectId(row[0]) for row in rows)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def get_all_users_count(self) -> int:
+        """Get total number of users"""
+        return self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def get_total_entries_count(self) -> int:
+        """Get total number of health entries"""
+        return self._conn.execute("SELECT COUNT(*) FROM health_entries").fetchone()[0]
+
+    def count_active_users(self, since: datetime) -> int:
+        """Count users whose last login is at or after `since` (index range count)"""
+        return self._conn.execute("SELECT COUNT(*) FROM streaks WHERE last_login >= ?",
+                                  (_ts(since),)).fetchone()[0]
+
+    def increment_counters(self, names: List[str], amount: int = 1) -> bool:
+        """Increment event counters, both all-time and for today"""
+        today = datetime.utcnow().strftime('%Y-%m-%d')
+        with self._write() as conn:
+            conn.executemany(
+                "INSERT INTO counters (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+                [(key, amount) for name in names for key in (name, f"{name}:{today}")]
+            )
+        return True
+
+    def get_counters(self, keys: List[str]) -> Dict[str, int]:
+        """Get counter values by key (missing counters are 0)"""
+        values = {key: 0 for key in keys}
+        if keys:
+            placeholders = ", ".join("?" * len(keys))
+            values.update(self._conn.execute(
+                f"SELECT key, value FROM counters WHERE key IN ({placeholders})", keys).fetchall())
+        return values
+
+    def close_connection(self):
+        """Close every thread's connection"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            self._local = threading.local()
+            SqliteBackend._instance = None
+            print("SQLite connection closed")
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=SqliteBackend._reset_after_fork)
@@ -0,0 +1,182 @@
+"""
+Storage Backend
+Interface for the core user, entry, streak and tip storage, and backend selection
+"""
+
+import importlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+from config import Config
+
+# STORAGE_BACKEND value -> (module, class) implementing StorageBackend
+STORAGE_BACKENDS = {
+    'mongodb': ('db_manager', 'DatabaseManager'),
+    'sqlite': ('sqlite_backend', 'SqliteBackend')
+}
+
+# Optional features beyond the core operations; services check supports() before using them
+CAPABILITIES = (
+    'rolling_metrics',  # Incremental rolling-window statistics
+    'anomalies',        # Anomaly baselines and flagged anomalies
+    'goals',            # Milestone state and milestones (goals themselves live on the user)
+    'intraday',         # Per-minute wearable samples
+    'notifications',    # Queued SMS notifications
+    'change_streams',   # Event bus consumer and data versions
+    'archive',          # Monthly archive buckets of old entries
+    'shared_throttle',  # Login attempt counters shared across app replicas
+    'correlations',     # Stored results of the nightly correlation batch
+    'forecasts'         # Stored next-week forecasts from the nightly batch
+)
+
+class StorageBackend(ABC):
+    """Core storage operations shared by every backend.
+
+    Documents use the MongoDB shapes throughout (`_id` and `user_id` are ObjectIds,
+    dates are naive UTC datetimes), so services work unchanged on any backend.
+    """
+
+    CAPABILITIES: FrozenSet[str] = frozenset()
+
+    def supports(self, capability: str) -> bool:
+        """Whether the backend provides an optional feature (see CAPABILITIES)"""
+        return capability in self.CAPABILITIES
+
+    # ============= USER OPERATIONS =============
+
+    @abstractmethod
+    def create_user(self, user_data: Dict) -> Optional[str]:
+        """Create a new user; None if the email or username is taken"""
+
+    @abstractmethod
+    def get_user_by_email(self, email: str) -> Optional[Dict]:
+        """Get user by email"""
+
+    @abstractmethod
+    def get_user_by_id(self, user_id: str) -> Optional[Dict]:
+        """Get user by ID"""
+
+    @abstractmethod
+    def update_user(self, user_id: str, update_data: Dict) -> bool:
+        """Set fields on a user"""
+
+    @abstractmethod
+    def get_user_goals(self, user_id: str) -> Dict:
+        """The goals a user has set (possibly none)"""
+
+    # ============= HEALTH ENTRY OPERATIONS =============
+
+    @abstractmethod
+    def create_health_entry(self, entry_data: Dict) -> Optional[str]:
+        """Create a new health entry"""
+
+    @abstractmethod
+    def get_health_entries(self, user_id: str, days: int = 30, analytics: bool = False) -> List[Dict]:
+        """Get health entries for a user for the last N days, newest first"""
+
+    @abstractmethod
+    def get_entry_by_date(self, user_id: str, date: datetime) -> Optional[Dict]:
+        """Get health entry for a specific date"""
+
+    @abstractmethod
+    def update_health_entry(self, entry_id: str, update_data: Dict) -> bool:
+        """Set fields on a health entry"""
+
+    @abstractmethod
+    def bulk_upsert_health_entries(self, user_id: str, entries: List[Dict]) -> int:
+        """Create or overwrite one entry per day for a user"""
+
+    @abstractmethod
+    def get_health_stats(self, user_id: str, days: int = 30, analytics: bool = False) -> Dict:
+        """Averages over the last N days (avg_steps, ..., total_entries), {} without entries"""
+
+    @abstractmethod
+    def iter_health_entries(self, user_id: str, batch_size: int = 1000, analytics: bool = False) -> Iterator[Dict]:
+        """Iterate over a user's full entry history, oldest first"""
+
+    # ============= STREAK OPERATIONS =============
+
+    @abstractmethod
+    def upsert_streak(self, user_id: str, streak_data: Dict) -> bool:
+        """Create or update user streak"""
+
+    @abstractmethod
+    def get_streak(self, user_id: str) -> Optional[Dict]:
+        """Get user streak data"""
+
+    # ============= TIPS OPERATIONS =============
+
+    @abstractmethod
+    def save_tip(self, tip_data: Dict) -> Optional[str]:
+        """Save an AI-generated tip"""
+
+    @abstractmethod
+    def get_recent_tips(self, user_id: str, limit: int = 10) -> List[Dict]:
+        """Get recent tips for a user"""
+
+    @abstractmethod
+    def get_tips_page(self, user_id: str, limit: int = 10, category: Optional[str] = None,
+                      before: Optional[Tuple[datetime, object]] = None) -> Tuple[List[Dict], Optional[Tuple]]:
+        """Get one page of tips, newest first, and the cursor for the next (older) page"""
+
+    @abstractmethod
+    def get_tip_for_today(self, user_id: str) -> Optional[Dict]:
+        """Get tip generated today"""
+
+    @abstractmethod
+    def iter_tips(self, user_id: str, batch_size: int = 1000, analytics: bool = False) -> Iterator[Dict]:
+        """Iterate over all tips for a user, oldest first"""
+
+    # ============= EXPORT & ADMIN OPERATIONS =============
+
+    @abstractmethod
+    def iter_user_ids(self, batch_size: int = 1000, analytics: bool = True) -> Iterator:
+        """Iterate over all user ids in _id order"""
+
+    @abstractmethod
+    def get_all_users_count(self) -> int:
+        """Get total number of users"""
+
+    @abstractmethod
+    def get_total_entries_count(self) -> int:
+        """Get total number of health entries"""
+
+    @abstractmethod
+    def count_active_users(self, since: datetime) -> int:
+        """Count users whose last login is at or after `since`"""
+
+    @abstractmethod
+    def increment_counters(self, names: List[str], amount: int = 1) -> bool:
+        """Increment event counters, both all-time and for today"""
+
+    @abstractmethod
+    def get_counters(self, keys: List[str]) -> Dict[str, int]:
+        """Get counter values by key (missing counters are 0)"""
+
+    @abstractmethod
+    def close_connection(self):
+        """Close the backend's connections"""
+
+    @classmethod
+    @abstractmethod
+    def shutdown(cls):
+        """Close the shared instance's connections, if one was created"""
+
+def _backend_class():
+    name = Config.STORAGE_BACKEND
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown STORAGE_BACKEND '{name}' (expected one of: {', '.join(STORAGE_BACKENDS)})")
+    module, cls = STORAGE_BACKENDS[name]
+    return getattr(importlib.import_module(module), cls)
+
+def get_storage() -> StorageBackend:
+    """The process-wide backend selected by STORAGE_BACKEND (connects on first use)"""
+    return _backend_class()()
+
+def storage_supports(capability: str) -> bool:
+    """Whether the configured backend provides an optional feature"""
+    return capability in _backend_class().CAPABILITIES
+
+def shutdown_storage():
+    """Close the configured backend's connections; the next get_storage() reconnects"""
+    _backend_class().shutdown()
@@ -3,17 +3,17 @@ Streak Service
 Tracks user login streaks using Pixela API or internal tracking
 """
 
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 from config import Config
-from db_manager import DatabaseManager
+from storage_backend import get_storage
+from instrumentation import timed, EXTERNAL_CALL_SECONDS, EXTERNAL_CALL_ERRORS
 
 class StreakService:
     """Service for tracking user login streaks"""
     
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = get_storage()
         self.use_pixela = Config.is_feature_enabled('pixela_tracking')
         
         if self.use_pixela:
@@ -99,6 +99,8 @@ class StreakService:
         if not self.use_pixela:
             return False
         
+        import requests
+        
         try:
             # Create a graph for this user if not exists
             graph_id = f"user_{user_id[:8]}"  # Use first 8 chars of user_id
@@ -116,7 +118,8 @@ class StreakService:
                 "quantity": "1"
             }
             
-            response = requests.post(url, json=data, headers=headers)
+            with timed(EXTERNAL_CALL_SECONDS, EXTERNAL_CALL_ERRORS, service='pixela', operation='post_pixel'):
+                response = requests.post(url, json=data, headers=headers)
             
             return response.status_code in [200, 201]
             
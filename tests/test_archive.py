@@ -0,0 +1,118 @@
+"""
+Archive Tests
+Monthly bucket codec, re-folding into an existing bucket, and hot-wins merges
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from archive_service import ArchiveService
+from db_manager import DatabaseManager
+from models import ARCHIVED_ENTRY_FIELDS, EntryArchiveBucket
+
+USER_ID = ObjectId()
+MONTH = datetime(2025, 3, 1)
+
+def _entry(day, steps, month=MONTH, **fields):
+    entry = {"user_id": USER_ID, "date": month.replace(day=day), "steps": steps, "calories": 2000,
+             "heart_rate": 65, "sleep_hours": 7.5, "water_intake": 8, "notes": "",
+             "created_at": datetime(2025, 4, 1)}
+    entry.update(fields)
+    return entry
+
+class _ArchiveDb:
+    """The storage calls _archive_month makes, kept in memory"""
+
+    def __init__(self, bucket=None):
+        self.bucket = bucket
+        self.deleted = []
+        self.counters = {}
+
+    def get_archive_bucket(self, user_id, month):
+        return self.bucket
+
+    def save_archive_bucket(self, bucket):
+        self.bucket = bucket
+        return True
+
+    def delete_health_entries(self, entries):
+        self.deleted.extend(entries)
+        return len(entries)
+
+    def increment_counters(self, names, amount=1):
+        for name in names:
+            self.counters[name] = self.counters.get(name, 0) + amount
+        return True
+
+def _archive(db, entries):
+    service = ArchiveService.__new__(ArchiveService)
+    service.db = db
+    service._archive_month(str(USER_ID), MONTH, entries)
+
+def test_bucket_round_trip():
+    entries = [_entry(2, 4000), _entry(15, 9000, notes="long walk"), _entry(31, 12000, heart_rate=None)]
+    bucket = EntryArchiveBucket.to_document(str(USER_ID), MONTH, entries)
+    assert bucket["days"] == [2, 15, 31]
+    assert bucket["count"] == 3
+
+    expanded = EntryArchiveBucket.expand(bucket)
+    assert [entry["date"] for entry in expanded] == [entry["date"] for entry in entries]
+    for original, restored in zip(entries, expanded):
+        assert restored["user_id"] == USER_ID
+        assert restored["archived"] is True
+        assert {f: restored[f] for f in ARCHIVED_ENTRY_FIELDS} == {f: original[f] for f in ARCHIVED_ENTRY_FIELDS}
+
+def test_bucket_keeps_last_entry_for_a_day():
+    bucket = EntryArchiveBucket.to_document(USER_ID, MONTH, [_entry(5, 1000), _entry(5, 2000)])
+    assert bucket["days"] == [5]
+    assert bucket["steps"] == [2000]
+
+def test_refold_into_existing_bucket():
+    db = _ArchiveDb()
+    _archive(db, [_entry(1, 1000), _entry(2, 2000)])
+    assert db.counters == {"archived_entries": 2}
+
+    # A later run picks up an entry edited after the first one read it, plus a new day
+    later = [_entry(2, 2500), _entry(3, 3000)]
+    _archive(db, later)
+    assert db.bucket["days"] == [1, 2, 3]
+    assert db.bucket["steps"] == [1000, 2500, 3000]
+    assert db.bucket["count"] == 3
+    assert db.deleted[-2:] == later
+    assert db.counters == {"archived_entries": 3}
+
+def test_refold_with_nothing_new_leaves_count():
+    db = _ArchiveDb()
+    _archive(db, [_entry(1, 1000)])
+    _archive(db, [_entry(1, 1200)])
+    assert db.bucket["steps"] == [1200]
+    assert db.counters == {"archived_entries": 1}
+
+def test_merge_entries_prefers_hot_entry_for_the_same_day():
+    archived = EntryArchiveBucket.expand(
+        EntryArchiveBucket.to_document(USER_ID, MONTH, [_entry(1, 1000), _entry(2, 2000)])
+    )
+    hot = [_entry(2, 2500, date=datetime(2025, 3, 2, 18, 30)), _entry(3, 3000)]
+    merged = DatabaseManager._merge_entries(hot, archived)
+    assert [entry["date"].day for entry in merged] == [3, 2, 1]
+    assert [entry["steps"] for entry in merged] == [3000, 2500, 1000]
+    assert "archived" not in merged[1]
+
+def test_merge_sorted_entries_prefers_hot_entry_for_the_same_day():
+    archived = EntryArchiveBucket.expand(
+        EntryArchiveBucket.to_document(USER_ID, MONTH, [_entry(1, 1000), _entry(2, 2000), _entry(4, 4000)])
+    )
+    hot = [_entry(2, 2500, date=datetime(2025, 3, 2, 18, 30)), _entry(3, 3000), _entry(5, 5000)]
+    merged = list(DatabaseManager._merge_sorted_entries(iter(archived), iter(hot)))
+    assert [entry["date"].day for entry in merged] == [1, 2, 3, 4, 5]
+    assert [entry["steps"] for entry in merged] == [1000, 2500, 3000, 4000, 5000]
+    assert "archived" not in merged[1]
+
+def test_merge_sorted_entries_with_one_side_empty():
+    archived = EntryArchiveBucket.expand(EntryArchiveBucket.to_document(USER_ID, MONTH, [_entry(1, 1000)]))
+    assert [e["steps"] for e in DatabaseManager._merge_sorted_entries(iter(archived), iter([]))] == [1000]
+    assert [e["steps"] for e in DatabaseManager._merge_sorted_entries(iter([]), iter([_entry(2, 2000)]))] == [2000]
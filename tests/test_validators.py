@@ -0,0 +1,40 @@
+"""
+Validator Tests
+Batch validation of columnar health entries
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validators import Validators
+
+def _columns(**overrides):
+    columns = {"steps": [5000, 6000], "calories": [2000, 2100], "heart_rate": [60, 65],
+               "sleep_hours": [7.5, 8], "water_intake": [8, 6]}
+    columns.update(overrides)
+    return columns
+
+def test_validate_batch_accepts_valid_rows():
+    valid, _, messages = Validators.validate_batch(_columns())
+    assert valid.tolist() == [True, True]
+    assert messages == {}
+
+def test_validate_batch_rejects_nested_values():
+    valid, masks, messages = Validators.validate_batch(_columns(steps=[[5], 3000], heart_rate=[{"bpm": 60}, 65]))
+    assert valid.tolist() == [False, True]
+    assert masks["steps"].tolist() == [True, False]
+    assert masks["heart_rate"].tolist() == [True, False]
+    assert len(messages[0]) == 2
+
+def test_validate_batch_rejects_ragged_values():
+    # Same-length nested lists would otherwise become a 2-D array
+    valid, masks, _ = Validators.validate_batch(_columns(steps=[[5, 6], [7, 8]], calories=[[1], [2, 3]]))
+    assert valid.tolist() == [False, False]
+    assert masks["steps"].tolist() == [True, True]
+    assert masks["calories"].tolist() == [True, True]
+
+def test_validate_batch_parses_numeric_strings():
+    valid, _, _ = Validators.validate_batch(_columns(steps=["5000", " 6000 "]))
+    assert valid.tolist() == [True, True]
@@ -0,0 +1,139 @@
+"""
+Login Throttle
+Token-bucket limits on login attempts per account and per source, checked before any password hashing
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from instrumentation import registry
+from storage_backend import get_storage
+
+LOGIN_ATTEMPTS = registry.counter(
+    'health_tracker_login_attempts_total', 'Login attempts by outcome', ['outcome'])
+LOGIN_THROTTLED = registry.counter(
+    'health_tracker_login_throttled_total', 'Login attempts rejected before hashing', ['scope'])
+
+# Buckets kept in memory per process; full buckets are the cheapest to forget
+MAX_TRACKED_KEYS = 100_000
+
+class TokenBucket:
+    """`capacity` attempts at once, refilled at `rate` attempts per second"""
+
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, capacity: float, rate: float, now: float):
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    def wait(self, rate: float) -> float:
+        """Seconds until one token is available (0 if one is available now)"""
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / rate if rate > 0 else float(Config.LOGIN_THROTTLE_WINDOW_SECONDS)
+
+class LoginThrottle:
+    """Per-account and per-source login limits.
+
+    Each process keeps token buckets in memory, so a flood is rejected without
+    touching the database. Attempts that pass are also counted in fixed windows
+    in shared storage, which holds the same limits across app replicas.
+    Keys are hashed, so attempted emails and addresses are never stored.
+    """
+
+    def __init__(self):
+        self.db = get_storage()
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared_failed = False
+
+    @staticmethod
+    def limits() -> Dict[str, Tuple[int, float]]:
+        """(burst, refill per second) for each scope"""
+        return {
+            'account': (Config.LOGIN_ACCOUNT_BURST, Config.LOGIN_ACCOUNT_PER_MINUTE / 60),
+            'source': (Config.LOGIN_SOURCE_BURST, Config.LOGIN_SOURCE_PER_MINUTE / 60)
+        }
+
+    @staticmethod
+    def _keys(email: str, source: Optional[str]) -> List[Tuple[str, str]]:
+        keys = [('account', (email or '').strip().lower())]
+        if source:
+            keys.append(('source', source))
+        return keys
+
+    def acquire(self, email: str, source: Optional[str] = None) -> Dict:
+        """Take one attempt for the account and source; rejected attempts must not be verified"""
+        if not Config.LOGIN_THROTTLE:
+            return {"allowed": True}
+
+        keys = self._keys(email, source)
+        limits = self.limits()
+        rejected = self._take_local(keys, limits)
+        if rejected is None:
+            rejected = self._take_shared(keys, limits)
+        if rejected is None:
+            return {"allowed": True}
+
+        scope, retry_after = rejected
+        LOGIN_THROTTLED.inc(scope=scope)
+        LOGIN_ATTEMPTS.inc(outcome='throttled')
+        return {"allowed": False, "scope": scope, "retry_after": max(1, math.ceil(retry_after))}
+
+    def _take_local(self, keys: List[Tuple[str, str]], limits: Dict) -> Optional[Tuple[str, float]]:
+        """Take a token from every bucket, or from none if any is empty"""
+        now = time.monotonic()
+        with self._lock:
+            buckets = []
+            for scope, key in keys:
+                capacity, rate = limits[scope]
+                bucket = self._buckets.get((scope, key))
+                if bucket is None:
+                    bucket = self._buckets[(scope, key)] = TokenBucket(capacity, now)
+                else:
+                    self._buckets.move_to_end((scope, key))
+                    bucket.refill(capacity, rate, now)
+                wait = bucket.wait(rate)
+                if wait:
+                    return scope, wait
+                buckets.append(bucket)
+
+            for bucket in buckets:
+                bucket.tokens -= 1
+            while len(self._buckets) > MAX_TRACKED_KEYS:
+                self._buckets.popitem(last=False)
+        return None
+
+    def _take_shared(self, keys: List[Tuple[str, str]], limits: Dict) -> Optional[Tuple[str, float]]:
+        """Count the attempt in this window's shared counters (fails open)"""
+        if not self.db.supports('shared_throttle'):
+            return None  # Single-node storage: the local buckets are the whole picture
+
+        window = Config.LOGIN_THROTTLE_WINDOW_SECONDS
+        now = time.time()
+        index = int(now // window)
+        # Kept one window past its end, so the TTL monitor's delay never cuts a window short
+        expires_at = datetime.utcnow() + timedelta(seconds=(index + 2) * window - now)
+        for scope, key in keys:
+            capacity, rate = limits[scope]
+            digest = hashlib.sha256(f"{scope}:{key}".encode('utf-8')).hexdigest()[:32]
+            try:
+                count = self.db.increment_throttle_counter(f"{digest}:{index}", expires_at)
+            except Exception as e:
+                if not self._shared_failed:
+                    print(f"⚠️ Shared login throttle unavailable, using local limits only: {e}")
+                    self._shared_failed = True
+                return None
+            # The most a bucket lets through in one window
+            if count > capacity + rate * window:
+                return scope, (index + 1) * window - now
+        return None
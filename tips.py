@@ -5,17 +5,55 @@ Displays AI-generated health tips
 
 import streamlit as st
 from openai_service import OpenAIService
+from service_registry import get_service
+from event_bus import derived_cache
+
+PAGE_SIZE = 10
+
+CATEGORIES = ['sleep', 'hydration', 'activity', 'nutrition', 'general']
+
+def _load_tips(ai_service, user_id, category):
+    """Tips loaded so far in this session; older pages are fetched on demand"""
+    key = (user_id, category)
+    state = st.session_state.get('tips_history')
+    # With the event bus running, an unchanged tips version means nothing to re-read
+    version = derived_cache.version(user_id, 'tips')
+    if state and state['key'] == key and version is not None and state['version'] == version:
+        return state
+
+    first_page, cursor = ai_service.db.get_tips_page(user_id, limit=PAGE_SIZE, category=category)
+    first_ids = [t['_id'] for t in first_page]
+
+    # Keep already loaded older pages unless the newest page changed underneath them
+    if not state or state['key'] != key or state['first_ids'] != first_ids:
+        state = {"key": key, "first_ids": first_ids, "tips": first_page, "cursor": cursor}
+        st.session_state['tips_history'] = state
+    state['version'] = version
+    return state
 
 def render(user_id):
     st.markdown('<div class="main-header">💡 Your AI Health Tips</div>', unsafe_allow_html=True)
-    ai_service = OpenAIService()
-    tips = ai_service.db.get_recent_tips(user_id, limit=10)
+    ai_service = get_service(OpenAIService)
+
+    choice = st.selectbox("Category", ['All'] + CATEGORIES,
+                          format_func=lambda c: c if c == 'All' else f"{ai_service.get_category_emoji(c)} {c.title()}")
+    category = None if choice == 'All' else choice
+    state = _load_tips(ai_service, user_id, category)
 
-    if not tips:
-        st.info("No tips generated yet. Log your health data to get personalized AI tips!")
+    if not state['tips']:
+        if category:
+            st.info(f"No {category} tips yet.")
+        else:
+            st.info("No tips generated yet. Log your health data to get personalized AI tips!")
         return
 
-    for t in tips:
+    for t in state['tips']:
         cat = t.get('category', 'general')
         emoji = ai_service.get_category_emoji(cat)
         st.markdown(f"> {emoji} **{t['tip_text']}**  \n<sub>[{t['created_at'].strftime('%Y-%m-%d')}]</sub>")
+
+    if state['cursor'] and st.button("⬇️ Older tips"):
+        older, state['cursor'] = ai_service.db.get_tips_page(
+            user_id, limit=PAGE_SIZE, category=category, before=state['cursor'])
+        state['tips'].extend(older)
+        st.rerun()
@@ -3,10 +3,10 @@ Twilio Service
 Handles SMS notifications and reminders
 """
 
-from twilio.rest import Client
 from typing import Dict
 from config import Config
 from datetime import datetime
+from instrumentation import timed, EXTERNAL_CALL_SECONDS, EXTERNAL_CALL_ERRORS
 
 class TwilioService:
     """Service for SMS notifications via Twilio"""
@@ -16,6 +16,7 @@ class TwilioService:
         
         if Config.TWILIO_ACCOUNT_SID and Config.TWILIO_AUTH_TOKEN:
             try:
+                from twilio.rest import Client
                 self.client = Client(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN)
                 print("✅ Twilio client initialized")
             except Exception as e:
@@ -83,6 +84,24 @@ You've achieved a new milestone:
 
 Keep crushing your health goals! 💪
 
+- Health Tracker Pro
+        """.strip()
+        
+        return self._send_sms(phone_number, message_body)
+    
+    def send_anomaly_alert(self, phone_number: str, username: str, description: str) -> Dict:
+        """Send alert about an unusual health reading"""
+        if not self.client:
+            return {"success": False, "message": "SMS service not configured"}
+        
+        message_body = f"""
+⚠️ Health Check-in
+
+Hi {username}, we noticed something unusual:
+{description}
+
+If you feel unwell, consider reaching out to a healthcare professional.
+
 - Health Tracker Pro
         """.strip()
         
@@ -108,11 +127,12 @@ Don't break the chain - log your health data today!
     def _send_sms(self, to_number: str, body: str) -> Dict:
         """Internal method to send SMS"""
         try:
-            message = self.client.messages.create(
-                body=body,
-                from_=Config.TWILIO_PHONE_NUMBER,
-                to=to_number
-            )
+            with timed(EXTERNAL_CALL_SECONDS, EXTERNAL_CALL_ERRORS, service='twilio', operation='send_sms'):
+                message = self.client.messages.create(
+                    body=body,
+                    from_=Config.TWILIO_PHONE_NUMBER,
+                    to=to_number
+                )
             
             return {
                 "success": True,
@@ -4,7 +4,16 @@ Validates user inputs and data
 """
 
 import re
-from typing import Any
+from typing import Any, Dict, List, Tuple
+
+# Allowed range and error message for each health metric
+HEALTH_BOUNDS = {
+    'steps': (0, 100000, "Steps must be between 0 and 100,000"),
+    'calories': (0, 10000, "Calories must be between 0 and 10,000"),
+    'heart_rate': (30, 220, "Heart rate must be between 30 and 220 bpm"),
+    'sleep_hours': (0, 24, "Sleep hours must be between 0 and 24"),
+    'water_intake': (0, 50, "Water intake must be between 0 and 50 glasses")
+}
 
 class Validators:
     """Validation utilities"""
@@ -43,19 +52,70 @@ class Validators:
         """Validate complete health entry"""
         errors = []
         
-        if not Validators.is_valid_health_value(entry.get('steps', 0), 0, 100000):
-            errors.append("Steps must be between 0 and 100,000")
+        for field, (min_val, max_val, message) in HEALTH_BOUNDS.items():
+            if not Validators.is_valid_health_value(entry.get(field, 0), min_val, max_val):
+                errors.append(message)
         
-        if not Validators.is_valid_health_value(entry.get('calories', 0), 0, 10000):
-            errors.append("Calories must be between 0 and 10,000")
+        return len(errors) == 0, errors
+    
+    @staticmethod
+    def _to_float_array(values):
+        """Convert a column to float64, with NaN wherever float() would fail"""
+        import numpy as np
+        import pandas as pd
         
-        if not Validators.is_valid_health_value(entry.get('heart_rate', 0), 30, 220):
-            errors.append("Heart rate must be between 30 and 220 bpm")
+        if isinstance(values, (np.ndarray, pd.Series)) and values.dtype.kind in 'biuf':
+            return np.asarray(values, dtype=np.float64)
+
+        # One object per row: nested or ragged JSON values (lists, dicts) stay
+        # single elements that fail to parse, instead of breaking np.asarray
+        array = np.empty(len(values), dtype=object)
+        array[:] = list(values)
+
+        # Mixed/object column: vectorized parse, then fall back to float() for
+        # the few values pandas rejects (e.g. strings with surrounding spaces)
+        series = pd.Series(array, dtype=object)
+        numeric = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64)
+        retry = np.flatnonzero(np.isnan(numeric) & series.notna().to_numpy())
+        for i in retry:
+            try:
+                numeric[i] = float(array[i])
+            except (ValueError, TypeError):
+                pass
+        return numeric
+    
+    @staticmethod
+    def validate_batch(columns) -> Tuple[Any, Dict[str, Any], Dict[int, List[str]]]:
+        """Validate many health entries at once from columnar input.
         
-        if not Validators.is_valid_health_value(entry.get('sleep_hours', 0), 0, 24):
-            errors.append("Sleep hours must be between 0 and 24")
+        `columns` is a DataFrame or a mapping of field name to array/list. Missing
+        fields default to 0, as in validate_health_entry. Returns a boolean
+        `valid` array, a per-field boolean array of invalid rows, and the error
+        messages for each invalid row index.
+        """
+        import numpy as np
         
-        if not Validators.is_valid_health_value(entry.get('water_intake', 0), 0, 50):
-            errors.append("Water intake must be between 0 and 50 glasses")
+        if hasattr(columns, 'columns'):
+            length = len(columns)
+        else:
+            length = len(next(iter(columns.values()))) if columns else 0
         
-        return len(errors) == 0, errors
+        valid = np.ones(length, dtype=bool)
+        error_masks = {}
+        for field, (min_val, max_val, _) in HEALTH_BOUNDS.items():
+            if field in columns:
+                values = Validators._to_float_array(columns[field])
+                # NaN compares False, so unparseable values are invalid like in float()
+                invalid = ~((values >= min_val) & (values <= max_val))
+            else:
+                invalid = np.full(length, not (min_val <= 0 <= max_val))
+            error_masks[field] = invalid
+            valid &= ~invalid
+        
+        messages = {}
+        for field, invalid in error_masks.items():
+            message = HEALTH_BOUNDS[field][2]
+            for i in np.flatnonzero(invalid).tolist():
+                messages.setdefault(i, []).append(message)
+        
+        return valid, error_masks, messages